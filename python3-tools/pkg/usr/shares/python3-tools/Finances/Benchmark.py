@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+import sys
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from .CreditCalculator import calculate_credit, calculate_multiple_credits
+from .FinanceRoutines import computeComplexPercentIncome
+from .InvestmentCalculator import calculate_investment
+
+
+def measure(function: Callable[[], object], min_time: float = 0.2, repeat: int = 3) -> Tuple[float, int]:
+    """
+    Measure the throughput and the peak memory of a function without arguments.
+
+    Returns:
+        tuple: (float: best calls per second over `repeat` rounds of at least min_time, int: peak bytes of one call)
+    """
+    tracemalloc.start()
+    try:
+        function()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    best = 0.0
+    for _ in range(repeat):
+        calls = 0
+        started = time.perf_counter()
+        while True:
+            function()
+            calls += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_time:
+                break
+        best = max(best, calls / elapsed)
+    return best, peak_memory
+
+
+def _write_portfolio(directory: str, credits: int, repayments: int) -> str:
+    path = os.path.join(directory, f"portfolio-{credits}-{repayments}.jsonl")
+    with open(path, 'w') as f:
+        for i in range(credits):
+            credit = {
+                "loan_amount": 10000 + 100 * (i % 500),
+                "period": 5 + i % 25,
+                "interest_rate": 0.01 + 0.001 * (i % 50),
+                "start_year": 2000 + i % 30,
+                "repayment_map": {str(year): 500 for year in range(1, repayments + 1)},
+            }
+            f.write(json.dumps(credit) + "\n")
+    return path
+
+
+def _portfolio_case(directory: str, credits: int, repayments: int,
+                    params: Dict[str, object]) -> Callable[[], Callable[[], object]]:
+    def prepare():
+        path = _write_portfolio(directory, credits, repayments)
+        params["file_size"] = os.path.getsize(path)
+        return lambda: calculate_multiple_credits(path)
+    return prepare
+
+
+def benchmark_cases(directory: str) -> Iterable[Tuple[str, Dict[str, object], Callable[[], Callable[[], object]]]]:
+    """
+    Benchmarks along the scaling axes as (name, parameters, prepare) tuples.
+
+    prepare() creates the inputs of the benchmark (e.g. portfolio files in directory), completes
+    the parameters and returns the function to measure. It is only called for selected benchmarks.
+    """
+    for loan_period in (10, 100, 1000):
+        yield (f"calculate_credit[period={loan_period}]", {"loan_period": loan_period},
+               lambda loan_period=loan_period: lambda: calculate_credit(
+                   0.05, 100000, loan_period, {year: 100 for year in range(1, loan_period + 1, 2)}))
+
+    for credits in (100, 1000, 10000):
+        params = {"credits": credits}
+        yield (f"calculate_multiple_credits[credits={credits}]", params,
+               _portfolio_case(directory, credits, 2, params))
+
+    for repayments in (0, 10, 50):
+        params = {"credits": 1000}
+        yield (f"calculate_multiple_credits[repayments={repayments}]", params,
+               _portfolio_case(directory, 1000, repayments, params))
+
+    for topups in (10, 100, 1000):
+        # Fixed length, the repeat period sets how many top-ups fall into it
+        period = 1000 // topups
+        yield (f"calculate_investment[repeat_topups={topups}]", {"repeat_topups": topups, "length": 1000},
+               lambda period=period: lambda: calculate_investment(1000, {0: 1000, 'repeat': (period, 100)},
+                                                                  0.05, 0.25, 1000))
+
+    for years in (10, 100, 1000):
+        yield (f"computeComplexPercentIncome[years={years}]", {"years": years},
+               lambda years=years: lambda: computeComplexPercentIncome(1000, 100, 0.001, years))
+
+
+def run_benchmarks(min_time: float = 0.2, repeat: int = 3, selection: str | None = None) -> Dict[str, object]:
+    """
+    Run all benchmarks, optionally only those whose name contains selection.
+
+    Returns:
+        dict: Results in the format stored by `--output`
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, params, prepare in benchmark_cases(directory):
+            if selection and selection not in name:
+                continue
+            ops_per_sec, peak_memory = measure(prepare(), min_time, repeat)
+            results[name] = {"ops_per_sec": ops_per_sec, "peak_memory": peak_memory, "params": params}
+            print(f"{name}: {ops_per_sec:.1f} ops/s, peak {peak_memory / 1024:.1f} KiB", file=sys.stderr)
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "timestamp": time.time(),
+        "benchmarks": results,
+    }
+
+
+def compare_results(results: Dict[str, object], baseline: Dict[str, object],
+                    threshold: float = 0.2, memory_threshold: float = 0.5) -> List[str]:
+    """
+    Compare benchmark results against a baseline.
+
+    Args:
+        threshold: Allowed relative throughput loss (0.2 - fail when more than 20% slower)
+        memory_threshold: Allowed relative peak memory growth
+
+    Returns:
+        list: Descriptions of the regressions, empty if there are none
+    """
+    regressions = []
+    for name, current in results["benchmarks"].items():
+        reference = baseline["benchmarks"].get(name)
+        if reference is None:
+            continue
+        if current["ops_per_sec"] < reference["ops_per_sec"] * (1 - threshold):
+            regressions.append(f"{name}: {current['ops_per_sec']:.1f} ops/s, "
+                               f"baseline {reference['ops_per_sec']:.1f} ops/s")
+        if current["peak_memory"] > reference["peak_memory"] * (1 + memory_threshold):
+            regressions.append(f"{name}: peak memory {current['peak_memory']} bytes, "
+                               f"baseline {reference['peak_memory']} bytes")
+    return regressions
+
+
+def _main():
+    """
+    Command-line interface: python3 -m Finances.Benchmark [--baseline FILE] [--output FILE]
+
+    Exits with status 1 if a benchmark regressed beyond the thresholds.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the Finances calculators and track regressions.")
+    parser.add_argument("--output", type=str, default=None, help="JSON file to store the results")
+    parser.add_argument("--baseline", type=str, default=None, help="JSON results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed relative throughput loss before failing (default: 0.2)")
+    parser.add_argument("--memory-threshold", type=float, default=0.5,
+                        help="Allowed relative peak memory growth before failing (default: 0.5)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimal duration of a round in seconds (default: 0.2)")
+    parser.add_argument("--repeat", type=int, default=3, help="Rounds per benchmark, the best is kept (default: 3)")
+    parser.add_argument("--select", type=str, default=None, help="Only run benchmarks whose name contains this string")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.min_time, args.repeat, args.select)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.threshold, args.memory_threshold)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    _main()
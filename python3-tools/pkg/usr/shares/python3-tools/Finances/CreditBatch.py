@@ -0,0 +1,163 @@
+from typing import Dict, Iterable, Tuple
+
+import numpy
+
+# One row per (scenario, credit year). Rows after the loan is paid off have active == False.
+SCHEDULE_DTYPE = numpy.dtype([
+    ('monthly_rate', numpy.float64),
+    ('remaining_loan', numpy.float64),
+    ('active', numpy.bool_),
+])
+
+
+def repayment_matrix(repayment_maps: Iterable[Dict[int, float] | None], width: int = 0) -> numpy.ndarray:
+    """
+    Convert a sequence of repayment maps into a dense (scenario x year) array.
+
+    Args:
+        repayment_maps (iterable): Year-to-repayment mappings {year: amount}, one per scenario
+        width (int): Minimal number of year columns, column j holds the repayment for year j + 1
+
+    Returns:
+        numpy.ndarray: float64 array of scheduled repayments
+    """
+    repayment_maps = [{int(k): v for k, v in (m or {}).items()} for m in repayment_maps]
+    for repayment_map in repayment_maps:
+        if repayment_map:
+            width = max(width, max(repayment_map))
+
+    repayments = numpy.zeros((len(repayment_maps), width), dtype=numpy.float64)
+    for row, repayment_map in enumerate(repayment_maps):
+        for year, amount in repayment_map.items():
+            # calculate_credit never looks at years before the first one
+            if year >= 1:
+                repayments[row, year - 1] = amount
+    return repayments
+
+
+def _round_cents(values: numpy.ndarray) -> numpy.ndarray:
+    """
+    Round to cents exactly like Python's round(value, 2), which `calculate_credit` uses.
+
+    numpy.round(values, 2) computes rint(values * 100) / 100. The product is itself rounded,
+    so an amount just below or above a half cent may become an exact tie and round the other
+    way: numpy.round(51699.075, 2) is 51699.08, while round() works on the exact binary value
+    51699.07499999... and gives 51699.07. Only values whose scaled fraction is within a few
+    ulps of one half can differ, those are recomputed with round().
+    """
+    rounded = numpy.round(values, 2)
+    scaled = values * 100
+    ties = numpy.abs(scaled - numpy.floor(scaled) - 0.5) <= numpy.maximum(1e-6, 4 * numpy.spacing(scaled))
+    for index in numpy.flatnonzero(ties):
+        rounded[index] = round(float(values[index]), 2)
+    return rounded
+
+
+def calculate_credit_batch(interest_rates, total_loans, loan_periods,
+                           repayments=None) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """
+    Calculate the amortization tables of many loans at once.
+
+    Arrays are broadcast against each other, so a scalar may be used for any parameter
+    shared by all scenarios. The results match `calculate_credit` for every scenario.
+
+    Args:
+        interest_rates (array_like): Annual interest rates (0-1)
+        total_loans (array_like): Total loan amounts (>0)
+        loan_periods (array_like): Loan periods in years (>0)
+        repayments (array_like | list): Optional (scenario x year) array of scheduled repayments
+            as produced by `repayment_matrix`, or a list of repayment maps
+
+    Returns:
+        tuple: (
+            numpy.ndarray: (scenario x year) table with SCHEDULE_DTYPE,
+            numpy.ndarray: Total paid per scenario,
+            numpy.ndarray: Unused repayments per scenario
+        )
+    """
+    interest_rates, total_loans, loan_periods = numpy.broadcast_arrays(
+        numpy.asarray(interest_rates, dtype=numpy.float64),
+        numpy.asarray(total_loans, dtype=numpy.float64),
+        numpy.asarray(loan_periods))
+    interest_rates = interest_rates.ravel()
+    total_loans = total_loans.ravel()
+    loan_periods = loan_periods.ravel().astype(numpy.int64)
+    scenarios = interest_rates.shape[0]
+
+    if numpy.any((interest_rates < 0) | (interest_rates > 1)):
+        raise ValueError("Interest rate must be between 0 and 1")
+    if numpy.any(total_loans <= 0):
+        raise ValueError("Total loan amount must be greater than 0")
+    if numpy.any(loan_periods <= 0):
+        raise ValueError("Loan period must be greater than 0")
+
+    if repayments is None:
+        repayments = numpy.zeros((scenarios, 0), dtype=numpy.float64)
+    elif isinstance(repayments, (list, tuple)) and any(m is None or isinstance(m, dict) for m in repayments):
+        repayments = repayment_matrix(repayments)
+    repayments = numpy.asarray(repayments, dtype=numpy.float64)
+    if repayments.ndim == 1:
+        repayments = repayments[numpy.newaxis, :]
+    repayments = numpy.broadcast_to(repayments, (scenarios, repayments.shape[1]))
+    if numpy.any(repayments < 0):
+        raise ValueError("Repayment amounts must be ≥0")
+
+    years = int(loan_periods.max()) if scenarios else 0
+    table = numpy.zeros((scenarios, years), dtype=SCHEDULE_DTYPE)
+
+    yearly_repaiment_amount = total_loans / loan_periods
+    remaining_loan = total_loans.copy()
+    total_paid = numpy.zeros(scenarios)
+    total_unused = numpy.zeros(scenarios)
+    active = numpy.ones(scenarios, dtype=numpy.bool_)
+
+    # Same per-year operations as calculate_credit, applied to all still running scenarios.
+    # Finished scenarios only ever get 0.0 added, so the floating point results are identical.
+    for year in range(1, years + 1):
+        active &= year <= loan_periods
+        if not active.any():
+            break
+
+        monthly_payment = (remaining_loan * interest_rates
+                           + numpy.minimum(remaining_loan, yearly_repaiment_amount)) / 12
+        annual_payment = monthly_payment * 12
+        remaining_at_start = remaining_loan
+        remaining_loan = numpy.where(active,
+                                     numpy.maximum(0, remaining_loan - yearly_repaiment_amount),
+                                     remaining_loan)
+        total_paid += numpy.where(active, annual_payment, 0.0)
+
+        if year <= repayments.shape[1]:
+            scheduled = repayments[:, year - 1]
+            actual = numpy.where(active, numpy.minimum(scheduled, remaining_loan), 0.0)
+            remaining_loan = remaining_loan - actual
+            total_paid += actual
+            total_unused += numpy.where(active, scheduled - actual, 0.0)
+
+        row = table[:, year - 1]
+        row['monthly_rate'] = numpy.where(active, monthly_payment, 0.0)
+        row['remaining_loan'] = numpy.where(active, remaining_at_start, 0.0)
+        row['active'] = active
+
+        active &= remaining_loan != 0
+
+    # Scheduled repayments after the last credit year are not used at all
+    last_years = table['active'].sum(axis=1)
+    unused_mask = numpy.arange(1, repayments.shape[1] + 1) > last_years[:, numpy.newaxis]
+    total_unused += numpy.where(unused_mask, repayments, 0.0).sum(axis=1)
+
+    return table, _round_cents(total_paid), _round_cents(total_unused)
+
+
+def schedule_to_dict(table_row: numpy.ndarray) -> Dict[int, Tuple[float, float]]:
+    """
+    Convert one scenario row of a batch table into the `calculate_credit` result shape.
+
+    Args:
+        table_row (numpy.ndarray): Row of a table returned by `calculate_credit_batch`
+
+    Returns:
+        dict: {year: (monthly_rate, remaining_loan)}
+    """
+    return {year: (float(entry['monthly_rate']), float(entry['remaining_loan']))
+            for year, entry in enumerate(table_row, start=1) if entry['active']}
@@ -1,11 +1,17 @@
 
 #!/usr/bin/env python3
+import os
 import sys
 import argparse
 import json
-from collections import defaultdict
+import time
+from collections import OrderedDict, defaultdict, deque
 from typing import Dict
 
+# Magic of the columnar portfolio format (see CreditColumnar), checked here so the command
+# line can tell config formats apart without importing numpy
+COLUMNAR_MAGIC = b"CRDTCOL1"
+
 def calculate_credit(interest_rate, total_loan, loan_period, repayment_map: Dict[int, float] | None = None):
     """
     Calculate the monthly rate for each year of a loan.
@@ -71,13 +77,351 @@ def calculate_credit(interest_rate, total_loan, loan_period, repayment_map: Dict
 
     return yearly_rates, round(total_paid, 2), round(total_unused, 2)
 
-def calculate_multiple_credits(config_file):
+class AmortizationCache:
+    """
+    Bounded LRU cache of `calculate_credit` results keyed by the canonicalized loan parameters.
+
+    Credits that only differ in their start year share one yearly table. Cached results
+    are shared between callers and must not be modified.
+    """
+
+    FILE_VERSION = 2
+
+    def __init__(self, maxsize=4096):
+        if maxsize < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._journal = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(interest_rate, total_loan, loan_period, repayment_map: Dict[int, float]):
+        """Canonical, hashable representation of the loan parameters."""
+        return (float(interest_rate), float(total_loan), int(loan_period),
+                tuple(sorted((int(year), float(amount)) for year, amount in repayment_map.items())))
+
+    def calculate_credit(self, interest_rate, total_loan, loan_period, repayment_map: Dict[int, float]):
+        """Cached version of `calculate_credit` with the same arguments and return value."""
+        key = self.key(interest_rate, total_loan, loan_period, repayment_map)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        entry = calculate_credit(interest_rate, total_loan, loan_period, repayment_map)
+        self._put(key, entry)
+        if self._journal is not None:
+            self._journal.append((key, entry))
+        return entry
+
+    def _put(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def start_journal(self):
+        """Start recording newly calculated entries, used to ship them back from worker processes."""
+        self._journal = []
+
+    def stop_journal(self):
+        """Stop recording and return the entries calculated since `start_journal`."""
+        journal, self._journal = self._journal or [], None
+        return journal
+
+    def merge(self, entries, hits=0, misses=0):
+        """Insert entries and statistics collected by another cache instance."""
+        for key, entry in entries:
+            self._put(key, entry)
+        self.hits += hits
+        self.misses += misses
+
+    def stats(self):
+        """
+        Returns:
+            dict: hits, misses, evictions, current size and hit rate of the cache
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def save(self, path):
+        """Atomically write the cached entries to a JSON file."""
+        entries = [[list(key[:3]) + [[list(repayment) for repayment in key[3]]],
+                    [[[year, monthly, remaining] for year, (monthly, remaining) in yearly_rates.items()], total_paid, unused]]
+                   for key, (yearly_rates, total_paid, unused) in self._entries.items()]
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump({'version': self.FILE_VERSION, 'entries': entries}, f)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path, maxsize=4096):
+        """
+        Create a cache warmed up with the entries of a file written by `save`.
+
+        A missing file or a file of another version results in an empty cache. An unreadable
+        or corrupt file is reported on stderr and results in an empty cache as well.
+        """
+        cache = cls(maxsize)
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            if data.get('version') != cls.FILE_VERSION:
+                return cache
+            entries = []
+            for (interest_rate, total_loan, loan_period, repayments), (rates, total_paid, unused) in data['entries'][-maxsize:]:
+                key = cls.key(interest_rate, total_loan, loan_period, dict(repayments))
+                yearly_rates = {int(year): (float(monthly), float(remaining)) for year, monthly, remaining in rates}
+                entries.append((key, (yearly_rates, float(total_paid), float(unused))))
+        except FileNotFoundError:
+            return cache
+        except (OSError, UnicodeDecodeError, ValueError, TypeError, KeyError, AttributeError) as e:
+            print(f"Warning: ignoring unreadable cache file {path}: {e}", file=sys.stderr)
+            return cache
+        for key, entry in entries:
+            cache._put(key, entry)
+        return cache
+
+def is_columnar(path):
+    """Whether the file starts with the columnar portfolio magic."""
+    with open(path, 'rb') as f:
+        return f.read(len(COLUMNAR_MAGIC)) == COLUMNAR_MAGIC
+
+def iter_credits(config_file, chunk_size=1 << 16):
+    """
+    Read credit configurations one at a time.
+
+    Supports both a JSON array of credits and JSON Lines (one credit object per line).
+    Only a bounded window of the file is kept in memory.
+
+    Args:
+        config_file (str): Path to JSON or JSON Lines file containing credit configurations
+        chunk_size (int): Number of characters read from the file at once
+
+    Yields:
+        dict: Credit configuration
+    """
+    with open(config_file) as f:
+        first = f.read(chunk_size).lstrip()
+        while not first:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            first = chunk.lstrip()
+        f.seek(0)
+
+        if first[0] == '[':
+            yield from _iter_json_array(f, chunk_size)
+        else:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if line:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError as e:
+                        raise ValueError(f"Invalid credit in line {line_number}: {e}") from e
+
+def _iter_json_array(f, chunk_size):
+    """Incrementally decode the elements of a top level JSON array from a file object."""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    eof = False
+    opened = False
+    expect_separator = False
+
+    while True:
+        while position < len(buffer) and buffer[position].isspace():
+            position += 1
+
+        if position == len(buffer):
+            if eof:
+                raise ValueError("Unexpected end of credit list")
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+
+        char = buffer[position]
+        if not opened:
+            if char != '[':
+                raise ValueError("Credit list must be a JSON array")
+            opened = True
+            position += 1
+        elif char == ']':
+            return
+        elif char == ',' and expect_separator:
+            expect_separator = False
+            position += 1
+        elif expect_separator:
+            raise ValueError(f"Expected ',' or ']' in credit list, got {char!r}")
+        else:
+            try:
+                credit, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # Element is cut at the end of the window, read more (growing for huge elements)
+                chunk = f.read(max(chunk_size, len(buffer) - position))
+                eof = not chunk
+                buffer, position = buffer[position:] + chunk, 0
+                continue
+            position = end
+            expect_separator = True
+            yield credit
+
+class _ProgressCounter:
+    """Report the number of processed credits and the throughput to a stream."""
+
+    def __init__(self, stream=sys.stderr, interval=1.0):
+        self.stream = stream
+        self.interval = interval
+        self.count = 0
+        self.started = time.monotonic()
+        self.reported = self.started
+
+    def __call__(self, count=1):
+        self.count += count
+        now = time.monotonic()
+        if now - self.reported >= self.interval:
+            self.reported = now
+            self._report(now, end="\r")
+
+    def close(self):
+        self._report(time.monotonic(), end="\n")
+
+    def _report(self, now, end):
+        elapsed = max(now - self.started, 1e-9)
+        print(f"Processed {self.count} credits ({self.count / elapsed:.0f} credits/s)",
+              end=end, file=self.stream, flush=True)
+
+def _add_credit(credit, aggregated_payments, aggregated_remaining, cache=None):
+    """
+    Fold a single credit into the calendar-year aggregates.
+
+    Returns:
+        float: Contribution of the credit to the total paid across all credits
+    """
+    # Calculate individual credit
+    loan_amount = credit['loan_amount']
+    yearly_rates, total_paid, _ = (calculate_credit if cache is None else cache.calculate_credit)(
+        interest_rate=credit['interest_rate'],
+        total_loan=loan_amount,
+        loan_period=credit['period'],
+        repayment_map={int(k): v for k, v in credit.get('repayment_map', {}).items()}
+    )
+
+    # Offset payments by start year
+    start_year = credit['start_year']
+    for credit_year, monthly_data in yearly_rates.items():
+        calendar_year = start_year + credit_year - 1
+        aggregated_payments[calendar_year] += monthly_data[0]  # Access first element
+        aggregated_remaining[calendar_year] += monthly_data[1]
+
+    # Handle redirected credits by subtracting their loan amount
+    if credit.get('redirected', False):
+        total_paid -= loan_amount
+    return total_paid
+
+def _aggregate_credits(credits):
+    """
+    Aggregate a shard of credits into partial calendar-year sums in a worker process.
+
+    Returns:
+        tuple: (
+            dict: payments by calendar year,
+            dict: remaining by calendar year,
+            float: total paid,
+            tuple | None: (new cache entries, hits, misses) if the worker has a cache
+        )
+    """
+    cache = _worker_cache
+    if cache is not None:
+        hits, misses = cache.hits, cache.misses
+        cache.start_journal()
+
+    aggregated_payments = defaultdict(float)
+    aggregated_remaining = defaultdict(float)
+    total_paid = 0.0
+    for credit in credits:
+        total_paid += _add_credit(credit, aggregated_payments, aggregated_remaining, cache)
+
+    cache_update = None
+    if cache is not None:
+        cache_update = (cache.stop_journal(), cache.hits - hits, cache.misses - misses)
+    return dict(aggregated_payments), dict(aggregated_remaining), total_paid, cache_update
+
+# Cache of the current worker process, see _init_worker
+_worker_cache = None
+
+def _init_worker(cache):
+    global _worker_cache
+    _worker_cache = cache
+
+def _iter_shards(credits, shard_size):
+    """Group an iterable of credits into lists of at most shard_size credits."""
+    shard = []
+    for credit in credits:
+        shard.append(credit)
+        if len(shard) == shard_size:
+            yield shard
+            shard = []
+    if shard:
+        yield shard
+
+def _iter_parallel_partials(credits, workers, shard_size, cache=None):
+    """
+    Aggregate shards of credits in a process pool.
+
+    Partial results are yielded in shard order, so merging them is deterministic.
+    At most 2 * workers shards are in flight to keep memory bounded.
+    Every worker starts with a copy of the given cache.
+    """
+    # Loads multiprocessing, only worth it when workers are requested
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cache,)) as executor:
+        pending = deque()
+        for shard in _iter_shards(credits, shard_size):
+            pending.append((len(shard), executor.submit(_aggregate_credits, shard)))
+            if len(pending) >= 2 * workers:
+                count, future = pending.popleft()
+                yield count, future.result()
+        while pending:
+            count, future = pending.popleft()
+            yield count, future.result()
+
+def calculate_multiple_credits(config_file, progress=None, workers=1, shard_size=1000, cache=None):
     """
     Calculate combined monthly payments across multiple credits from a JSON config.
-    
+
+    Credits are read and aggregated one at a time, so memory use does not grow with
+    the number of credits in the config. With more than one worker, shards of credits
+    are aggregated in a process pool and the partial sums are merged in shard order.
+
     Args:
-        config_file (str): Path to JSON file containing credit configurations
-        
+        config_file (str): Path to JSON array or JSON Lines file containing credit configurations
+        progress (callable): Optional callback invoked with the number of newly processed credits
+        workers (int): Number of worker processes (1 - aggregate in the current process)
+        shard_size (int): Number of credits aggregated by a worker at once
+        cache (AmortizationCache): Optional cache of yearly tables shared by credits with equal parameters
+
     Returns:
         tuple: (
             dict: Aggregated monthly payments by calendar year,
@@ -85,40 +429,144 @@ def calculate_multiple_credits(config_file):
             float: Total paid across all credits
         )
     """
-    with open(config_file) as f:
-        credits = json.load(f)
+    if workers < 1:
+        raise ValueError("Number of workers must be at least 1")
+    if shard_size < 1:
+        raise ValueError("Shard size must be at least 1")
 
     aggregated_payments = defaultdict(float)
     aggregated_remaining = defaultdict(float)
     total_paid_all = 0.0
 
-    for credit in credits:
-        # Calculate individual credit
-        loan_amount = credit['loan_amount']
-        yearly_rates, total_paid, _ = calculate_credit(
-            interest_rate=credit['interest_rate'],
-            total_loan=loan_amount,
-            loan_period=credit['period'],
-            repayment_map={int(k): v for k, v in credit.get('repayment_map', {}).items()}
-        )
-
-        # Offset payments by start year
-        start_year = credit['start_year']
-        for credit_year, monthly_data in yearly_rates.items():
-            calendar_year = start_year + credit_year - 1
-            aggregated_payments[calendar_year] += monthly_data[0]  # Access first element
-            aggregated_remaining[calendar_year] += monthly_data[1]
-
-        # Handle redirected credits by subtracting their loan amount
-        if credit.get('redirected', False):
-            total_paid_all -= loan_amount
-        total_paid_all += total_paid
+    if workers == 1:
+        for credit in iter_credits(config_file):
+            total_paid_all += _add_credit(credit, aggregated_payments, aggregated_remaining, cache)
+            if progress is not None:
+                progress(1)
+    else:
+        partials = _iter_parallel_partials(iter_credits(config_file), workers, shard_size, cache)
+        for count, (payments, remaining, total_paid, cache_update) in partials:
+            for calendar_year, payment in payments.items():
+                aggregated_payments[calendar_year] += payment
+            for calendar_year, left in remaining.items():
+                aggregated_remaining[calendar_year] += left
+            total_paid_all += total_paid
+            if cache is not None:
+                cache.merge(*cache_update)
+            if progress is not None:
+                progress(count)
 
     # Convert defaultdict to regular dict and sort
     ordered_payments = dict(sorted(aggregated_payments.items()))
     ordered_left_total = dict(sorted(aggregated_remaining.items()))
     return ordered_payments, ordered_left_total, round(total_paid_all, 2)
 
+def calculate_portfolio(config_file, progress=None, workers=1, cache=None):
+    """
+    Calculate combined monthly payments of a portfolio in any supported config format.
+
+    Columnar portfolios (see CreditColumnar) are aggregated vectorized, which has no use for
+    workers, cache or progress; these only apply to JSON and JSON Lines configs, which are
+    passed to `calculate_multiple_credits`.
+
+    Returns:
+        tuple: Same as `calculate_multiple_credits`
+    """
+    if is_columnar(config_file):
+        if not __package__:
+            # CreditColumnar imports its siblings relatively, it cannot be loaded without the package
+            raise ImportError("Columnar configs need the Finances package, run python3 -m Finances.CreditCalculator")
+        # Imported on demand, numpy is only needed for columnar portfolios
+        from .CreditColumnar import calculate_columnar_credits
+        return calculate_columnar_credits(config_file)
+    return calculate_multiple_credits(config_file, progress, workers, cache=cache)
+
+def optimize_repayments(interest_rate, total_loan, loan_period, budget, max_yearly=None, first_year=1):
+    """
+    Spread an extra repayment budget over the credit years to minimise the total paid.
+
+    Every regular payment and every used repayment lowers the remaining loan, and the loan
+    is always paid off after loan_period years, so the total paid is
+    total_loan + interest_rate * (sum of the remaining loan at the start of every year).
+    Deductions are clipped at the remaining loan, so the remaining loan at the start of
+    year k + 1 is max(0, total_loan - k * total_loan / loan_period - X_k), where X_k are
+    the repayments made up to year k. It only decreases with X_k, and filling the earliest
+    allowed years first maximises every X_k at once. That greedy allocation is therefore
+    optimal, no search over allocations is needed.
+
+    Args:
+        interest_rate (float): Annual interest rate (0-1)
+        total_loan (float): Total loan amount (>0)
+        loan_period (int): Loan period in years (>0)
+        budget (float): Extra repayment budget (≥0)
+        max_yearly (float): Optional limit of the repayment per year
+        first_year (int): First credit year in which a repayment is allowed
+
+    Returns:
+        tuple: (
+            dict: Optimal repayment map {year: amount},
+            float: Total paid with the repayments,
+            float: Savings compared to no repayments
+        )
+    """
+    if budget < 0:
+        raise ValueError("Repayment budget must be ≥0")
+    if max_yearly is not None and max_yearly < 0:
+        raise ValueError("Yearly repayment limit must be ≥0")
+    _, baseline, _ = calculate_credit(interest_rate, total_loan, loan_period, {})
+
+    yearly_repaiment_amount = total_loan / loan_period
+    remaining_loan = total_loan
+    left = budget
+    repayment_map = {}
+    for year in range(1, loan_period + 1):
+        remaining_loan = max(0, remaining_loan - yearly_repaiment_amount)
+        if year >= first_year and left > 0 and remaining_loan > 0:
+            amount = min(left, remaining_loan)
+            if max_yearly is not None:
+                amount = min(amount, max_yearly)
+            if amount > 0:
+                repayment_map[year] = amount
+                remaining_loan -= amount
+                left -= amount
+        if remaining_loan == 0:
+            break
+
+    _, total_paid, _ = calculate_credit(interest_rate, total_loan, loan_period, repayment_map)
+    return repayment_map, total_paid, round(baseline - total_paid, 2)
+
+def brute_force_repayments(interest_rate, total_loan, loan_period, budget, step, max_yearly=None, first_year=1):
+    """
+    Reference search over all allocations of the budget in multiples of step.
+
+    The number of allocations grows exponentially with the loan period, only use it to
+    verify and benchmark `optimize_repayments` on small instances.
+
+    Returns:
+        tuple: (dict: Best repayment map found, float: Total paid with it)
+    """
+    if step <= 0:
+        raise ValueError("Step must be greater than 0")
+    units = int(budget // step)
+    max_units = units if max_yearly is None else min(units, int(max_yearly // step))
+    years = list(range(max(first_year, 1), loan_period + 1))
+
+    def allocations(index, left):
+        if index == len(years):
+            yield ()
+            return
+        for count in range(min(left, max_units) + 1):
+            for rest in allocations(index + 1, left - count):
+                yield (count,) + rest
+
+    best_map, best_total = {}, None
+    for allocation in allocations(0, units):
+        repayment_map = {year: count * step for year, count in zip(years, allocation) if count}
+        _, total_paid, _ = calculate_credit(interest_rate, total_loan, loan_period, repayment_map)
+        if best_total is None or total_paid < best_total:
+            best_map, best_total = repayment_map, total_paid
+    return best_map, best_total
+
 def _main():
     """
 		Command-line interface to calculate the monthly rate for each year of a loan.
@@ -129,13 +577,25 @@ def _main():
     parser = argparse.ArgumentParser(description="Calculate the monthly rate for each year of a loan.")
 
     # Add subparsers for different credit types
-    subparsers = parser.add_subparsers(description="valid subcommands: single, multi")
+    subparsers = parser.add_subparsers(description="valid subcommands: single, multi, optimize")
     multi = subparsers.add_parser('multi')
     single = subparsers.add_parser('single')
+    optimize = subparsers.add_parser('optimize')
 
     # Configure multi subparser arguments
     multi.add_argument("--config", type=str,
-                       help="Path to JSON config file for multiple credits", required=True)
+                       help="Path to JSON, JSON Lines or columnar (see CreditColumnar) config file for multiple credits",
+                       required=True)
+    multi.add_argument("--progress", action="store_true",
+                       help="Report processed credits and throughput on stderr")
+    multi.add_argument("--workers", type=int, default=1,
+                       help="Number of worker processes aggregating credits in parallel (default: 1)")
+    multi.add_argument("--cache-size", type=int, default=None,
+                       help="Number of cached yearly tables of credits with equal parameters, 0 disables the cache (default: 4096)")
+    multi.add_argument("--cache-file", type=str, default=None,
+                       help="File to load the cache from and store it to after the run")
+    multi.add_argument("--cache-stats", action="store_true",
+                       help="Report cache hit/miss statistics on stderr")
 
     # Configure single subparser arguments
     single.add_argument("--interest-rate", type=float, required=True, help="Interest rate as float (0-1)")
@@ -144,11 +604,74 @@ def _main():
     single.add_argument("--repayment-map", type=str, default="{}",
                         help='JSON string of repayment schedule (e.g. \'{"2": 20000, "5": 10000}\')')
 
+    # Configure optimize subparser arguments
+    optimize.add_argument("--interest-rate", type=float, required=True, help="Interest rate as float (0-1)")
+    optimize.add_argument("--total-loan", type=float, required=True, help="Total loan amount as float (>0)")
+    optimize.add_argument("--loan-period", type=int, required=True, help="Loan period in years (>0)")
+    optimize.add_argument("--budget", type=float, required=True, help="Extra repayment budget to spread over the years")
+    optimize.add_argument("--max-yearly", type=float, default=None, help="Maximal repayment per year")
+    optimize.add_argument("--first-year", type=int, default=1, help="First year in which repayments are allowed (default: 1)")
+    optimize.add_argument("--brute-force-step", type=float, default=None,
+                          help="Benchmark against a brute force search in multiples of this amount (small instances only)")
+
     args = parser.parse_args()
 
-    if hasattr(args, "config"):
+    if hasattr(args, "budget"):
         try:
-            yearly_payments, left_total, total = calculate_multiple_credits(args.config)
+            started = time.perf_counter()
+            repayment_map, total_paid, savings = optimize_repayments(
+                args.interest_rate, args.total_loan, args.loan_period, args.budget, args.max_yearly, args.first_year)
+            optimize_time = time.perf_counter() - started
+
+            for year, amount in repayment_map.items():
+                print(f"Year {year}: Repayment = {amount:.2f}")
+            print(f"Total Paid Over Loan Period: {total_paid:.2f}")
+            print(f"Savings: {savings:.2f}")
+
+            if args.brute_force_step is not None:
+                started = time.perf_counter()
+                _, brute_total = brute_force_repayments(
+                    args.interest_rate, args.total_loan, args.loan_period, args.budget,
+                    args.brute_force_step, args.max_yearly, args.first_year)
+                brute_time = time.perf_counter() - started
+                print(f"Optimizer: {optimize_time * 1000:.3f} ms, Total Paid = {total_paid:.2f}")
+                print(f"Brute force: {brute_time * 1000:.3f} ms, Total Paid = {brute_total:.2f}")
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    elif hasattr(args, "config"):
+        try:
+            if is_columnar(args.config):
+                ignored = [option for option, given in (
+                    ("--workers", args.workers != 1), ("--cache-size", args.cache_size is not None),
+                    ("--cache-file", args.cache_file), ("--cache-stats", args.cache_stats),
+                    ("--progress", args.progress)) if given]
+                if ignored:
+                    print(f"Warning: {', '.join(ignored)} ignored for columnar config {args.config}", file=sys.stderr)
+                yearly_payments, left_total, total = calculate_portfolio(args.config)
+            else:
+                cache_size = 4096 if args.cache_size is None else args.cache_size
+                cache = None
+                if cache_size > 0:
+                    if args.cache_file:
+                        cache = AmortizationCache.load(args.cache_file, cache_size)
+                    else:
+                        cache = AmortizationCache(cache_size)
+
+                progress = _ProgressCounter() if args.progress else None
+                yearly_payments, left_total, total = calculate_portfolio(
+                    args.config, progress, args.workers, cache)
+                if progress is not None:
+                    progress.close()
+
+                if cache is not None:
+                    if args.cache_file:
+                        cache.save(args.cache_file)
+                    if args.cache_stats:
+                        stats = cache.stats()
+                        print(f"Cache: {stats['hits']} hits, {stats['misses']} misses, "
+                              f"{stats['evictions']} evictions, {stats['size']}/{stats['maxsize']} entries, "
+                              f"hit rate {stats['hit_rate']:.1%}", file=sys.stderr)
             for year, rate in yearly_payments.items():
                 print(f"Year {year}: Remaining Loan: {left_total[year]}, Combined Monthly Rate = {rate:.2f}")
             print(f"Total Paid Across All Credits: {total:.2f}")
@@ -178,4 +701,5 @@ def _main():
             sys.exit(1)
 
 if __name__ == "__main__":
+    # Command line execution: python3 -m Finances.CreditCalculator ...
     _main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Binary columnar portfolio format for `calculate_multiple_credits`.
+
+Layout: MAGIC, little endian uint64 header length, JSON header, then every column as a raw
+little endian array aligned to ALIGNMENT bytes. The header maps column names to their dtype,
+offset and length. Repayment maps are stored ragged: the repayments of credit i are
+repayment_year/repayment_amount[repayment_offsets[i]:repayment_offsets[i + 1]].
+"""
+import sys
+import argparse
+import json
+import mmap
+import os
+import struct
+from array import array
+from typing import Dict, Tuple
+
+import numpy
+
+from .CreditBatch import calculate_credit_batch
+from .CreditCalculator import COLUMNAR_MAGIC as MAGIC, is_columnar, iter_credits
+
+ALIGNMENT = 64
+FORMAT_VERSION = 1
+
+# name: (array typecode used while converting, numpy dtype stored in the file)
+COLUMNS = {
+    'interest_rate': ('d', '<f8'),
+    'loan_amount': ('d', '<f8'),
+    'period': ('q', '<i8'),
+    'start_year': ('q', '<i8'),
+    'redirected': ('b', '<i1'),
+    'repayment_offsets': ('q', '<i8'),
+    'repayment_year': ('q', '<i8'),
+    'repayment_amount': ('d', '<f8'),
+}
+
+
+def convert_to_columnar(config_file: str, output_file: str) -> int:
+    """
+    Convert a JSON or JSON Lines credit config into the columnar format.
+
+    Credits are streamed from the config, only the compact column buffers are kept in memory.
+
+    Returns:
+        int: Number of converted credits
+    """
+    columns = {name: array(typecode) for name, (typecode, _) in COLUMNS.items()}
+    columns['repayment_offsets'].append(0)
+    for credit in iter_credits(config_file):
+        columns['interest_rate'].append(credit['interest_rate'])
+        columns['loan_amount'].append(credit['loan_amount'])
+        columns['period'].append(credit['period'])
+        columns['start_year'].append(credit['start_year'])
+        columns['redirected'].append(1 if credit.get('redirected', False) else 0)
+        for year, amount in credit.get('repayment_map', {}).items():
+            columns['repayment_year'].append(int(year))
+            columns['repayment_amount'].append(amount)
+        columns['repayment_offsets'].append(len(columns['repayment_year']))
+
+    header = {'version': FORMAT_VERSION, 'count': len(columns['interest_rate']), 'columns': {}}
+    data = {name: numpy.asarray(values, dtype=COLUMNS[name][1]) for name, values in columns.items()}
+
+    # Offsets depend on the header length, grow the reserved header size until it fits
+    reserved = 256
+    while True:
+        offset = _align(len(MAGIC) + 8 + reserved)
+        for name, values in data.items():
+            header['columns'][name] = {'dtype': COLUMNS[name][1], 'offset': offset, 'length': len(values)}
+            offset = _align(offset + values.nbytes)
+        encoded = json.dumps(header).encode()
+        if len(encoded) <= reserved:
+            break
+        reserved *= 2
+
+    temp_file = f"{output_file}.tmp"
+    with open(temp_file, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', reserved))
+        f.write(encoded.ljust(reserved, b' '))
+        for name, values in data.items():
+            f.seek(header['columns'][name]['offset'])
+            f.write(values.tobytes())
+        f.truncate(offset)
+    os.replace(temp_file, output_file)
+    return header['count']
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class ColumnarPortfolio:
+    """
+    Memory-mapped columnar portfolio, columns are zero-copy numpy views on the file.
+
+    Attributes:
+        count (int): Number of credits
+        interest_rate, loan_amount, period, start_year, redirected,
+        repayment_offsets, repayment_year, repayment_amount (numpy.ndarray): Columns
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a columnar portfolio")
+            header_length, = struct.unpack('<Q', f.read(8))
+            header = json.loads(f.read(header_length))
+        if header['version'] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported columnar portfolio version {header['version']}")
+
+        self.count = header['count']
+        for name, column in header['columns'].items():
+            if column['length']:
+                values = numpy.memmap(path, dtype=column['dtype'], mode='r',
+                                      offset=column['offset'], shape=(column['length'],))
+            else:
+                # Empty regions cannot be mapped
+                values = numpy.zeros(0, dtype=column['dtype'])
+            setattr(self, name, values)
+
+    def repayment_matrix(self, start: int, stop: int, width: int) -> numpy.ndarray:
+        """Dense (credit x year) scheduled repayments of the credits [start, stop) for years 1..width."""
+        begin, end = self.repayment_offsets[start], self.repayment_offsets[stop]
+        counts = numpy.diff(self.repayment_offsets[start:stop + 1])
+        rows = numpy.repeat(numpy.arange(stop - start), counts)
+        years = self.repayment_year[begin:end]
+        valid = (years >= 1) & (years <= width)
+        repayments = numpy.zeros((stop - start, width))
+        repayments[rows[valid], years[valid] - 1] = self.repayment_amount[begin:end][valid]
+        return repayments
+
+
+def calculate_columnar_credits(path: str, chunk_size: int = 50000) -> Tuple[Dict[int, float], Dict[int, float], float]:
+    """
+    Vectorized `calculate_multiple_credits` over a columnar portfolio.
+
+    Credits are evaluated with `calculate_credit_batch` in chunks of chunk_size and summed
+    into calendar years with numpy.bincount.
+
+    Returns:
+        Same tuple as `calculate_multiple_credits`
+    """
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be at least 1")
+
+    portfolio = ColumnarPortfolio(path)
+    if portfolio.count == 0:
+        return {}, {}, 0.0
+
+    first_year = int(portfolio.start_year.min())
+    calendar_years = int((portfolio.start_year + portfolio.period).max()) - first_year
+    payments = numpy.zeros(calendar_years)
+    remaining = numpy.zeros(calendar_years)
+    active_credits = numpy.zeros(calendar_years, dtype=numpy.int64)
+    total_paid_all = 0.0
+
+    for start in range(0, portfolio.count, chunk_size):
+        stop = min(start + chunk_size, portfolio.count)
+        periods = portfolio.period[start:stop]
+        loan_amounts = portfolio.loan_amount[start:stop]
+        table, total_paid, _ = calculate_credit_batch(
+            portfolio.interest_rate[start:stop], loan_amounts, periods,
+            portfolio.repayment_matrix(start, stop, int(periods.max())))
+
+        # Offset payments by start year
+        active = table['active']
+        calendar_index = (portfolio.start_year[start:stop, numpy.newaxis] - first_year
+                          + numpy.arange(table.shape[1]))[active]
+        payments += numpy.bincount(calendar_index, weights=table['monthly_rate'][active],
+                                   minlength=calendar_years)
+        remaining += numpy.bincount(calendar_index, weights=table['remaining_loan'][active],
+                                    minlength=calendar_years)
+        active_credits += numpy.bincount(calendar_index, minlength=calendar_years)
+
+        # Handle redirected credits by subtracting their loan amount
+        total_paid_all += float(total_paid.sum() - loan_amounts[portfolio.redirected[start:stop] != 0].sum())
+
+    # Only calendar years in which at least one credit runs
+    years = numpy.flatnonzero(active_credits)
+    aggregated_payments = {first_year + int(index): float(payments[index]) for index in years}
+    aggregated_remaining = {first_year + int(index): float(remaining[index]) for index in years}
+    return aggregated_payments, aggregated_remaining, round(total_paid_all, 2)
+
+
+if __name__ == '__main__':
+    # Command line execution: python3 -m Finances.CreditColumnar CONFIG OUTPUT
+    parser = argparse.ArgumentParser(description="Convert a JSON or JSON Lines credit config into the columnar format.")
+    parser.add_argument("config", help="JSON or JSON Lines config file")
+    parser.add_argument("output", help="Columnar portfolio file to write")
+    args = parser.parse_args()
+
+    try:
+        count = convert_to_columnar(args.config, args.output)
+        print(f"Converted {count} credits to {args.output}")
+    except (ValueError, KeyError, OSError) as e:
+        print(f"Config error: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,128 @@
+from typing import Dict, List, Sequence, Tuple
+
+
+class CreditSchedule:
+    """
+    Yearly loan schedule that remembers its state at the start of every credit year.
+
+    Changing the repayment of year k only recomputes the years >= k. The results are
+    identical to `calculate_credit` with the same arguments.
+    """
+
+    def __init__(self, interest_rate, total_loan, loan_period, repayment_map: Dict[int, float] | None = None):
+        repayment_map = repayment_map if repayment_map is not None else {}
+        if not (0 <= interest_rate <= 1):
+            raise ValueError("Interest rate must be between 0 and 1")
+        if total_loan <= 0:
+            raise ValueError("Total loan amount must be greater than 0")
+        if loan_period <= 0:
+            raise ValueError("Loan period must be greater than 0")
+        if not isinstance(repayment_map, dict):
+            raise ValueError("repayment_map must be a dictionary")
+        for amount in repayment_map.values():
+            if amount < 0:
+                raise ValueError("Repayment amounts must be ≥0")
+
+        self.interest_rate = interest_rate
+        self.total_loan = total_loan
+        self.loan_period = loan_period
+        self.repayment_map = dict(repayment_map)
+        self._yearly_repaiment_amount = total_loan / loan_period
+
+        # State at the start of credit year k is stored at index k - 1
+        self._remaining: List[float] = [total_loan]
+        self._paid: List[float] = [0.0]
+        self._unused: List[float] = [0.0]
+        self._monthly: List[float] = []
+        self._recompute(1)
+
+    def _advance(self, year, remaining_loan, total_paid, total_unused, repayment_map, record=False):
+        """Run the calculate_credit loop from the given year and state, returns the final state."""
+        last_year = self.loan_period
+        for year in range(year, self.loan_period + 1):
+            monthly_payment = (remaining_loan * self.interest_rate
+                               + min(remaining_loan, self._yearly_repaiment_amount)) / 12
+            annual_payment = monthly_payment * 12
+            remaining_loan = max(0, remaining_loan - self._yearly_repaiment_amount)
+            total_paid += annual_payment
+
+            if year in repayment_map:
+                scheduled = repayment_map[year]
+                actual = min(scheduled, remaining_loan)
+                remaining_loan -= actual
+                total_paid += actual
+                total_unused += scheduled - actual
+
+            if record:
+                self._monthly.append(monthly_payment)
+                self._remaining.append(remaining_loan)
+                self._paid.append(total_paid)
+                self._unused.append(total_unused)
+
+            if remaining_loan == 0:
+                last_year = year
+                break
+        return last_year, total_paid, total_unused
+
+    def _recompute(self, year):
+        del self._monthly[year - 1:]
+        del self._remaining[year:]
+        del self._paid[year:]
+        del self._unused[year:]
+        self._last_year, self._total_paid, self._total_unused = self._advance(
+            year, self._remaining[year - 1], self._paid[year - 1], self._unused[year - 1],
+            self.repayment_map, record=True)
+
+    @staticmethod
+    def _finish(last_year, total_paid, total_unused, repayment_map) -> Tuple[float, float]:
+        # Add unused repayments from future years
+        for year in sorted(repayment_map):
+            if year > last_year:
+                total_unused += repayment_map[year]
+        return round(total_paid, 2), round(total_unused, 2)
+
+    def set_repayment(self, year: int, amount: float):
+        """Change the scheduled repayment of a credit year (0 removes it) and recompute the years >= year."""
+        if amount < 0:
+            raise ValueError("Repayment amounts must be ≥0")
+        if amount:
+            self.repayment_map[year] = amount
+        else:
+            self.repayment_map.pop(year, None)
+        # Years after the end of the loan only count as unused, nothing to recompute
+        first = max(year, 1)
+        if first <= len(self._monthly):
+            self._recompute(first)
+
+    def result(self) -> Tuple[Dict[int, Tuple[float, float]], float, float]:
+        """Same return value as `calculate_credit`."""
+        yearly_rates = {year: (self._monthly[year - 1], self._remaining[year - 1])
+                        for year in range(1, len(self._monthly) + 1)}
+        total_paid, unused = self._finish(self._last_year, self._total_paid, self._total_unused, self.repayment_map)
+        return yearly_rates, total_paid, unused
+
+    def try_variants(self, variants: Sequence[Dict[int, float]]) -> List[Tuple[float, float]]:
+        """
+        Evaluate repayment variants without changing the schedule.
+
+        Every variant overrides some years of the current repayment map ({year: amount}).
+        Its evaluation starts from the stored state at the first changed year, so the
+        prefix shared with the current schedule is not recomputed.
+
+        Returns:
+            list: (total paid, unused repayments) per variant
+        """
+        results = []
+        for changes in variants:
+            for amount in changes.values():
+                if amount < 0:
+                    raise ValueError("Repayment amounts must be ≥0")
+            repayment_map = {**self.repayment_map, **changes}
+            first = max(min(changes, default=len(self._monthly) + 1), 1)
+            if first > len(self._monthly):
+                state = (self._last_year, self._total_paid, self._total_unused)
+            else:
+                state = self._advance(first, self._remaining[first - 1], self._paid[first - 1],
+                                      self._unused[first - 1], repayment_map)
+            results.append(self._finish(*state, repayment_map))
+        return results
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Thin client for FinanceServer with the `single`/`multi` command line of CreditCalculator.
+
+Only standard library modules are imported, so a call costs the interpreter startup and
+one round trip to the already warm server.
+"""
+import sys
+import argparse
+import json
+import os
+import socket
+from typing import Iterable, List
+
+
+def default_socket_path() -> str:
+    """Socket path of FinanceServer and its clients unless one is given."""
+    return os.path.join(os.environ.get('XDG_RUNTIME_DIR', '/tmp'), 'finances.sock')
+
+
+class FinanceClient:
+    """Connection to a FinanceServer, requests may be pipelined with `call_many`."""
+
+    def __init__(self, socket_path: str | None = None):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.socket.connect(socket_path or default_socket_path())
+        except OSError:
+            self.socket.close()
+            raise
+        self.reader = self.socket.makefile('rb')
+        self.next_id = 0
+
+    def close(self):
+        self.reader.close()
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _request(self, method: str, params: dict) -> dict:
+        self.next_id += 1
+        return {'id': self.next_id, 'method': method, 'params': params}
+
+    def call_many(self, calls: Iterable[tuple], batch: bool = False) -> List[dict]:
+        """
+        Send (method, params) calls without waiting for the replies in between.
+
+        Args:
+            calls: (method, params) pairs
+            batch: Send all calls as one batch line instead of one line per call
+
+        Returns:
+            list: Responses in call order, each with 'result' or 'error' and 'latency_ms'
+        """
+        requests = [self._request(method, params) for method, params in calls]
+        if batch:
+            self.socket.sendall(json.dumps(requests).encode() + b"\n")
+            return json.loads(self.reader.readline())
+        self.socket.sendall(b"".join(json.dumps(request).encode() + b"\n" for request in requests))
+        return [json.loads(self.reader.readline()) for _ in requests]
+
+    def call(self, method: str, **params):
+        """Execute a single call and return its result, raise RuntimeError on errors."""
+        response = self.call_many([(method, params)])[0]
+        if 'error' in response:
+            raise RuntimeError(response['error'])
+        return response['result']
+
+
+def _main():
+    """
+    Command-line interface mirroring `python3 -m Finances.CreditCalculator single|multi`, executed by the server.
+
+    The server owns the amortization cache, so --cache-size and --cache-file are options of
+    FinanceServer and are rejected here, as is --progress, which the protocol cannot report.
+    --cache-stats reports the statistics of the server cache.
+    """
+    parser = argparse.ArgumentParser(description="Calculate the monthly rate for each year of a loan on a FinanceServer.")
+    parser.add_argument("--socket", type=str, default=default_socket_path(),
+                        help="Server socket path (default: $XDG_RUNTIME_DIR/finances.sock)")
+    parser.add_argument("--latency", action="store_true", help="Report the server side latency on stderr")
+
+    subparsers = parser.add_subparsers(description="valid subcommands: single, multi")
+    multi = subparsers.add_parser('multi')
+    single = subparsers.add_parser('single')
+
+    multi.add_argument("--config", type=str,
+                       help="Path to JSON or JSON Lines config file for multiple credits", required=True)
+    multi.add_argument("--workers", type=int, default=1,
+                       help="Number of worker processes aggregating credits in parallel (default: 1)")
+    multi.add_argument("--cache-stats", action="store_true",
+                       help="Report hit/miss statistics of the server cache on stderr")
+    # Accepted for command line compatibility with CreditCalculator, but rejected
+    multi.add_argument("--progress", action="store_true", help="Not supported, the server reports no progress")
+    multi.add_argument("--cache-size", type=int, default=None, help="Not supported, set it when starting FinanceServer")
+    multi.add_argument("--cache-file", type=str, default=None, help="Not supported, set it when starting FinanceServer")
+
+    single.add_argument("--interest-rate", type=float, required=True, help="Interest rate as float (0-1)")
+    single.add_argument("--total-loan", type=float, required=True, help="Total loan amount as float (>0)")
+    single.add_argument("--loan-period", type=int, required=True, help="Loan period in years (>0)")
+    single.add_argument("--repayment-map", type=str, default="{}",
+                        help='JSON string of repayment schedule (e.g. \'{"2": 20000, "5": 10000}\')')
+
+    args = parser.parse_args()
+    if hasattr(args, "config"):
+        if args.progress:
+            parser.error("--progress is not supported by the server")
+        if args.cache_size is not None or args.cache_file is not None:
+            parser.error("--cache-size and --cache-file are options of FinanceServer")
+
+    try:
+        if hasattr(args, "config"):
+            # The server resolves the path relative to its own working directory
+            method, params = 'multi', {'config': os.path.realpath(args.config), 'workers': args.workers,
+                                       'cache_stats': args.cache_stats}
+        else:
+            method, params = 'single', {
+                'interest_rate': args.interest_rate,
+                'total_loan': args.total_loan,
+                'loan_period': args.loan_period,
+                'repayment_map': json.loads(args.repayment_map.replace("'", "\"")),
+            }
+        with FinanceClient(args.socket) as client:
+            response = client.call_many([(method, params)])[0]
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.latency:
+        print(f"Server latency: {response['latency_ms']:.3f} ms", file=sys.stderr)
+    if 'error' in response:
+        print(f"{'Config error' if method == 'multi' else 'Error'}: {response['error']}", file=sys.stderr)
+        sys.exit(1)
+
+    result = response['result']
+    if method == 'multi':
+        for year, rate in result['payments'].items():
+            print(f"Year {year}: Remaining Loan: {result['remaining'][year]}, Combined Monthly Rate = {rate:.2f}")
+        print(f"Total Paid Across All Credits: {result['total']:.2f}")
+        stats = result.get('cache')
+        if args.cache_stats and stats is None:
+            print("Cache: disabled on the server", file=sys.stderr)
+        elif args.cache_stats:
+            print(f"Cache: {stats['hits']} hits, {stats['misses']} misses, "
+                  f"{stats['evictions']} evictions, {stats['size']}/{stats['maxsize']} entries, "
+                  f"hit rate {stats['hit_rate']:.1%}", file=sys.stderr)
+    else:
+        for year, rate_data in result['yearly_rates'].items():
+            print(f"Year {year}: Remaining Loan = {rate_data[1]:.2f}, Monthly Rate = {rate_data[0]:.2f}")
+        print(f"Total Paid Over Loan Period: {result['total_paid']:.2f}")
+        print(f"Unused Repayment Capacity: {result['unused']:.2f}")
+
+
+if __name__ == "__main__":
+    _main()
@@ -2,7 +2,33 @@ import math
 import numpy
 
 
+def computeComplexPercentIncomeArray(initialSum, yearlyFee, expectedIncome, years):
+    """
+    Closed form of computeComplexPercentIncome for arrays of scenarios.
+
+    All arguments are broadcast against each other. The yearly fees form the geometric
+    series fee * sum_{i=2..years} q^i = fee * q^2 * (q^(years-1) - 1) / (q - 1), q = 1 + income,
+    evaluated with expm1/log1p to stay accurate for incomes close to 0.
+    """
+    initialSum, yearlyFee, expectedIncome, years = numpy.broadcast_arrays(
+        numpy.asarray(initialSum, dtype=numpy.float64),
+        numpy.asarray(yearlyFee, dtype=numpy.float64),
+        numpy.asarray(expectedIncome, dtype=numpy.float64),
+        numpy.asarray(years))
+    growth = 1 + expectedIncome
+    terms = numpy.maximum(years - 1, 0)
+
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        logGrowth = numpy.log1p(expectedIncome)
+        # sum_{k=0..terms-1} q^k
+        seriesSum = numpy.where(expectedIncome == 0, terms,
+                                numpy.expm1(terms * logGrowth) / expectedIncome)
+    return (initialSum + yearlyFee) * numpy.power(growth, years) + yearlyFee * growth * growth * seriesSum
+
+
 def computeComplexPercentIncome(initialSum, yearlyFee, expectedIncome, years):
+    if numpy.ndim(initialSum) or numpy.ndim(yearlyFee) or numpy.ndim(expectedIncome) or numpy.ndim(years):
+        return computeComplexPercentIncomeArray(initialSum, yearlyFee, expectedIncome, years)
     totalSum = (initialSum + yearlyFee) * math.pow(1 + expectedIncome, years)
     for i in range(2, years + 1):
         totalSum += yearlyFee * math.pow(1 + expectedIncome, i)
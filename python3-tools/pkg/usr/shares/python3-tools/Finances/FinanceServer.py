@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Long-running server keeping the Finances calculators loaded.
+
+Protocol: newline delimited JSON over a Unix domain socket. Every line is either one request
+{"id": ..., "method": ..., "params": {...}} or a JSON array of requests (a batch). The reply is
+one line per request line, in request order, so clients may pipeline any number of lines
+without waiting. Every response carries the server side latency of its request:
+{"id": ..., "result": ..., "latency_ms": ...} or {"id": ..., "error": ..., "latency_ms": ...}.
+
+Requests are executed one at a time in a worker thread, so the event loop keeps accepting
+connections and reading requests while a long calculation runs. All `multi` requests share
+one amortization cache, configured when starting the server.
+"""
+import sys
+import argparse
+import asyncio
+import functools
+import json
+import os
+import socket
+import stat
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+from .CreditCalculator import AmortizationCache, calculate_credit, calculate_portfolio
+from .FinanceClient import default_socket_path
+from .InvestmentCalculator import calculate_investment
+
+# Upper limit of a single request line, batches of many requests arrive on one line
+MAX_LINE_LENGTH = 64 * 1024 * 1024
+
+# Amortization cache of the running server, only used from its request thread (see serve)
+_cache: AmortizationCache | None = None
+
+
+def _single(interest_rate, total_loan, loan_period, repayment_map=None):
+    yearly_rates, total_paid, unused = calculate_credit(
+        interest_rate=interest_rate,
+        total_loan=total_loan,
+        loan_period=loan_period,
+        repayment_map={int(k): v for k, v in (repayment_map or {}).items()})
+    return {'yearly_rates': yearly_rates, 'total_paid': total_paid, 'unused': unused}
+
+
+def _multi(config, workers=1, cache_stats=False):
+    payments, remaining, total = calculate_portfolio(config, workers=workers, cache=_cache)
+    result = {'payments': payments, 'remaining': remaining, 'total': total}
+    if cache_stats:
+        result['cache'] = _cache.stats() if _cache is not None else None
+    return result
+
+
+def _investment(initial_capital, top_up_map=None, interest_rate=0.05, yearly_tax=0.0, length=1):
+    top_up_dict = {}
+    for key, value in (top_up_map or {}).items():
+        if key != 'repeat':
+            top_up_dict[int(key)] = float(value)
+        else:
+            top_up_dict[key] = value['period'], value['amount']
+    total_topped, total_interest = calculate_investment(initial_capital, top_up_dict, interest_rate, yearly_tax, length)
+    return {'total_topped': total_topped, 'total_interest': total_interest}
+
+
+METHODS: Dict[str, Callable] = {
+    'ping': lambda: 'pong',
+    'single': _single,
+    'multi': _multi,
+    'investment': _investment,
+}
+
+
+def handle_request(request) -> dict:
+    """Execute a single request object and build its response."""
+    started = time.perf_counter()
+    request_id = request.get('id') if isinstance(request, dict) else None
+    try:
+        if not isinstance(request, dict):
+            raise ValueError("Request must be a JSON object")
+        method = METHODS.get(request.get('method'))
+        if method is None:
+            raise ValueError(f"Unknown method {request.get('method')!r}, expected one of {sorted(METHODS)}")
+        response = {'id': request_id, 'result': method(**request.get('params', {}))}
+    except Exception as e:
+        response = {'id': request_id, 'error': f"{type(e).__name__}: {e}"}
+    response['latency_ms'] = (time.perf_counter() - started) * 1000
+    return response
+
+
+def handle_line(line: bytes) -> bytes:
+    """Execute a request line (single request or batch) and encode the reply line."""
+    try:
+        requests = json.loads(line)
+    except json.JSONDecodeError as e:
+        return json.dumps({'id': None, 'error': f"Invalid JSON: {e}", 'latency_ms': 0.0}).encode() + b"\n"
+    if isinstance(requests, list):
+        reply = [handle_request(request) for request in requests]
+    else:
+        reply = handle_request(requests)
+    return json.dumps(reply).encode() + b"\n"
+
+
+async def _serve_connection(executor: ThreadPoolExecutor, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    loop = asyncio.get_running_loop()
+    try:
+        while line := await reader.readline():
+            if line.strip():
+                writer.write(await loop.run_in_executor(executor, handle_line, line))
+                await writer.drain()
+    except (ConnectionError, asyncio.LimitOverrunError, ValueError) as e:
+        print(f"Connection closed: {e}", file=sys.stderr)
+    finally:
+        writer.close()
+
+
+def _remove_stale_socket(socket_path: str):
+    """
+    Remove the socket left behind by a server that is gone.
+
+    Raises:
+        FileExistsError: The path is no socket or another server is listening on it
+    """
+    try:
+        mode = os.stat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{socket_path} exists and is no socket")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except ConnectionRefusedError:
+            os.remove(socket_path)
+            return
+    raise FileExistsError(f"Another server is listening on {socket_path}")
+
+
+async def serve(socket_path: str, cache: AmortizationCache | None = None):
+    """
+    Serve requests on a Unix domain socket until cancelled.
+
+    Args:
+        socket_path: Socket to listen on, a stale socket of a previous server is replaced
+        cache: Amortization cache shared by all `multi` requests
+    """
+    global _cache
+    _remove_stale_socket(socket_path)
+    _cache = cache
+    # One request thread keeps requests (and the cache) serialized like before, off the event loop
+    executor = ThreadPoolExecutor(max_workers=1)
+    server = await asyncio.start_unix_server(functools.partial(_serve_connection, executor),
+                                             path=socket_path, limit=MAX_LINE_LENGTH)
+    print(f"Finances server listening on {socket_path}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+if __name__ == '__main__':
+    # Command line execution: python3 -m Finances.FinanceServer [--socket PATH]
+    parser = argparse.ArgumentParser(description="Serve Finances calculations over a Unix domain socket.")
+    parser.add_argument("--socket", type=str, default=default_socket_path(),
+                        help="Unix domain socket path (default: $XDG_RUNTIME_DIR/finances.sock)")
+    parser.add_argument("--cache-size", type=int, default=4096,
+                        help="Number of cached yearly tables shared by all requests, 0 disables the cache (default: 4096)")
+    parser.add_argument("--cache-file", type=str, default=None,
+                        help="File to load the cache from at startup and store it to when the server stops")
+    args = parser.parse_args()
+
+    cache = None
+    if args.cache_size > 0:
+        if args.cache_file:
+            cache = AmortizationCache.load(args.cache_file, args.cache_size)
+        else:
+            cache = AmortizationCache(args.cache_size)
+    try:
+        asyncio.run(serve(args.socket, cache))
+    except KeyboardInterrupt:
+        print("\nServer stopped", file=sys.stderr)
+    except FileExistsError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    if cache is not None and args.cache_file:
+        cache.save(args.cache_file)
@@ -6,36 +6,18 @@ import json
 
 
 
-def calculate_investment(
-    initial_capital: float,
-    top_up_map: Optional[Dict[int | str, float | Tuple[int, float]]] = None,
-    interest_rate: float = 0.05,
-    yearly_tax: float = 0.0,
-    length: int = 1
-) -> Tuple[float, float]:
-    """Calculate investment growth with annual top-ups and interest tax."""
-    top_up_map = top_up_map or {}
-    current_balance = float(initial_capital)
-    total_topped = 0.0
-    total_interest = 0.0
-
-    # Validate input parameters
-    if initial_capital < 0:
-        raise ValueError("Initial capital cannot be negative")
-    if interest_rate < 0:
-        raise ValueError("Interest rate less then 0")
-    if yearly_tax < 0 or yearly_tax > 1:
-        raise ValueError("Yearly tax rate must be between 0 and 1")
-    if length < 1:
-        raise ValueError("Investment period must be at least 1 year")
-
+def _parse_top_up_map(
+    top_up_map: Dict[int | str, float | Tuple[int, float]],
+    length: int
+) -> Dict[int, float]:
+    """Validate the top-up map and return the combined repeated top-ups by period."""
     repeated_topups = {} #repeated topups
     # Validate top-up map contents
     for first, second in top_up_map.items():
         if type(first) is int:
             year, amount = (first, second)
             if year < 0 or year >= length:
-                raise ValueError(f"Top-up year {year} must be within investment period (0 - {period}-1)")
+                raise ValueError(f"Top-up year {year} must be within investment period (0 - {length}-1)")
             if amount < 0:
                 raise ValueError(f"Top-up amount for year {year} cannot be negative")
         elif first == 'repeat':
@@ -50,26 +32,85 @@ def calculate_investment(
             repeated_topups[period] += amount
         else:
             raise ValueError("Top up is either year:amount pair or 'repeat': { period : amount }")
+    return repeated_topups
+
+
+def top_up_schedule(
+    top_up_map: Optional[Dict[int | str, float | Tuple[int, float]]],
+    length: int
+) -> 'numpy.ndarray':
+    """Top-up amount paid at the start of every year of the investment period."""
+    # numpy is imported on first use to keep the command line startup fast
+    import numpy
+
+    top_up_map = top_up_map or {}
+    repeated_topups = _parse_top_up_map(top_up_map, length)
+
+    schedule = numpy.zeros(length)
+    for year, top_up in top_up_map.items():
+        if type(year) is int:
+            schedule[year] += top_up
+    # Repeated top-ups are paid in every year (year + 1) divisible by the period
+    for period, top_up in repeated_topups.items():
+        schedule[period - 1::period] += top_up
+    return schedule
+
+
+def calculate_investment_series(
+    initial_capital: float,
+    top_up_map: Optional[Dict[int | str, float | Tuple[int, float]]] = None,
+    interest_rate: float = 0.05,
+    yearly_tax: float = 0.0,
+    length: int = 1
+) -> Tuple['numpy.ndarray', 'numpy.ndarray', 'numpy.ndarray']:
+    """
+    Calculate the yearly investment trajectory without iterating over the years.
 
-    for year in range(0, length):
-        # Apply top-up at start of year
-        if year in top_up_map:
-            top_up = top_up_map[year]
-            total_topped += top_up
-            current_balance += top_up
+    With the growth factor g = 1 + interest_rate * (1 - yearly_tax) and top-up t_j,
+    the balance at the end of year k is g^(k+1) * (initial_capital + sum_{j<=k} t_j * g^-j).
 
-        for period, top_up in repeated_topups.items():
-            if ((year + 1) % period) == 0:
-                total_topped += top_up
-                current_balance += top_up
+    Returns:
+        Tuple of arrays with one entry per year: (
+            balance at the end of the year,
+            top-ups paid at the start of the year,
+            net interest earned in the year
+        )
+    """
+    # Validate input parameters
+    if initial_capital < 0:
+        raise ValueError("Initial capital cannot be negative")
+    if interest_rate < 0:
+        raise ValueError("Interest rate less then 0")
+    if yearly_tax < 0 or yearly_tax > 1:
+        raise ValueError("Yearly tax rate must be between 0 and 1")
+    if length < 1:
+        raise ValueError("Investment period must be at least 1 year")
+
+    import numpy
 
-        # Calculate and apply interest
-        annual_interest = current_balance * interest_rate
-        net_interest = annual_interest * (1 - yearly_tax)
-        total_interest += net_interest
-        current_balance += net_interest
+    top_ups = top_up_schedule(top_up_map, length)
+    growth = 1 + interest_rate * (1 - yearly_tax)
+    exponents = numpy.arange(length, dtype=numpy.float64)
+    balances = growth ** (exponents + 1) * (float(initial_capital) + numpy.cumsum(top_ups * growth ** -exponents))
 
-    return round(total_topped, 2), round(total_interest, 2)
+    balances_at_start = numpy.empty(length)
+    balances_at_start[0] = initial_capital
+    balances_at_start[1:] = balances[:-1]
+    net_interest = balances - balances_at_start - top_ups
+    return balances, top_ups, net_interest
+
+
+def calculate_investment(
+    initial_capital: float,
+    top_up_map: Optional[Dict[int | str, float | Tuple[int, float]]] = None,
+    interest_rate: float = 0.05,
+    yearly_tax: float = 0.0,
+    length: int = 1
+) -> Tuple[float, float]:
+    """Calculate investment growth with annual top-ups and interest tax."""
+    _, top_ups, net_interest = calculate_investment_series(
+        initial_capital, top_up_map, interest_rate, yearly_tax, length)
+    return round(float(top_ups.sum()), 2), round(float(net_interest.sum()), 2)
 
 if __name__ == '__main__':
     # Command line execution
@@ -86,6 +127,8 @@ if __name__ == '__main__':
                         help='Yearly tax rate on interest (default: 0.0)')
     parser.add_argument('--period', type=int, required=True,
                         help='Investment period in years')
+    parser.add_argument('--series', action='store_true',
+                        help='Print the balance at the end of every year')
 
     try:
         args = parser.parse_args()
@@ -101,13 +144,19 @@ if __name__ == '__main__':
         if not isinstance(top_up_dict, dict):
             raise ValueError("Invalid top_up_map format")
             
-        total_topped, total_interest = calculate_investment(
+        balances, top_ups, net_interest = calculate_investment_series(
             args.initial,
             top_up_dict,
             args.rate,
             args.tax,
             args.period
         )
+        total_topped = round(float(top_ups.sum()), 2)
+        total_interest = round(float(net_interest.sum()), 2)
+
+        if args.series:
+            for year, balance in enumerate(balances):
+                print(f"Year {year}: Balance = ${balance:.2f}")
 
         print(f"Total topped up: ${total_topped:.2f}")
         print(f"Interest accumulated: ${total_interest:.2f}")
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy
+
+from .InvestmentCalculator import top_up_schedule
+
+
+RETURN_MODELS = ('normal', 'lognormal', 'bootstrap')
+
+
+def generate_returns(
+    rng: numpy.random.Generator,
+    model: str,
+    paths: int,
+    length: int,
+    mean: float = 0.05,
+    volatility: float = 0.15,
+    history: Optional[Sequence[float]] = None
+) -> numpy.ndarray:
+    """
+    Draw yearly returns for a number of paths as one (paths x length) array.
+
+    Args:
+        rng: Random generator
+        model: 'normal' - returns ~ N(mean, volatility),
+               'lognormal' - log(1 + return) ~ N(log(1 + mean) - volatility^2 / 2, volatility),
+               'bootstrap' - returns sampled with replacement from history
+        paths: Number of paths
+        length: Number of years per path
+        mean: Expected yearly return of the parametric models
+        volatility: Standard deviation of the parametric models
+        history: Historical yearly returns for the bootstrap model
+    """
+    if model == 'normal':
+        returns = rng.normal(mean, volatility, size=(paths, length))
+        # A year cannot lose more than everything
+        return numpy.maximum(returns, -1.0, out=returns)
+    if model == 'lognormal':
+        log_mean = numpy.log1p(mean) - volatility ** 2 / 2
+        return numpy.expm1(rng.normal(log_mean, volatility, size=(paths, length)))
+    if model == 'bootstrap':
+        history = numpy.asarray(history if history is not None else [], dtype=numpy.float64)
+        if history.size == 0:
+            raise ValueError("Bootstrap model requires a non-empty return history")
+        return rng.choice(history, size=(paths, length), replace=True)
+    raise ValueError(f"Unknown return model {model!r}, expected one of {RETURN_MODELS}")
+
+
+def _simulate_chunk(
+    initial_capital: float,
+    top_ups: numpy.ndarray,
+    returns: numpy.ndarray,
+    yearly_tax: float
+) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """Final balances and maximal drawdowns of a chunk of return paths."""
+    paths, length = returns.shape
+    balance = numpy.full(paths, float(initial_capital))
+    peak = balance.copy()
+    max_drawdown = numpy.zeros(paths)
+
+    for year in range(length):
+        # Apply top-up at start of year, then taxed interest (losses are not taxed)
+        balance += top_ups[year]
+        interest = balance * returns[:, year]
+        balance += numpy.where(interest > 0, interest * (1 - yearly_tax), interest)
+
+        numpy.maximum(peak, balance, out=peak)
+        drawdown = numpy.divide(peak - balance, peak, out=numpy.zeros(paths), where=peak > 0)
+        numpy.maximum(max_drawdown, drawdown, out=max_drawdown)
+
+    return balance, max_drawdown
+
+
+def simulate_investment(
+    initial_capital: float,
+    top_up_map: Optional[Dict[int | str, float | Tuple[int, float]]] = None,
+    yearly_tax: float = 0.0,
+    length: int = 1,
+    model: str = 'normal',
+    mean: float = 0.05,
+    volatility: float = 0.15,
+    history: Optional[Sequence[float]] = None,
+    paths: int = 100000,
+    chunk_size: int = 10000,
+    seed: Optional[int] = None,
+    percentiles: Sequence[float] = (5, 50, 95)
+) -> Dict[str, object]:
+    """
+    Monte Carlo simulation of `calculate_investment` with stochastic yearly returns.
+
+    Paths are simulated in chunks of at most chunk_size, so the (paths x years) return
+    arrays never exceed one chunk. The final balance and maximal drawdown of every path
+    are kept for exact percentiles, so memory still grows with paths (16 bytes per path,
+    about 1.6 MB for the default 100000). The same seed and chunk size give the same results.
+
+    Returns:
+        dict: {
+            'paths': number of simulated paths,
+            'mean_final_balance': mean balance at the end of the period,
+            'final_balance': {percentile: final balance},
+            'max_drawdown': {percentile: maximal relative drawdown (0-1) of a path}
+        }
+    """
+    if initial_capital < 0:
+        raise ValueError("Initial capital cannot be negative")
+    if yearly_tax < 0 or yearly_tax > 1:
+        raise ValueError("Yearly tax rate must be between 0 and 1")
+    if length < 1:
+        raise ValueError("Investment period must be at least 1 year")
+    if paths < 1:
+        raise ValueError("Number of paths must be at least 1")
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be at least 1")
+    if volatility < 0:
+        raise ValueError("Volatility cannot be negative")
+
+    top_ups = top_up_schedule(top_up_map, length)
+    rng = numpy.random.default_rng(seed)
+
+    final_balances = numpy.empty(paths)
+    max_drawdowns = numpy.empty(paths)
+    for start in range(0, paths, chunk_size):
+        stop = min(start + chunk_size, paths)
+        returns = generate_returns(rng, model, stop - start, length, mean, volatility, history)
+        final_balances[start:stop], max_drawdowns[start:stop] = _simulate_chunk(
+            initial_capital, top_ups, returns, yearly_tax)
+
+    return {
+        'paths': paths,
+        'mean_final_balance': float(final_balances.mean()),
+        'final_balance': dict(zip(percentiles, numpy.percentile(final_balances, percentiles).tolist())),
+        'max_drawdown': dict(zip(percentiles, numpy.percentile(max_drawdowns, percentiles).tolist())),
+    }
+
+
+if __name__ == '__main__':
+    # Command line execution: python3 -m Finances.MonteCarlo ...
+    parser = argparse.ArgumentParser(
+        description='Monte Carlo projection of investment growth with stochastic returns'
+    )
+    parser.add_argument('--initial', type=float, required=True,
+                        help='Initial investment capital')
+    parser.add_argument('--top_up_map', type=str, default="{}",
+                        help='Top up map as JSON string (e.g. \'{"2": 5000, "repeat": {"period": 1, "amount": 100}}\')')
+    parser.add_argument('--tax', type=float, default=0.0,
+                        help='Yearly tax rate on interest (default: 0.0)')
+    parser.add_argument('--period', type=int, required=True,
+                        help='Investment period in years')
+    parser.add_argument('--model', choices=RETURN_MODELS, default='normal',
+                        help='Return model (default: normal)')
+    parser.add_argument('--mean', type=float, default=0.05,
+                        help='Expected yearly return (default: 0.05)')
+    parser.add_argument('--volatility', type=float, default=0.15,
+                        help='Standard deviation of yearly returns (default: 0.15)')
+    parser.add_argument('--history', type=str, default=None,
+                        help='JSON list of historical yearly returns for the bootstrap model')
+    parser.add_argument('--paths', type=int, default=100000,
+                        help='Number of simulated paths (default: 100000)')
+    parser.add_argument('--chunk-size', type=int, default=10000,
+                        help='Number of paths simulated at once (default: 10000)')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Random seed for reproducible results')
+
+    try:
+        args = parser.parse_args()
+        top_up_dict_non_converted = json.loads(args.top_up_map.replace("'", "\""))
+        top_up_dict: Dict[int | str, float | Tuple[int, float]] = {}
+        for key, value in top_up_dict_non_converted.items():
+            if key != 'repeat':
+                top_up_dict[int(key)] = float(value)
+            else:
+                top_up_dict[str(key)] = value['period'], value['amount']
+
+        result = simulate_investment(
+            args.initial,
+            top_up_dict,
+            args.tax,
+            args.period,
+            model=args.model,
+            mean=args.mean,
+            volatility=args.volatility,
+            history=json.loads(args.history) if args.history else None,
+            paths=args.paths,
+            chunk_size=args.chunk_size,
+            seed=args.seed
+        )
+
+        print(f"Simulated paths: {result['paths']}")
+        print(f"Mean final balance: ${result['mean_final_balance']:.2f}")
+        for percentile, balance in result['final_balance'].items():
+            print(f"P{percentile} final balance: ${balance:.2f}")
+        for percentile, drawdown in result['max_drawdown'].items():
+            print(f"P{percentile} max drawdown: {drawdown:.1%}")
+
+    except (ValueError, SyntaxError) as e:
+        print(f"Error parsing input: {str(e)}")
+    except Exception as e:
+        print(f"Calculation error: {str(e)}")
@@ -0,0 +1,159 @@
+from typing import Dict, Iterable, Iterator, NamedTuple, Tuple
+
+import numpy
+
+
+class MonthlyPayment(NamedTuple):
+    month: int          # credit month, starting with 1
+    payment: float      # interest + principal paid in the month
+    interest: float
+    principal: float
+    balance: float      # remaining loan at the start of the month
+
+
+class MonthlySchedule:
+    """
+    Month by month amortization of a loan stored in preallocated column arrays.
+
+    The loan follows the `calculate_credit` model at monthly resolution: the principal
+    part is total_loan / (12 * loan_period) per month, interest is charged monthly on the
+    remaining loan with interest_rate / 12, and scheduled repayments of a credit year are
+    applied after its last month.
+
+    Attributes:
+        payment, interest, principal, balance (numpy.ndarray): One entry per credit month
+        total_paid (float): Sum of all payments and used repayments
+        unused (float): Repayments not needed to pay off the loan, including those of later years, like `calculate_credit`
+    """
+
+    def __init__(self, interest_rate, total_loan, loan_period, repayment_map: Dict[int, float] | None = None,
+                 dtype=numpy.float64):
+        repayment_map = repayment_map if repayment_map is not None else {}
+        if not (0 <= interest_rate <= 1):
+            raise ValueError("Interest rate must be between 0 and 1")
+        if total_loan <= 0:
+            raise ValueError("Total loan amount must be greater than 0")
+        if loan_period <= 0:
+            raise ValueError("Loan period must be greater than 0")
+        if not isinstance(repayment_map, dict):
+            raise ValueError("repayment_map must be a dictionary")
+        for amount in repayment_map.values():
+            if amount < 0:
+                raise ValueError("Repayment amounts must be ≥0")
+
+        months = 12 * loan_period
+        monthly_principal = total_loan / months
+
+        # Scheduled repayment applied at the end of every month (only the 12th month of a year has one)
+        scheduled = numpy.zeros(months)
+        for year, amount in repayment_map.items():
+            if 1 <= year <= loan_period:
+                scheduled[12 * year - 1] = amount
+
+        # Every deduction is clipped at the remaining loan, so the balance is the total loan
+        # minus all deductions so far, clipped at 0. No month by month loop is needed.
+        steps = numpy.arange(months)
+        deducted_before = steps * monthly_principal + numpy.concatenate(([0.0], numpy.cumsum(scheduled)[:-1]))
+        balance = numpy.maximum(0.0, total_loan - deducted_before)
+        # Floating point residue of the constant principal steps
+        balance[balance < total_loan * 1e-12] = 0.0
+
+        principal = numpy.minimum(balance, monthly_principal)
+        interest = balance * (interest_rate / 12)
+        after_month = balance - principal
+        actual = numpy.minimum(scheduled, after_month)
+
+        # The loan ends with the first month after which nothing is left
+        paid_off = numpy.flatnonzero(after_month - actual <= total_loan * 1e-12)
+        used_months = int(paid_off[0]) + 1 if paid_off.size else months
+
+        self.payment = numpy.empty(used_months, dtype=dtype)
+        numpy.add(interest[:used_months], principal[:used_months], out=self.payment)
+        self.interest = interest[:used_months].astype(dtype)
+        self.principal = principal[:used_months].astype(dtype)
+        self.balance = balance[:used_months].astype(dtype)
+
+        used_repayments = float(actual[:used_months].sum())
+        self.total_paid = round(float(interest[:used_months].sum() + principal[:used_months].sum())
+                                + used_repayments, 2)
+        # Like calculate_credit, repayments of years after the loan period count as unused
+        self.unused = round(float(sum(amount for year, amount in repayment_map.items() if year >= 1))
+                            - used_repayments, 2)
+
+    def __len__(self):
+        return len(self.payment)
+
+    def __iter__(self) -> Iterator[MonthlyPayment]:
+        return self.rows()
+
+    def rows(self, start: int = 0, stop: int | None = None) -> Iterator[MonthlyPayment]:
+        """Lazily iterate over the months [start, stop) without materializing all rows."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        for i in range(start, stop):
+            yield MonthlyPayment(i + 1, float(self.payment[i]), float(self.interest[i]),
+                                 float(self.principal[i]), float(self.balance[i]))
+
+    def yearly(self) -> Dict[int, Tuple[float, float]]:
+        """
+        Aggregate the schedule into the `calculate_credit` return shape.
+
+        Returns:
+            dict: {year: (average monthly payment, remaining loan at the start of the year)}
+        """
+        years = (len(self) + 11) // 12
+        padded = numpy.zeros(12 * years)
+        padded[:len(self)] = self.payment
+        monthly_rates = padded.reshape(years, 12).sum(axis=1) / 12
+        return {year + 1: (float(monthly_rates[year]), float(self.balance[12 * year])) for year in range(years)}
+
+
+def aggregate_monthly_payments(credits: Iterable[dict]) -> Tuple[int, numpy.ndarray, numpy.ndarray]:
+    """
+    Aggregate monthly schedules of many credits by calendar month.
+
+    Only the schedule of the current credit is alive at any time, the aggregates are
+    arrays over calendar months grown on demand.
+
+    Args:
+        credits (iterable): Credit configurations as accepted by `calculate_multiple_credits`
+
+    Returns:
+        tuple: (
+            int: calendar year of the first month (January),
+            numpy.ndarray: combined payments by calendar month,
+            numpy.ndarray: combined remaining loans by calendar month
+        )
+    """
+    first_year = None
+    payments = numpy.zeros(0)
+    balances = numpy.zeros(0)
+
+    for credit in credits:
+        schedule = MonthlySchedule(
+            credit['interest_rate'],
+            credit['loan_amount'],
+            credit['period'],
+            {int(k): v for k, v in credit.get('repayment_map', {}).items()})
+        start_year = credit['start_year']
+
+        if first_year is None:
+            first_year = start_year
+        if start_year < first_year:
+            shift = 12 * (first_year - start_year)
+            payments = numpy.concatenate((numpy.zeros(shift), payments))
+            balances = numpy.concatenate((numpy.zeros(shift), balances))
+            first_year = start_year
+
+        offset = 12 * (start_year - first_year)
+        end = offset + len(schedule)
+        if end > len(payments):
+            size = max(end, 2 * len(payments))
+            payments = numpy.concatenate((payments, numpy.zeros(size - len(payments))))
+            balances = numpy.concatenate((balances, numpy.zeros(size - len(balances))))
+        payments[offset:end] += schedule.payment
+        balances[offset:end] += schedule.balance
+
+    if first_year is None:
+        return 0, payments, balances
+    used = len(numpy.trim_zeros(payments, 'b'))
+    return first_year, payments[:used], balances[:used]
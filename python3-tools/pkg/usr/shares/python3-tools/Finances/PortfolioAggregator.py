@@ -0,0 +1,143 @@
+from typing import Dict, Iterable, NamedTuple, Tuple
+
+import numpy
+
+from .CreditCalculator import calculate_credit
+
+
+class PortfolioSnapshot(NamedTuple):
+    first_year: int             # calendar year of index 0
+    payments: numpy.ndarray     # combined monthly payments by calendar year
+    remaining: numpy.ndarray    # combined remaining loans by calendar year
+    active: numpy.ndarray       # number of running credits by calendar year
+    total_paid: float
+
+    def to_dicts(self) -> Tuple[Dict[int, float], Dict[int, float], float]:
+        """Convert into the sorted dicts returned by `calculate_multiple_credits`."""
+        years = numpy.flatnonzero(self.active)
+        payments = {self.first_year + int(index): float(self.payments[index]) for index in years}
+        remaining = {self.first_year + int(index): float(self.remaining[index]) for index in years}
+        return payments, remaining, round(self.total_paid, 2)
+
+
+class PortfolioAggregator:
+    """
+    Running calendar-year aggregates of a changing credit portfolio.
+
+    Credits use the config format of `calculate_multiple_credits`. Adding or removing a credit
+    computes its yearly table once and updates the per-year arrays in place, so both take
+    O(period) time independent of the portfolio size. The arrays grow in both directions by
+    doubling when a credit runs outside of the covered calendar years.
+
+    Attributes:
+        count (int): Number of credits in the portfolio
+        total_paid (float): Total paid across all credits, unrounded
+    """
+
+    def __init__(self, cache=None, capacity=64):
+        """
+        Args:
+            cache (AmortizationCache): Optional cache of yearly tables shared by credits with equal parameters
+            capacity (int): Number of calendar years allocated up front (≥1)
+        """
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1")
+        self.cache = cache
+        self.first_year = None
+        self.count = 0
+        self.total_paid = 0.0
+        self._payments = numpy.zeros(capacity)
+        self._remaining = numpy.zeros(capacity)
+        self._active = numpy.zeros(capacity, dtype=numpy.int64)
+
+    def __len__(self):
+        return self.count
+
+    def _schedule(self, credit):
+        """Yearly payments and remaining loan of a credit plus its contribution to the total paid."""
+        loan_amount = credit['loan_amount']
+        yearly_rates, total_paid, _ = (calculate_credit if self.cache is None else self.cache.calculate_credit)(
+            interest_rate=credit['interest_rate'],
+            total_loan=loan_amount,
+            loan_period=credit['period'],
+            repayment_map={int(k): v for k, v in credit.get('repayment_map', {}).items()}
+        )
+        rates = numpy.array(list(yearly_rates.values()), dtype=numpy.float64).reshape(-1, 2)
+        # Handle redirected credits by subtracting their loan amount
+        if credit.get('redirected', False):
+            total_paid -= loan_amount
+        return rates[:, 0], rates[:, 1], total_paid
+
+    def _reserve(self, start_year, stop_year):
+        """Make the arrays cover the calendar years [start_year, stop_year)."""
+        if self.first_year is None:
+            self.first_year = start_year
+        begin = min(self.first_year, start_year)
+        end = max(self.first_year + len(self._active), stop_year)
+        if begin == self.first_year and end == self.first_year + len(self._active):
+            return
+
+        capacity = len(self._active)
+        while capacity < end - begin:
+            capacity *= 2
+        # Keep spare room on the side that had to grow
+        if begin < self.first_year:
+            begin = end - capacity
+        shift = self.first_year - begin
+        for name in ('_payments', '_remaining', '_active'):
+            old = getattr(self, name)
+            new = numpy.zeros(capacity, dtype=old.dtype)
+            new[shift:shift + len(old)] = old
+            setattr(self, name, new)
+        self.first_year = begin
+
+    def add(self, credit):
+        """Add a credit to the aggregates."""
+        payments, remaining, total_paid = self._schedule(credit)
+        start_year = credit['start_year']
+        self._reserve(start_year, start_year + len(payments))
+        index = start_year - self.first_year
+        self._payments[index:index + len(payments)] += payments
+        self._remaining[index:index + len(payments)] += remaining
+        self._active[index:index + len(payments)] += 1
+        self.total_paid += total_paid
+        self.count += 1
+
+    def remove(self, credit):
+        """
+        Remove a previously added credit from the aggregates.
+
+        Raises:
+            ValueError: If the credit cannot be part of the portfolio
+        """
+        payments, remaining, total_paid = self._schedule(credit)
+        index = credit['start_year'] - (self.first_year if self.first_year is not None else 0)
+        years = slice(index, index + len(payments))
+        if self.count == 0 or index < 0 or years.stop > len(self._active) or not self._active[years].all():
+            raise ValueError("Credit is not part of the portfolio")
+
+        self._payments[years] -= payments
+        self._remaining[years] -= remaining
+        self._active[years] -= 1
+        # Drop floating point residue of years without credits
+        ended = self._active[years] == 0
+        self._payments[years][ended] = 0.0
+        self._remaining[years][ended] = 0.0
+        self.count -= 1
+        self.total_paid = self.total_paid - total_paid if self.count else 0.0
+
+    def extend(self, credits: Iterable[dict]):
+        """Add every credit of an iterable, e.g. `iter_credits(config_file)`."""
+        for credit in credits:
+            self.add(credit)
+
+    def snapshot(self) -> PortfolioSnapshot:
+        """Copy of the aggregates trimmed to the calendar years with running credits."""
+        years = numpy.flatnonzero(self._active)
+        if not years.size:
+            empty = numpy.zeros(0)
+            return PortfolioSnapshot(self.first_year or 0, empty, empty, numpy.zeros(0, dtype=numpy.int64), 0.0)
+        start, stop = int(years[0]), int(years[-1]) + 1
+        return PortfolioSnapshot(self.first_year + start, self._payments[start:stop].copy(),
+                                 self._remaining[start:stop].copy(), self._active[start:stop].copy(),
+                                 self.total_paid)
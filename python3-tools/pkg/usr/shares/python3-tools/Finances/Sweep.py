@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+import sys
+import argparse
+import csv
+import itertools
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+import numpy
+
+from .CreditBatch import calculate_credit_batch
+from .InvestmentCalculator import calculate_investment_series
+
+CREDIT_COLUMNS = ('interest_rate', 'total_loan', 'loan_period',
+                  'total_paid', 'unused_repayments', 'years', 'first_monthly_rate')
+INVESTMENT_COLUMNS = ('interest_rate', 'length', 'initial_capital', 'yearly_tax',
+                      'total_topped', 'total_interest', 'final_balance')
+
+
+def parse_range(value: str, type_=float) -> List:
+    """
+    Parse a parameter range from the command line.
+
+    Accepts a single value ("0.05"), a comma separated list ("5,10,20") or an
+    inclusive range "start:stop:step" ("0.01:0.1:0.01").
+    """
+    if ':' in value:
+        parts = value.split(':')
+        if len(parts) != 3:
+            raise ValueError(f"Range {value!r} must have the form start:stop:step")
+        start, stop, step = (type_(part) for part in parts)
+        if step <= 0:
+            raise ValueError(f"Range step must be greater than 0: {value!r}")
+        # Half a step of tolerance keeps the inclusive stop despite floating point steps
+        count = int(numpy.floor((stop - start) / step + 0.5)) + 1
+        if count < 1:
+            raise ValueError(f"Range {value!r} is empty")
+        return [type_(start + i * step) for i in range(count)]
+    return [type_(item) for item in value.split(',')]
+
+
+def _credit_chunk(scenarios: Sequence[Tuple[float, float, int]]) -> Dict[str, numpy.ndarray]:
+    """Evaluate a chunk of (interest_rate, total_loan, loan_period) scenarios."""
+    interest_rates, total_loans, loan_periods = (numpy.array(column) for column in zip(*scenarios))
+    table, total_paid, unused = calculate_credit_batch(interest_rates, total_loans, loan_periods)
+    return {
+        'interest_rate': interest_rates,
+        'total_loan': total_loans,
+        'loan_period': loan_periods,
+        'total_paid': total_paid,
+        'unused_repayments': unused,
+        'years': table['active'].sum(axis=1),
+        'first_monthly_rate': table['monthly_rate'][:, 0],
+    }
+
+
+def _investment_chunk(args: Tuple[Sequence[Tuple[float, int, float, float]], Dict]) -> Dict[str, numpy.ndarray]:
+    """Evaluate a chunk of (interest_rate, length, initial_capital, yearly_tax) scenarios."""
+    scenarios, top_up_map = args
+    columns = {name: numpy.empty(len(scenarios)) for name in INVESTMENT_COLUMNS}
+    for i, (interest_rate, length, initial_capital, yearly_tax) in enumerate(scenarios):
+        balances, top_ups, net_interest = calculate_investment_series(
+            initial_capital, top_up_map, interest_rate, yearly_tax, length)
+        columns['interest_rate'][i] = interest_rate
+        columns['length'][i] = length
+        columns['initial_capital'][i] = initial_capital
+        columns['yearly_tax'][i] = yearly_tax
+        columns['total_topped'][i] = round(float(top_ups.sum()), 2)
+        columns['total_interest'][i] = round(float(net_interest.sum()), 2)
+        columns['final_balance'][i] = round(float(balances[-1]), 2)
+    columns['length'] = columns['length'].astype(numpy.int64)
+    return columns
+
+
+def _chunks(iterable: Iterable, chunk_size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, chunk_size)):
+        yield chunk
+
+
+def run_sweep(function, tasks: Iterable, workers: int = 1) -> Iterator[Dict[str, numpy.ndarray]]:
+    """
+    Apply function to every task, in a process pool if workers > 1.
+
+    Results are yielded in task order. At most 2 * workers tasks are in flight.
+    """
+    if workers < 1:
+        raise ValueError("Number of workers must be at least 1")
+    if workers == 1:
+        yield from map(function, tasks)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for task in tasks:
+            pending.append(executor.submit(function, task))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+class CsvWriter:
+    """Write result chunks as CSV rows, one bulk write per chunk."""
+
+    def __init__(self, path: str, columns: Sequence[str]):
+        self.columns = columns
+        self.file = open(path, 'w', newline='') if path != '-' else sys.stdout
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(columns)
+
+    def write(self, chunk: Dict[str, numpy.ndarray]):
+        self.writer.writerows(zip(*(chunk[name].tolist() for name in self.columns)))
+
+    def close(self):
+        if self.file is not sys.stdout:
+            self.file.close()
+
+
+class ParquetWriter:
+    """Write result chunks as row groups of a Parquet file, requires pyarrow."""
+
+    def __init__(self, path: str, columns: Sequence[str]):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ValueError("Parquet output requires the pyarrow package") from e
+        self.pyarrow = pyarrow
+        self.columns = columns
+        self.path = path
+        self.writer = None
+
+    def write(self, chunk: Dict[str, numpy.ndarray]):
+        table = self.pyarrow.table({name: chunk[name] for name in self.columns})
+        if self.writer is None:
+            self.writer = self.pyarrow.parquet.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def _open_writer(path: str, output_format: str | None, columns: Sequence[str]):
+    if output_format is None:
+        output_format = 'parquet' if path.endswith('.parquet') else 'csv'
+    if output_format == 'parquet':
+        return ParquetWriter(path, columns)
+    return CsvWriter(path, columns)
+
+
+def _main():
+    """
+    Command-line interface evaluating the cartesian product of parameter ranges in one process.
+
+    Ranges are given as single values, comma separated lists or start:stop:step.
+    """
+    parser = argparse.ArgumentParser(description="Evaluate credit or investment scenarios over parameter grids.")
+    subparsers = parser.add_subparsers(dest='command', required=True, description="valid subcommands: credit, investment")
+    credit = subparsers.add_parser('credit')
+    investment = subparsers.add_parser('investment')
+
+    credit.add_argument("--rate", type=str, required=True, help="Interest rates (0-1), e.g. 0.01:0.1:0.01")
+    credit.add_argument("--amount", type=str, required=True, help="Total loan amounts (>0)")
+    credit.add_argument("--period", type=str, required=True, help="Loan periods in years (>0)")
+
+    investment.add_argument("--rate", type=str, required=True, help="Annual interest rates")
+    investment.add_argument("--period", type=str, required=True, help="Investment periods in years")
+    investment.add_argument("--initial", type=str, required=True, help="Initial investment capitals")
+    investment.add_argument("--tax", type=str, default="0", help="Yearly tax rates on interest (default: 0)")
+    investment.add_argument("--top_up_map", type=str, default="{}",
+                            help='Top up map shared by all scenarios (e.g. \'{"2": 5000, "repeat": {"period": 1, "amount": 100}}\')')
+
+    for subparser in (credit, investment):
+        subparser.add_argument("--output", type=str, default="-", help="Output file, '-' for CSV on stdout (default: -)")
+        subparser.add_argument("--format", choices=("csv", "parquet"), default=None,
+                               help="Output format (default: from the output file extension)")
+        subparser.add_argument("--workers", type=int, default=1, help="Number of worker processes (default: 1)")
+        subparser.add_argument("--chunk-size", type=int, default=10000, help="Scenarios per work unit (default: 10000)")
+
+    args = parser.parse_args()
+
+    try:
+        if args.chunk_size < 1:
+            raise ValueError("Chunk size must be at least 1")
+
+        if args.command == 'credit':
+            grid = itertools.product(parse_range(args.rate), parse_range(args.amount), parse_range(args.period, int))
+            function, columns = _credit_chunk, CREDIT_COLUMNS
+            tasks = _chunks(grid, args.chunk_size)
+        else:
+            top_up_dict = {}
+            for key, value in json.loads(args.top_up_map.replace("'", "\"")).items():
+                if key != 'repeat':
+                    top_up_dict[int(key)] = float(value)
+                else:
+                    top_up_dict[key] = value['period'], value['amount']
+            grid = itertools.product(parse_range(args.rate), parse_range(args.period, int),
+                                     parse_range(args.initial), parse_range(args.tax))
+            function, columns = _investment_chunk, INVESTMENT_COLUMNS
+            tasks = ((chunk, top_up_dict) for chunk in _chunks(grid, args.chunk_size))
+
+        writer = _open_writer(args.output, args.format, columns)
+        started = time.monotonic()
+        count = 0
+        try:
+            for chunk in run_sweep(function, tasks, args.workers):
+                writer.write(chunk)
+                count += len(chunk[columns[0]])
+        finally:
+            writer.close()
+        elapsed = max(time.monotonic() - started, 1e-9)
+        print(f"Computed {count} scenarios in {elapsed:.2f}s ({count / elapsed:.0f} scenarios/s)", file=sys.stderr)
+
+    except (ValueError, json.JSONDecodeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    _main()
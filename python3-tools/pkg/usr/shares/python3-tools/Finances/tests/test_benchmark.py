@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+from ..Benchmark import benchmark_cases, measure, compare_results, run_benchmarks
+
+class TestBenchmark(unittest.TestCase):
+    def test_measure(self):
+        ops_per_sec, peak_memory = measure(lambda: [0] * 10000, min_time=0.01, repeat=1)
+        self.assertGreater(ops_per_sec, 0)
+        self.assertGreaterEqual(peak_memory, 10000 * 8)
+
+    def test_compare_results(self):
+        baseline = {"benchmarks": {
+            "a": {"ops_per_sec": 100.0, "peak_memory": 1000},
+            "b": {"ops_per_sec": 100.0, "peak_memory": 1000},
+        }}
+        results = {"benchmarks": {
+            "a": {"ops_per_sec": 85.0, "peak_memory": 1400},
+            "b": {"ops_per_sec": 70.0, "peak_memory": 2000},
+            "new": {"ops_per_sec": 1.0, "peak_memory": 1},
+        }}
+        self.assertEqual(compare_results(results, baseline, 0.2, 0.5), [
+            "b: 70.0 ops/s, baseline 100.0 ops/s",
+            "b: peak memory 2000 bytes, baseline 1000 bytes",
+        ])
+        self.assertEqual(len(compare_results(results, baseline, 0.1, 0.3)), 4)
+
+    def test_run_selection(self):
+        results = run_benchmarks(min_time=0.001, repeat=1, selection="calculate_credit[period=10]")
+        self.assertEqual(list(results["benchmarks"]), ["calculate_credit[period=10]"])
+        self.assertEqual(compare_results(results, results), [])
+
+    def test_cases_are_prepared_lazily(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cases = {name: (params, prepare) for name, params, prepare in benchmark_cases(directory)}
+            self.assertEqual(os.listdir(directory), [])
+
+            params, prepare = cases["calculate_multiple_credits[credits=100]"]
+            prepare()
+            self.assertEqual(len(os.listdir(directory)), 1)
+            self.assertGreater(params["file_size"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
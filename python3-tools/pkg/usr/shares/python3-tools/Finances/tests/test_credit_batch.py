@@ -0,0 +1,82 @@
+import unittest
+import random
+import numpy
+from ..CreditCalculator import calculate_credit
+from ..CreditBatch import calculate_credit_batch, repayment_matrix, schedule_to_dict, _round_cents
+
+class TestCreditBatch(unittest.TestCase):
+    def assertMatchesScalar(self, interest_rates, total_loans, loan_periods, repayment_maps):
+        """Compare every batch scenario against calculate_credit"""
+        table, total_paid, unused = calculate_credit_batch(
+            interest_rates, total_loans, loan_periods, repayment_maps)
+        for i in range(len(interest_rates)):
+            yearly_rates, expected_paid, expected_unused = calculate_credit(
+                interest_rates[i], total_loans[i], loan_periods[i], repayment_maps[i])
+            batch_rates = schedule_to_dict(table[i])
+            self.assertEqual(batch_rates.keys(), yearly_rates.keys())
+            for year, (monthly_rate, remaining) in yearly_rates.items():
+                self.assertAlmostEqual(batch_rates[year][0], monthly_rate, places=6)
+                self.assertAlmostEqual(batch_rates[year][1], remaining, places=6)
+            self.assertEqual(total_paid[i], expected_paid)
+            self.assertAlmostEqual(unused[i], expected_unused, places=2)
+
+    def test_matches_scalar_cases(self):
+        """Test the scalar unit test scenarios in one batch"""
+        self.assertMatchesScalar(
+            [0.05, 0.0, 0.1, 0.05, 0.05],
+            [100000, 100000, 100000, 100000, 100000],
+            [10, 5, 10, 10, 10],
+            [{y: 10000 for y in range(1, 11)},
+             {},
+             {1: 100000},
+             {1: 110000},
+             {2: 10000, 4: 10000, 6: 10000, 8: 10000, 10: 10000}])
+
+    def test_matches_scalar_random(self):
+        """Test random scenarios with repayments after the end of the loan"""
+        rng = random.Random(42)
+        count = 200
+        periods = [rng.randint(1, 30) for _ in range(count)]
+        repayment_maps = [{rng.randint(1, 35): rng.choice([1000, 5000, 50000]) for _ in range(rng.randint(0, 4))}
+                          for _ in range(count)]
+        self.assertMatchesScalar(
+            [rng.uniform(0, 0.2) for _ in range(count)],
+            [rng.uniform(1000, 500000) for _ in range(count)],
+            periods,
+            repayment_maps)
+
+    def test_broadcast_scalars(self):
+        """Test a rate sweep over a single loan"""
+        rates = numpy.linspace(0, 0.1, 11)
+        table, total_paid, unused = calculate_credit_batch(rates, 100000, 5)
+        self.assertEqual(table.shape, (11, 5))
+        self.assertTrue(table['active'].all())
+        self.assertAlmostEqual(total_paid[0], 100000.00, places=2)
+        self.assertTrue(numpy.all(numpy.diff(total_paid) > 0))
+        self.assertTrue(numpy.all(unused == 0))
+
+    def test_repayment_matrix(self):
+        """Test dense repayment conversion"""
+        repayments = repayment_matrix([{2: 10, "4": 20}, None, {0: 5}], width=5)
+        self.assertEqual(repayments.shape, (3, 5))
+        self.assertEqual(repayments[0].tolist(), [0, 10, 0, 20, 0])
+        self.assertEqual(repayments[1].sum(), 0)
+        self.assertEqual(repayments[2].sum(), 0)
+
+    def test_round_cents_matches_round(self):
+        values = numpy.array([51699.075, 0.285, 1.005, 2.675, 1234.5678, -3.125])
+        self.assertEqual(_round_cents(values).tolist(), [round(value, 2) for value in values.tolist()])
+
+    def test_invalid_input(self):
+        """Test invalid scenarios are rejected like in calculate_credit"""
+        with self.assertRaises(ValueError):
+            calculate_credit_batch([0.05, 1.1], 100000, 10)
+        with self.assertRaises(ValueError):
+            calculate_credit_batch(0.05, [100000, -1], 10)
+        with self.assertRaises(ValueError):
+            calculate_credit_batch(0.05, 100000, [10, 0])
+        with self.assertRaises(ValueError):
+            calculate_credit_batch(0.05, 100000, 10, [{1: -100}])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,10 @@ import unittest
 import tempfile
 import os
 import json
-from ..CreditCalculator import calculate_credit, calculate_multiple_credits
+import io
+import contextlib
+from ..CreditCalculator import calculate_credit, calculate_multiple_credits, iter_credits, AmortizationCache
+from ..CreditCalculator import optimize_repayments, brute_force_repayments
 
 class TestCreditCalculator(unittest.TestCase):
     def test_normal_case(self):
@@ -228,6 +231,159 @@ class TestCreditCalculator(unittest.TestCase):
         finally:
             os.remove(temp_path)
 
+    def test_json_lines_credits(self):
+        """Test JSON Lines config gives the same aggregates as a JSON array"""
+        config = [
+            {"loan_amount": 100000, "period": 2, "interest_rate": 0.1, "start_year": 2024,
+             "repayment_map": {"1": 25000}},
+            {"loan_amount": 25000, "period": 2, "interest_rate": 0.05, "start_year": 2025,
+             "redirected": True}
+        ]
+
+        with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
+            json.dump(config, f)
+            array_path = f.name
+        with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
+            f.write("\n".join(json.dumps(credit) for credit in config) + "\n\n")
+            lines_path = f.name
+
+        try:
+            processed = []
+            self.assertEqual(calculate_multiple_credits(lines_path, processed.append),
+                             calculate_multiple_credits(array_path))
+            self.assertEqual(sum(processed), 2)
+        finally:
+            os.remove(array_path)
+            os.remove(lines_path)
+
+    def test_parallel_credits(self):
+        """Test sharded aggregation in worker processes matches the serial result"""
+        config = [{"loan_amount": 10000 * (i + 1), "period": 1 + i % 7, "interest_rate": 0.01 * (i % 5),
+                   "start_year": 2020 + i % 4, "repayment_map": {"1": 1000 * i},
+                   "redirected": i % 3 == 0} for i in range(50)]
+
+        with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
+            json.dump(config, f)
+            temp_path = f.name
+
+        try:
+            payments, remaining, total = calculate_multiple_credits(temp_path)
+            processed = []
+            parallel = calculate_multiple_credits(temp_path, processed.append, workers=3, shard_size=4)
+            self.assertEqual(sum(processed), 50)
+            self.assertEqual(parallel[0].keys(), payments.keys())
+            for year in payments:
+                self.assertAlmostEqual(parallel[0][year], payments[year], places=6)
+                self.assertAlmostEqual(parallel[1][year], remaining[year], places=6)
+            self.assertAlmostEqual(parallel[2], total, places=2)
+            # Shards are merged in order, repeated runs give identical results
+            self.assertEqual(calculate_multiple_credits(temp_path, workers=3, shard_size=4), parallel)
+        finally:
+            os.remove(temp_path)
+
+    def test_amortization_cache(self):
+        """Test cached results, LRU eviction and statistics"""
+        cache = AmortizationCache(maxsize=2)
+        first = cache.calculate_credit(0.05, 100000, 10, {2: 10000})
+        self.assertEqual(first, calculate_credit(0.05, 100000, 10, {2: 10000}))
+        self.assertIs(cache.calculate_credit(0.05, 100000.0, 10, {2: 10000.0}), first)
+        cache.calculate_credit(0.05, 50000, 10, {})
+        cache.calculate_credit(0.05, 100000, 10, {2: 10000})
+        cache.calculate_credit(0.1, 50000, 10, {})  # evicts the least recently used 50000 @5%
+        cache.calculate_credit(0.05, 100000, 10, {2: 10000})
+        cache.calculate_credit(0.05, 50000, 10, {})
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions']), (3, 4, 2))
+        self.assertEqual(len(cache), 2)
+
+    def test_cached_multiple_credits(self):
+        """Test credits differing only in start year share cached tables, also across runs"""
+        config = [{"loan_amount": 100000, "period": 5, "interest_rate": 0.03 + 0.01 * (i % 2),
+                   "start_year": 2020 + i, "repayment_map": {"2": 5000}} for i in range(10)]
+
+        with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
+            json.dump(config, f)
+            temp_path = f.name
+        cache_path = temp_path + ".cache"
+
+        try:
+            cache = AmortizationCache()
+            self.assertEqual(calculate_multiple_credits(temp_path, cache=cache),
+                             calculate_multiple_credits(temp_path))
+            self.assertEqual((cache.hits, cache.misses), (8, 2))
+            cache.save(cache_path)
+
+            warm = AmortizationCache.load(cache_path)
+            self.assertEqual(len(warm), 2)
+            parallel = calculate_multiple_credits(temp_path, workers=2, shard_size=3, cache=warm)
+            self.assertAlmostEqual(parallel[2], calculate_multiple_credits(temp_path)[2], places=2)
+            self.assertEqual((warm.hits, warm.misses), (10, 0))
+
+            self.assertEqual(len(AmortizationCache.load(temp_path + ".missing")), 0)
+
+            # A corrupt file is a cache miss, not an error
+            with open(cache_path, 'wb') as f:
+                f.write(b"\x80\x04garbage")
+            with contextlib.redirect_stderr(io.StringIO()) as stderr:
+                self.assertEqual(len(AmortizationCache.load(cache_path)), 0)
+            self.assertIn("ignoring unreadable cache file", stderr.getvalue())
+        finally:
+            os.remove(temp_path)
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+
+    def test_optimize_repayments(self):
+        """Test the greedy allocation against a brute force search"""
+        for interest_rate, total_loan, loan_period, budget, max_yearly, first_year in [
+                (0.05, 100000, 5, 40000, None, 1),
+                (0.1, 60000, 4, 50000, 10000, 1),
+                (0.03, 100000, 6, 30000, 10000, 3),
+                (0.05, 10000, 3, 50000, None, 1)]:
+            repayment_map, total_paid, savings = optimize_repayments(
+                interest_rate, total_loan, loan_period, budget, max_yearly, first_year)
+            _, brute_total = brute_force_repayments(
+                interest_rate, total_loan, loan_period, budget, 10000, max_yearly, first_year)
+            self.assertAlmostEqual(total_paid, brute_total, places=2)
+            self.assertLessEqual(sum(repayment_map.values()), budget)
+            _, baseline, _ = calculate_credit(interest_rate, total_loan, loan_period, {})
+            self.assertAlmostEqual(savings, baseline - total_paid, places=2)
+
+    def test_optimize_repayments_limits(self):
+        """Test yearly limit, first year and unused budget"""
+        repayment_map, _, _ = optimize_repayments(0.05, 100000, 10, 25000, max_yearly=10000, first_year=2)
+        self.assertEqual(repayment_map, {2: 10000, 3: 10000, 4: 5000})
+        repayment_map, total_paid, _ = optimize_repayments(0.1, 100000, 10, 500000)
+        self.assertEqual(repayment_map, {1: 90000})
+        self.assertAlmostEqual(total_paid, 110000, places=2)
+        with self.assertRaises(ValueError):
+            optimize_repayments(0.1, 100000, 10, -1)
+
+    def test_iter_credits_small_chunks(self):
+        """Test streaming a JSON array whose elements span several read chunks"""
+        config = [{"loan_amount": 1000 + i, "period": 3, "interest_rate": 0.01,
+                   "start_year": 2000 + i, "repayment_map": {"2": i}} for i in range(20)]
+
+        with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
+            f.write("\n  " + json.dumps(config, indent=4) + "\n")
+            temp_path = f.name
+
+        try:
+            self.assertEqual(list(iter_credits(temp_path, chunk_size=7)), config)
+        finally:
+            os.remove(temp_path)
+
+    def test_iter_credits_truncated(self):
+        """Test truncated credit list is reported as an error"""
+        with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
+            f.write('[{"loan_amount": 1000, "period": 3}, {"loan_amount"')
+            temp_path = f.name
+
+        try:
+            with self.assertRaises(ValueError):
+                list(iter_credits(temp_path, chunk_size=8))
+        finally:
+            os.remove(temp_path)
+
 if __name__ == '__main__':
     unittest.main()
 
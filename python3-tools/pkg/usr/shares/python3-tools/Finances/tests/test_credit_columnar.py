@@ -0,0 +1,89 @@
+import unittest
+import tempfile
+import os
+import json
+import subprocess
+import sys
+from ..CreditCalculator import calculate_multiple_credits, calculate_portfolio
+from ..CreditColumnar import convert_to_columnar, calculate_columnar_credits, is_columnar, ColumnarPortfolio
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), "examples")
+
+class TestCreditColumnar(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assertSameAggregates(self, config_file, chunk_size=50000):
+        path = os.path.join(self.directory.name, "portfolio.col")
+        convert_to_columnar(config_file, path)
+        self.assertTrue(is_columnar(path))
+        self.assertFalse(is_columnar(config_file))
+
+        payments, remaining, total = calculate_multiple_credits(config_file)
+        columnar_payments, columnar_remaining, columnar_total = calculate_columnar_credits(path, chunk_size)
+        self.assertEqual(list(columnar_payments), list(payments))
+        for year in payments:
+            self.assertAlmostEqual(columnar_payments[year], payments[year], places=6)
+            self.assertAlmostEqual(columnar_remaining[year], remaining[year], places=6)
+        self.assertAlmostEqual(columnar_total, total, places=2)
+        self.assertEqual(calculate_portfolio(path), calculate_columnar_credits(path))
+
+    def test_examples(self):
+        """Test the example configs give the same aggregates"""
+        for name in ("credit_config.json", "credit_config2.json"):
+            self.assertSameAggregates(os.path.join(EXAMPLES, name))
+
+    def test_chunked_portfolio(self):
+        """Test gaps between calendar years, redirected credits and repayments beyond the period"""
+        config_file = os.path.join(self.directory.name, "config.jsonl")
+        with open(config_file, 'w') as f:
+            for i in range(40):
+                f.write(json.dumps({
+                    "loan_amount": 5000 * (i + 1), "period": 1 + i % 6, "interest_rate": 0.02 * (i % 4),
+                    "start_year": 2000 + 3 * (i % 5), "repayment_map": {"1": 100 * i, "9": 50},
+                    "redirected": i % 7 == 0}) + "\n")
+        self.assertSameAggregates(config_file, chunk_size=7)
+
+    def test_columns(self):
+        """Test memory-mapped columns and ragged repayments"""
+        config_file = os.path.join(self.directory.name, "config.json")
+        with open(config_file, 'w') as f:
+            json.dump([
+                {"loan_amount": 1000, "period": 2, "interest_rate": 0.1, "start_year": 2024,
+                 "repayment_map": {"2": 300, "1": 100}},
+                {"loan_amount": 2000, "period": 3, "interest_rate": 0.0, "start_year": 2025, "redirected": True},
+            ], f)
+        path = os.path.join(self.directory.name, "portfolio.col")
+        self.assertEqual(convert_to_columnar(config_file, path), 2)
+
+        portfolio = ColumnarPortfolio(path)
+        self.assertEqual(portfolio.count, 2)
+        self.assertEqual(portfolio.loan_amount.tolist(), [1000, 2000])
+        self.assertEqual(portfolio.redirected.tolist(), [0, 1])
+        self.assertEqual(portfolio.repayment_matrix(0, 2, 3).tolist(), [[100, 300, 0], [0, 0, 0]])
+
+    def test_empty_and_invalid(self):
+        config_file = os.path.join(self.directory.name, "config.json")
+        with open(config_file, 'w') as f:
+            f.write("[]")
+        path = os.path.join(self.directory.name, "portfolio.col")
+        self.assertEqual(convert_to_columnar(config_file, path), 0)
+        self.assertEqual(calculate_columnar_credits(path), ({}, {}, 0.0))
+        with self.assertRaises(ValueError):
+            ColumnarPortfolio(config_file)
+
+    def test_script_mode(self):
+        """Test running CreditCalculator.py as a script rejects columnar configs with a clear message"""
+        path = os.path.join(self.directory.name, "portfolio.col")
+        convert_to_columnar(os.path.join(EXAMPLES, "credit_config.json"), path)
+        package_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+        result = subprocess.run([sys.executable, "CreditCalculator.py", "multi", "--config", path],
+                                cwd=package_dir, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("run python3 -m Finances.CreditCalculator", result.stderr)
+
+if __name__ == '__main__':
+    unittest.main()
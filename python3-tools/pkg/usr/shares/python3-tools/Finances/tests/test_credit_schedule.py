@@ -0,0 +1,56 @@
+import unittest
+import random
+from ..CreditCalculator import calculate_credit
+from ..CreditSchedule import CreditSchedule
+
+class TestCreditSchedule(unittest.TestCase):
+    def test_matches_calculate_credit(self):
+        """Test initial schedule equals calculate_credit"""
+        for args in [(0.05, 100000, 10, {y: 10000 for y in range(1, 11)}),
+                     (0.0, 100000, 5, {}),
+                     (0.1, 100000, 10, {1: 100000}),
+                     (0.05, 100000, 10, {2: 10000, 4: 10000, 6: 10000, 8: 10000, 10: 10000, 12: 500})]:
+            self.assertEqual(CreditSchedule(*args).result(), calculate_credit(*args))
+
+    def test_set_repayment(self):
+        """Test incremental edits give the same result as a full recomputation"""
+        rng = random.Random(3)
+        schedule = CreditSchedule(0.04, 200000, 20, {3: 5000})
+        repayment_map = {3: 5000}
+        for _ in range(50):
+            year, amount = rng.randint(0, 22), rng.choice([0, 1000, 20000, 90000])
+            schedule.set_repayment(year, amount)
+            if amount:
+                repayment_map[year] = amount
+            else:
+                repayment_map.pop(year, None)
+            yearly_rates, total_paid, unused = calculate_credit(0.04, 200000, 20, repayment_map)
+            result = schedule.result()
+            self.assertEqual(result[0], yearly_rates)
+            self.assertAlmostEqual(result[1], total_paid, places=2)
+            self.assertAlmostEqual(result[2], unused, places=2)
+
+    def test_try_variants(self):
+        """Test variants share the prefix and leave the schedule unchanged"""
+        schedule = CreditSchedule(0.05, 100000, 10, {2: 10000})
+        before = schedule.result()
+        variants = [{}, {5: 20000}, {2: 0, 3: 30000}, {15: 100}, {1: 100000}]
+        results = schedule.try_variants(variants)
+        for changes, (total_paid, unused) in zip(variants, results):
+            _, expected_paid, expected_unused = calculate_credit(0.05, 100000, 10, {2: 10000, **changes})
+            self.assertAlmostEqual(total_paid, expected_paid, places=2)
+            self.assertAlmostEqual(unused, expected_unused, places=2)
+        self.assertEqual(schedule.result(), before)
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            CreditSchedule(1.1, 100000, 10)
+        with self.assertRaises(ValueError):
+            CreditSchedule(0.05, 100000, 0)
+        with self.assertRaises(ValueError):
+            CreditSchedule(0.05, 100000, 10, {1: -1})
+        with self.assertRaises(ValueError):
+            CreditSchedule(0.05, 100000, 10).set_repayment(1, -1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+import numpy
+from ..FinanceRoutines import computeComplexPercentIncome, computeComplexPercentIncomeArray
+
+class TestFinanceRoutines(unittest.TestCase):
+    def test_array_matches_scalar(self):
+        for initialSum, yearlyFee, expectedIncome, years in [
+                (1000, 100, 0.05, 10), (0, 500, 0.0, 20), (1000, 0, 0.07, 1),
+                (1000, 100, 0.1, 0), (2500, 300, 1e-12, 40), (100, 10, -0.02, 15)]:
+            expected = computeComplexPercentIncome(initialSum, yearlyFee, expectedIncome, years)
+            result = computeComplexPercentIncomeArray(initialSum, yearlyFee, expectedIncome, years)
+            self.assertEqual(result.shape, ())
+            self.assertAlmostEqual(float(result), expected, places=6)
+
+    def test_broadcast(self):
+        incomes = numpy.linspace(0, 0.1, 11)
+        years = numpy.array([[5], [10], [30]])
+        result = computeComplexPercentIncome(1000, 100, incomes, years)
+        self.assertEqual(result.shape, (3, 11))
+        for i, n in enumerate(years[:, 0]):
+            for j, income in enumerate(incomes):
+                self.assertAlmostEqual(result[i, j], computeComplexPercentIncome(1000, 100, float(income), int(n)),
+                                       places=6)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+import asyncio
+import json
+import os
+import tempfile
+import socket
+import threading
+import time
+from ..CreditCalculator import AmortizationCache, calculate_credit
+from ..CreditColumnar import convert_to_columnar
+from ..FinanceServer import handle_line, serve
+from ..FinanceClient import FinanceClient
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), "examples")
+
+class TestFinanceServer(unittest.TestCase):
+    def test_handle_line(self):
+        """Test single requests, batches and errors"""
+        reply = json.loads(handle_line(b'{"id": 1, "method": "single", "params": '
+                                       b'{"interest_rate": 0.05, "total_loan": 100000, "loan_period": 2}}'))
+        yearly_rates, total_paid, unused = calculate_credit(0.05, 100000, 2, {})
+        self.assertEqual(reply['id'], 1)
+        self.assertEqual(reply['result']['total_paid'], total_paid)
+        self.assertEqual(reply['result']['yearly_rates']['1'], list(yearly_rates[1]))
+        self.assertGreaterEqual(reply['latency_ms'], 0)
+
+        batch = json.loads(handle_line(b'[{"id": 1, "method": "ping"}, {"id": 2, "method": "unknown"}, '
+                                       b'{"id": 3, "method": "investment", "params": {"initial_capital": 1000, '
+                                       b'"interest_rate": 0.1, "length": 1}}]'))
+        self.assertEqual(batch[0]['result'], 'pong')
+        self.assertIn('error', batch[1])
+        self.assertEqual(batch[2]['result'], {'total_topped': 0.0, 'total_interest': 100.0})
+
+        self.assertIn('error', json.loads(handle_line(b'{not json')))
+        self.assertIn('error', json.loads(handle_line(b'{"id": 4, "method": "single", "params": {"interest_rate": 2}}')))
+
+    def start_server(self, socket_path, cache=None):
+        """Run serve() in a thread until the test ends"""
+        started = threading.Event()
+        server = {}
+
+        async def run_server():
+            server['loop'] = asyncio.get_running_loop()
+            server['task'] = asyncio.current_task()
+            started.set()
+            await serve(socket_path, cache)
+
+        def run():
+            try:
+                asyncio.run(run_server())
+            except (asyncio.CancelledError, FileExistsError) as e:
+                server['error'] = e
+
+        def stop():
+            started.wait()
+            server['loop'].call_soon_threadsafe(server['task'].cancel)
+            thread.join()
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        self.addCleanup(stop)
+        # The socket file appears before the server listens, wait until it accepts connections
+        for _ in range(200):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                try:
+                    probe.connect(socket_path)
+                    break
+                except OSError:
+                    time.sleep(0.01)
+        return server
+
+    def test_pipelined_client(self):
+        """Test a client pipelining requests to a running server"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        socket_path = os.path.join(directory.name, "finances.sock")
+        self.start_server(socket_path)
+
+        with FinanceClient(socket_path) as client:
+            calls = [('single', {'interest_rate': 0.01 * i, 'total_loan': 1000, 'loan_period': 5}) for i in range(20)]
+            responses = client.call_many(calls)
+            self.assertEqual([response['id'] for response in responses], list(range(1, 21)))
+            for i, response in enumerate(responses):
+                self.assertEqual(response['result']['total_paid'], calculate_credit(0.01 * i, 1000, 5, {})[1])
+            self.assertEqual(len(client.call_many(calls, batch=True)), 20)
+            self.assertEqual(client.call('ping'), 'pong')
+            with self.assertRaises(RuntimeError):
+                client.call('single', interest_rate=-1, total_loan=1000, loan_period=5)
+
+    def test_shared_cache(self):
+        """Test multi requests share the server cache and columnar configs are dispatched"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        socket_path = os.path.join(directory.name, "finances.sock")
+        config = os.path.join(EXAMPLES, "credit_config.json")
+        columnar = os.path.join(directory.name, "portfolio.col")
+        convert_to_columnar(config, columnar)
+        self.start_server(socket_path, AmortizationCache())
+
+        with FinanceClient(socket_path) as client:
+            first = client.call('multi', config=config, cache_stats=True)
+            second = client.call('multi', config=config, cache_stats=True)
+            self.assertEqual(second['total'], first['total'])
+            self.assertEqual(second['cache']['hits'], first['cache']['hits'] + first['cache']['misses'])
+            self.assertAlmostEqual(client.call('multi', config=columnar)['total'], first['total'], places=2)
+
+    def test_socket_replacement(self):
+        """Test a stale socket is replaced, while a live socket or another file is kept"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        socket_path = os.path.join(directory.name, "finances.sock")
+
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(socket_path)
+        stale.close()
+        self.start_server(socket_path)
+        with FinanceClient(socket_path) as client:
+            self.assertEqual(client.call('ping'), 'pong')
+
+        with self.assertRaises(FileExistsError):
+            asyncio.run(serve(socket_path))
+        with FinanceClient(socket_path) as client:
+            self.assertEqual(client.call('ping'), 'pong')
+
+        other_path = os.path.join(directory.name, "other")
+        with open(other_path, 'w'):
+            pass
+        with self.assertRaises(FileExistsError):
+            asyncio.run(serve(other_path))
+        self.assertTrue(os.path.isfile(other_path))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from ..InvestmentCalculator import calculate_investment
+from ..InvestmentCalculator import calculate_investment, calculate_investment_series, top_up_schedule
 
 class TestCalculateInvestment(unittest.TestCase):
     """Unit tests for investment calculator."""
@@ -36,6 +36,32 @@ class TestCalculateInvestment(unittest.TestCase):
             10)
         self.assertAlmostEqual(total_topped, 5500, places=2)
 
+    def test_top_up_schedule(self):
+        schedule = top_up_schedule({'repeat': (3, 100), 0: 500, 5: 10}, 7)
+        self.assertEqual(schedule.tolist(), [500, 0, 100, 0, 0, 110, 0])
+
+    def test_series_matches_yearly_loop(self):
+        """Closed form balances match the year by year simulation"""
+        top_up_map = {'repeat': (4, 250), 0: 1000, 7: 300}
+        balances, top_ups, net_interest = calculate_investment_series(5000, top_up_map, 0.07, 0.25, 30)
+
+        balance = 5000.0
+        for year in range(30):
+            balance += top_ups[year]
+            interest = balance * 0.07 * (1 - 0.25)
+            self.assertAlmostEqual(net_interest[year], interest, places=6)
+            balance += interest
+            self.assertAlmostEqual(balances[year], balance, places=6)
+
+        total_topped, total_interest = calculate_investment(5000, top_up_map, 0.07, 0.25, 30)
+        self.assertAlmostEqual(total_topped, top_ups.sum(), places=2)
+        self.assertAlmostEqual(5000 + total_topped + total_interest, balances[-1], places=2)
+
+    def test_long_horizon(self):
+        balances, _, _ = calculate_investment_series(1000, {'repeat': (1, 100)}, 0.0, 0.0, 1200)
+        self.assertEqual(len(balances), 1200)
+        self.assertAlmostEqual(balances[-1], 1000 + 1200 * 100, places=6)
+
     def test_input_period(self):
         with self.assertRaises(ValueError):
             calculate_investment(1000, {}, 0.1, 0.0, 0)
@@ -49,6 +75,8 @@ class TestCalculateInvestment(unittest.TestCase):
             calculate_investment(1000, {}, 0.1, 2, 2)
         with self.assertRaises(ValueError):
             calculate_investment(1000, {}, 0.1, -1, 2)
+        with self.assertRaises(ValueError):
+            calculate_investment(1000, {2: 100}, 0.1, 0.0, 2)
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,56 @@
+import unittest
+import numpy
+from ..InvestmentCalculator import calculate_investment_series
+from ..MonteCarlo import simulate_investment, generate_returns
+
+class TestMonteCarlo(unittest.TestCase):
+    """Unit tests for the Monte Carlo investment simulator."""
+
+    def test_zero_volatility_matches_calculator(self):
+        top_up_map = {'repeat': (2, 1000), 0: 500}
+        balances, _, _ = calculate_investment_series(10000, top_up_map, 0.05, 0.25, 20)
+        result = simulate_investment(10000, top_up_map, 0.25, 20, mean=0.05, volatility=0.0,
+                                     paths=100, chunk_size=30, seed=1)
+        for balance in result['final_balance'].values():
+            self.assertAlmostEqual(balance, balances[-1], places=6)
+        self.assertAlmostEqual(result['max_drawdown'][95], 0.0)
+
+    def test_seed_is_reproducible(self):
+        first = simulate_investment(1000, {}, 0.0, 10, model='lognormal', paths=5000, chunk_size=1000, seed=7)
+        second = simulate_investment(1000, {}, 0.0, 10, model='lognormal', paths=5000, chunk_size=1000, seed=7)
+        self.assertEqual(first, second)
+        self.assertLess(first['final_balance'][5], first['final_balance'][50])
+        self.assertLess(first['final_balance'][50], first['final_balance'][95])
+
+    def test_bootstrap_drawdown(self):
+        # Every path loses half in both years: 1000 -> 500 -> 250, a drawdown of 75% from the start
+        result = simulate_investment(1000, {}, 0.0, 2, model='bootstrap', history=[-0.5],
+                                     paths=10, seed=3)
+        self.assertAlmostEqual(result['final_balance'][50], 250.0)
+        self.assertAlmostEqual(result['max_drawdown'][50], 0.75)
+
+    def test_tax_only_on_gains(self):
+        result = simulate_investment(1000, {}, 0.5, 1, model='bootstrap', history=[0.2],
+                                     paths=1, seed=0)
+        self.assertAlmostEqual(result['final_balance'][50], 1100.0)
+        result = simulate_investment(1000, {}, 0.5, 1, model='bootstrap', history=[-0.2],
+                                     paths=1, seed=0)
+        self.assertAlmostEqual(result['final_balance'][50], 800.0)
+
+    def test_normal_returns_are_bounded(self):
+        returns = generate_returns(numpy.random.default_rng(0), 'normal', 1000, 5, mean=0.0, volatility=5.0)
+        self.assertEqual(returns.shape, (1000, 5))
+        self.assertGreaterEqual(returns.min(), -1.0)
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            simulate_investment(1000, {}, 0.0, 5, model='unknown', paths=10)
+        with self.assertRaises(ValueError):
+            simulate_investment(1000, {}, 0.0, 5, model='bootstrap', paths=10)
+        with self.assertRaises(ValueError):
+            simulate_investment(1000, {}, 0.0, 5, paths=0)
+        with self.assertRaises(ValueError):
+            simulate_investment(1000, {}, 2.0, 5, paths=10)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+from ..CreditCalculator import calculate_credit
+from ..MonthlySchedule import MonthlySchedule, MonthlyPayment, aggregate_monthly_payments
+
+class TestMonthlySchedule(unittest.TestCase):
+    def simulate(self, interest_rate, total_loan, loan_period, repayment_map):
+        """Reference month by month loop"""
+        principal_part = total_loan / (12 * loan_period)
+        remaining = total_loan
+        rows = []
+        total_paid = 0.0
+        for month in range(1, 12 * loan_period + 1):
+            principal = min(remaining, principal_part)
+            interest = remaining * interest_rate / 12
+            rows.append((interest + principal, remaining))
+            total_paid += interest + principal
+            remaining -= principal
+            if month % 12 == 0 and month // 12 in repayment_map:
+                actual = min(repayment_map[month // 12], remaining)
+                remaining -= actual
+                total_paid += actual
+            if remaining <= 1e-6:
+                break
+        return rows, total_paid
+
+    def test_matches_reference_loop(self):
+        for args in [(0.05, 100000, 10, {}), (0.1, 100000, 10, {1: 100000}),
+                     (0.03, 250000, 30, {2: 10000, 5: 50000, 40: 1000}), (0.0, 1200, 1, {})]:
+            schedule = MonthlySchedule(*args)
+            rows, total_paid = self.simulate(*args)
+            self.assertEqual(len(schedule), len(rows))
+            for row, (payment, balance) in zip(schedule, rows):
+                self.assertAlmostEqual(row.payment, payment, places=6)
+                self.assertAlmostEqual(row.balance, balance, places=6)
+            self.assertAlmostEqual(schedule.total_paid, total_paid, places=2)
+
+    def test_rows_and_unused(self):
+        schedule = MonthlySchedule(0.12, 12000, 1, {0: 700, 1: 5000, 3: 100})
+        self.assertEqual(len(schedule), 12)
+        first = next(schedule.rows())
+        self.assertEqual(first, MonthlyPayment(1, 1120.0, 120.0, 1000.0, 12000.0))
+        self.assertEqual([row.month for row in schedule.rows(10, 20)], [11, 12])
+        for args in [(0.12, 12000, 1, {0: 700, 1: 5000, 3: 100}), (0.03, 250000, 30, {2: 10000, 5: 50000, 40: 1000}),
+                     (0.1, 100000, 10, {1: 100000, 4: 20})]:
+            self.assertAlmostEqual(MonthlySchedule(*args).unused, calculate_credit(*args)[2], places=2)
+
+    def test_yearly_view(self):
+        schedule = MonthlySchedule(0.0, 24000, 2, {1: 6000})
+        yearly = schedule.yearly()
+        self.assertEqual(list(yearly), [1, 2])
+        self.assertAlmostEqual(yearly[1][0], 1000.0)
+        self.assertAlmostEqual(yearly[1][1], 24000.0)
+        self.assertAlmostEqual(yearly[2][1], 6000.0)
+        self.assertAlmostEqual(yearly[2][0], 500.0)  # paid off after 6 months
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            MonthlySchedule(1.5, 1000, 1)
+        with self.assertRaises(ValueError):
+            MonthlySchedule(0.1, 1000, 0)
+        with self.assertRaises(ValueError):
+            MonthlySchedule(0.1, 1000, 1, {1: -1})
+
+    def test_aggregate_monthly_payments(self):
+        credits = [
+            {"loan_amount": 12000, "period": 1, "interest_rate": 0.0, "start_year": 2025},
+            {"loan_amount": 24000, "period": 1, "interest_rate": 0.0, "start_year": 2024},
+        ]
+        first_year, payments, balances = aggregate_monthly_payments(credits)
+        self.assertEqual(first_year, 2024)
+        self.assertEqual(len(payments), 24)
+        self.assertAlmostEqual(payments[0], 2000.0)
+        self.assertAlmostEqual(payments[12], 1000.0)
+        self.assertAlmostEqual(balances[12], 12000.0)
+
+if __name__ == '__main__':
+    unittest.main()
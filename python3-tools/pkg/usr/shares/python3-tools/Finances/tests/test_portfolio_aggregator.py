@@ -0,0 +1,100 @@
+import unittest
+import tempfile
+import os
+import json
+import random
+from ..CreditCalculator import AmortizationCache, calculate_credit, calculate_multiple_credits, iter_credits
+from ..PortfolioAggregator import PortfolioAggregator
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), "examples")
+
+def random_credit(rng):
+    return {
+        'interest_rate': rng.choice([0.0, 0.03, 0.05]),
+        'loan_amount': rng.choice([10000, 50000, 120000]),
+        'period': rng.randint(1, 15),
+        'start_year': rng.randint(1990, 2040),
+        'redirected': rng.random() < 0.2,
+        'repayment_map': {str(rng.randint(1, 10)): 5000} if rng.random() < 0.5 else {},
+    }
+
+class TestPortfolioAggregator(unittest.TestCase):
+    def assertSameAggregates(self, aggregator, credits):
+        with tempfile.TemporaryDirectory() as directory:
+            config_file = os.path.join(directory, "config.json")
+            with open(config_file, 'w') as f:
+                json.dump(credits, f)
+            payments, remaining, total = calculate_multiple_credits(config_file)
+
+        snapshot_payments, snapshot_remaining, snapshot_total = aggregator.snapshot().to_dicts()
+        self.assertEqual(list(snapshot_payments), list(payments))
+        for year in payments:
+            self.assertAlmostEqual(snapshot_payments[year], payments[year], places=6)
+            self.assertAlmostEqual(snapshot_remaining[year], remaining[year], places=6)
+        self.assertAlmostEqual(snapshot_total, total, places=2)
+        self.assertEqual(len(aggregator), len(credits))
+
+    def test_examples(self):
+        """Test the example configs give the same aggregates"""
+        for name in ("credit_config.json", "credit_config2.json"):
+            config_file = os.path.join(EXAMPLES, name)
+            aggregator = PortfolioAggregator(capacity=1)
+            aggregator.extend(iter_credits(config_file))
+            self.assertEqual(aggregator.snapshot().to_dicts(), calculate_multiple_credits(config_file))
+
+    def test_add_remove(self):
+        """Test a random sequence of added and removed credits"""
+        rng = random.Random(7)
+        aggregator = PortfolioAggregator(cache=AmortizationCache(), capacity=4)
+        credits = []
+        for step in range(300):
+            if credits and rng.random() < 0.4:
+                aggregator.remove(credits.pop(rng.randrange(len(credits))))
+            else:
+                credit = random_credit(rng)
+                credits.append(credit)
+                aggregator.add(credit)
+            if step % 50 == 0:
+                self.assertSameAggregates(aggregator, credits)
+        self.assertSameAggregates(aggregator, credits)
+
+        for credit in credits:
+            aggregator.remove(credit)
+        snapshot = aggregator.snapshot()
+        self.assertEqual(snapshot.to_dicts(), ({}, {}, 0.0))
+        self.assertEqual(len(snapshot.payments), 0)
+
+    def test_snapshot_is_copy(self):
+        """Test snapshots are not changed by later updates"""
+        aggregator = PortfolioAggregator()
+        credit = {'interest_rate': 0.05, 'loan_amount': 100000, 'period': 5, 'start_year': 2020}
+        aggregator.add(credit)
+        snapshot = aggregator.snapshot()
+        aggregator.add(dict(credit, start_year=2022))
+        self.assertEqual(snapshot.first_year, 2020)
+        self.assertEqual(len(snapshot.payments), 5)
+        self.assertEqual(snapshot.active.tolist(), [1] * 5)
+        self.assertEqual(aggregator.snapshot().active.tolist(), [1, 1, 2, 2, 2, 1, 1])
+
+    def test_remove_unknown(self):
+        """Test credits outside of the portfolio are rejected"""
+        aggregator = PortfolioAggregator()
+        credit = {'interest_rate': 0.05, 'loan_amount': 100000, 'period': 5, 'start_year': 2020}
+        with self.assertRaises(ValueError):
+            aggregator.remove(credit)
+        aggregator.add(credit)
+        with self.assertRaises(ValueError):
+            aggregator.remove(dict(credit, start_year=2030))
+
+    def test_capacity(self):
+        """Test the smallest capacity grows and an empty one is rejected"""
+        aggregator = PortfolioAggregator(capacity=1)
+        credit = {'interest_rate': 0.05, 'loan_amount': 100000, 'period': 5, 'start_year': 2020}
+        aggregator.add(credit)
+        aggregator.add(dict(credit, start_year=2010))
+        self.assertAlmostEqual(aggregator.snapshot().to_dicts()[0][2022], calculate_credit(0.05, 100000, 5, {})[0][3][0])
+        with self.assertRaises(ValueError):
+            PortfolioAggregator(capacity=0)
+
+if __name__ == '__main__':
+    unittest.main()
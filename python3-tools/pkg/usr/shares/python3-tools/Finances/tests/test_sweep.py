@@ -0,0 +1,66 @@
+import unittest
+import tempfile
+import os
+import csv
+import itertools
+from ..CreditCalculator import calculate_credit
+from ..InvestmentCalculator import calculate_investment
+from ..Sweep import parse_range, run_sweep, CsvWriter, _credit_chunk, _investment_chunk, _chunks, CREDIT_COLUMNS
+
+class TestSweep(unittest.TestCase):
+    def test_parse_range(self):
+        """Test single values, lists and inclusive ranges"""
+        self.assertEqual(parse_range("0.05"), [0.05])
+        self.assertEqual(parse_range("5,10,20", int), [5, 10, 20])
+        self.assertEqual(parse_range("5:20:5", int), [5, 10, 15, 20])
+        rates = parse_range("0.01:0.1:0.01")
+        self.assertEqual(len(rates), 10)
+        self.assertAlmostEqual(rates[-1], 0.1)
+        with self.assertRaises(ValueError):
+            parse_range("1:2")
+        with self.assertRaises(ValueError):
+            parse_range("1:2:0")
+
+    def test_credit_chunk(self):
+        """Test credit scenarios match calculate_credit"""
+        scenarios = list(itertools.product([0.0, 0.05], [1000, 250000], [1, 7]))
+        chunk = _credit_chunk(scenarios)
+        for i, (rate, amount, period) in enumerate(scenarios):
+            yearly_rates, total_paid, unused = calculate_credit(rate, amount, period, {})
+            self.assertAlmostEqual(chunk['total_paid'][i], total_paid, places=2)
+            self.assertEqual(chunk['years'][i], len(yearly_rates))
+            self.assertAlmostEqual(chunk['first_monthly_rate'][i], yearly_rates[1][0], places=6)
+
+    def test_investment_chunk(self):
+        """Test investment scenarios match calculate_investment"""
+        scenarios = list(itertools.product([0.03, 0.1], [1, 10], [1000.0], [0.0, 0.25]))
+        chunk = _investment_chunk((scenarios, {'repeat': (2, 100)}))
+        for i, (rate, length, initial, tax) in enumerate(scenarios):
+            total_topped, total_interest = calculate_investment(initial, {'repeat': (2, 100)}, rate, tax, length)
+            self.assertAlmostEqual(chunk['total_topped'][i], total_topped, places=2)
+            self.assertAlmostEqual(chunk['total_interest'][i], total_interest, places=2)
+
+    def test_parallel_sweep_to_csv(self):
+        """Test parallel chunks are written in grid order"""
+        grid = list(itertools.product(parse_range("0.01:0.05:0.01"), [10000.0, 20000.0], [3, 5]))
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.csv') as f:
+            temp_path = f.name
+
+        try:
+            writer = CsvWriter(temp_path, CREDIT_COLUMNS)
+            for chunk in run_sweep(_credit_chunk, _chunks(grid, 3), workers=2):
+                writer.write(chunk)
+            writer.close()
+
+            with open(temp_path, newline='') as f:
+                rows = list(csv.DictReader(f))
+            self.assertEqual(len(rows), len(grid))
+            for row, (rate, amount, period) in zip(rows, grid):
+                self.assertAlmostEqual(float(row['interest_rate']), rate)
+                self.assertAlmostEqual(float(row['total_loan']), amount)
+                self.assertEqual(int(row['loan_period']), period)
+        finally:
+            os.remove(temp_path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,53 +1,1276 @@
 #!/usr/bin/python3
 import argparse
+import json
+import mmap
 import os
 import re
-from sh import sed
-from sh import realpath
-from git import Repo
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
 
-parser = argparse.ArgumentParser(
-    prog="git-replace",
-    description="Used to replace string patterns within the files in the git repository with the replacement string",
-)
+# Bracket expressions of POSIX extended regular expressions and their Python equivalents
+POSIX_CLASSES = {
+    "alpha": "a-zA-Z",
+    "digit": "0-9",
+    "alnum": "a-zA-Z0-9",
+    "upper": "A-Z",
+    "lower": "a-z",
+    "xdigit": "0-9A-Fa-f",
+    "space": r" \t\n\r\f\v",
+    "blank": r" \t",
+    "punct": r"!-/:-@\[-`{-~",
+    "cntrl": r"\x00-\x1f\x7f",
+    "print": r" -~",
+    "graph": r"!-~",
+}
 
-parser.add_argument("-b", "--before-pattern", required=True)
-parser.add_argument("-a", "--after-pattern", required=True)
-parser.add_argument("-p", "--repo-path", required=False, default=os.getcwd())
-parser.add_argument("-f", "--files", action="store_true")
+# Leading global inline flags of a pattern, e.g. (?i)
+globalFlags = re.compile(r"((?:\(\?[aiLmsux]+\))*)(.*)", re.DOTALL)
 
-args = parser.parse_args()
+# Files handed to a worker at once, keeps the inter-process traffic low for small files
+BATCH_SIZE = 64
 
-beforePattern = args.before_pattern
-afterPattern = args.after_pattern
-targetPath = re.sub(r"\s+", "", str(realpath([args.repo_path])))
-renameFiles = args.files
 
-if not os.path.isdir(targetPath):
-    raise ValueError("path is not a directory", targetPath)
+def translateBracket(pattern, start):
+    """
+    Translate the bracket expression starting at pattern[start] == "[".
 
-repo = Repo(targetPath, search_parent_directories=True)
-repoPath = os.path.realpath(repo.git.rev_parse("--show-toplevel"))
+    Inside brackets a POSIX backslash is an ordinary character, so it is escaped for Python,
+    and a "]" right after "[" or "[^" is a literal member.
 
-if not renameFiles:
+    Returns:
+        tuple: (index after the closing "]", Python character set)
+    """
+    i = start + 1
+    members = []
+    if pattern.startswith("^", i):
+        members.append("^")
+        i += 1
+    first = i
+    while True:
+        if i >= len(pattern):
+            raise ValueError(f"Unterminated bracket expression: {pattern[start:]}")
+        c = pattern[i]
+        if c == "]" and i > first:
+            return i + 1, "[" + "".join(members) + "]"
+        if c == "[" and pattern.startswith((":", ".", "="), i + 1):
+            delimiter = pattern[i + 1]
+            close = pattern.find(delimiter + "]", i + 2)
+            if close < 0:
+                raise ValueError(f"Unterminated [{delimiter} in bracket expression: {pattern[start:]}")
+            name = pattern[i + 2:close]
+            if delimiter != ":":
+                raise ValueError(f"Collating elements and equivalence classes are not supported: [{delimiter}{name}{delimiter}]")
+            if name not in POSIX_CLASSES:
+                raise ValueError(f"Unknown character class [:{name}:]")
+            members.append(POSIX_CLASSES[name])
+            i = close + 2
+            continue
+        # Characters Python treats specially in a set (escapes, nesting, future set operations)
+        members.append("\\" + c if c in "\\[]&|~" else c)
+        i += 1
+
+
+def translatePattern(pattern, groupOffset=0):
+    """
+    Translate a `sed -E`/`git grep -E` pattern into Python re syntax.
+
+    Handles bracket expressions (POSIX classes like [[:alpha:]] and literal backslashes),
+    the GNU word boundaries \\< and \\> and backreferences. The translated pattern matches
+    the same lines, but Python re picks the first alternative that matches (leftmost-first)
+    where POSIX picks the longest match (leftmost-longest): with a|ab, `sed -E` substitutes
+    "ab" in "abc" and git-replace only "a". Order alternatives longest first to get the same
+    substitution.
+
+    Args:
+        groupOffset: Number of groups in front of the pattern, backreferences are shifted by it
+
+    Raises:
+        ValueError: The pattern cannot be translated
+    """
+    translated = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "[":
+            i, characterSet = translateBracket(pattern, i)
+            translated.append(characterSet)
+            continue
+        if c == "\\" and i + 1 < len(pattern):
+            escaped = pattern[i + 1]
+            if escaped.isdigit() and groupOffset:
+                translated.append(rf"(?:\{int(escaped) + groupOffset})")
+            elif escaped in "<>":
+                translated.append(r"\b")
+            else:
+                translated.append(pattern[i:i + 2])
+            i += 2
+            continue
+        translated.append(c)
+        i += 1
+    return "".join(translated)
+
+
+def translateReplacement(replacement):
+    """
+    Translate a `sed` replacement into a Python re template.
+
+    & is the whole match, \\1-\\9 are groups, \\n and \\t are control characters and any
+    other escaped character is taken literally.
+    """
+    def translate(match):
+        if match.group(0) == "&":
+            return r"\g<0>"
+        if match.group(0) == "\\":
+            return "\\\\"
+        escaped = match.group(1)
+        if escaped.isdigit():
+            return rf"\g<{escaped}>"
+        if escaped in "nt":
+            return "\\" + escaped
+        return escaped.replace("\\", "\\\\")
+
+    return re.sub(r"\\(.)|&|\\", translate, replacement)
+
+
+def compileSubstitution(rules, binary=False):
+    """
+    Compile (before, after) rules, they are applied to every line in order like `sed -E -e ... -e ...`.
+
+    The scan pattern is the alternation of all rules. A line without a match of any rule is
+    not changed by any rule, so lines and files without a scan match can be skipped. Global
+    inline flags of a rule, e.g. a leading (?i), only apply to its alternative.
+
+    Args:
+        binary: Compile bytes patterns, they match bytes like sed in the C locale
+
+    Returns:
+        tuple: (
+            list: (re.Pattern applied to single lines, replacement template) for every rule,
+            re.Pattern: alternation of all rules in multiline mode to scan whole files
+        )
+    """
+    encode = (lambda text: text.encode("utf-8", "surrogateescape")) if binary else (lambda text: text)
+    compiledRules = []
+    alternatives = []
+    groupOffset = 0
+    for beforePattern, afterPattern in rules:
+        linePattern = re.compile(encode(translatePattern(beforePattern)))
+        compiledRules.append((linePattern, encode(translateReplacement(afterPattern))))
+        flags, pattern = globalFlags.match(translatePattern(beforePattern, groupOffset)).groups()
+        alternatives.append(f"(?{flags.replace('(?', '').replace(')', '')}:{pattern})")
+        groupOffset += linePattern.groups
+    return compiledRules, re.compile(encode("|".join(alternatives)), re.MULTILINE)
+
+
+def applyRules(line, compiledRules):
+    """
+    Returns:
+        tuple: (substituted line, number of matches of all rules)
+    """
+    matches = 0
+    for linePattern, replacement in compiledRules:
+        line, count = linePattern.subn(replacement, line)
+        matches += count
+    return line, matches
+
+
+def loadRules(rulesFile):
+    """
+    Read a JSON array of {"before": ..., "after": ...} rules.
+
+    Returns:
+        list: (before, after) pairs in declared order
+    """
+    with open(rulesFile) as f:
+        rules = json.load(f)
+    if not isinstance(rules, list) or not rules:
+        raise ValueError(f"{rulesFile} must contain a non-empty JSON array of rules")
+    pairs = []
+    for rule in rules:
+        if not isinstance(rule, dict) or not isinstance(rule.get("before"), str) or not isinstance(rule.get("after"), str):
+            raise ValueError(f"Rule {rule!r} must be an object with 'before' and 'after' strings")
+        pairs.append((rule["before"], rule["after"]))
+    return pairs
+
+
+def writeAtomically(path, chunks):
+    """
+    Replace the file content through a temporary file in the same directory, keeping the file mode.
+
+    Args:
+        chunks: Iterable of bytes-like objects forming the new content
+
+    Returns:
+        int: Number of bytes written
+    """
+    mode = stat.S_IMODE(os.stat(path).st_mode)
+    fd, tempPath = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".git-replace-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+            written = f.tell()
+        os.chmod(tempPath, mode)
+        os.replace(tempPath, path)
+    except BaseException:
+        if os.path.exists(tempPath):
+            os.unlink(tempPath)
+        raise
+    return written
+
+
+def formatRange(start, count):
+    """Hunk range of count lines after line index start, the count is omitted for single lines like git does."""
+    if count == 1:
+        return str(start + 1)
+    # Empty ranges name the line before them
+    return f"{start + 1 if count else start},{count}"
+
+
+def formatHunks(lines, changes, missingFinalNewline, context=3):
+    """
+    Format line changes as unified diff hunks.
+
+    Args:
+        lines: Original lines without line terminators
+        changes: (line index, new text) pairs sorted by index, the new text may span several lines
+        missingFinalNewline: The last line is not terminated by a newline
+        context: Number of unchanged lines around every change
+
+    Returns:
+        str: Hunks without the ---/+++ file header
+    """
+    def formatLine(prefix, index, line):
+        if missingFinalNewline and index == len(lines) - 1:
+            return f"{prefix}{line}\n\\ No newline at end of file\n"
+        return f"{prefix}{line}\n"
+
+    hunks = []
+    offset = 0  # difference of the new to the old line numbers caused by previous hunks
+    first = 0
+    while first < len(changes):
+        # Changes with overlapping context form one hunk
+        last = first
+        while last + 1 < len(changes) and changes[last + 1][0] - changes[last][0] <= 2 * context + 1:
+            last += 1
+        start = max(0, changes[first][0] - context)
+        end = min(len(lines), changes[last][0] + context + 1)
+
+        body = []
+        added = 0
+        position = start
+        run = first
+        while run <= last:
+            # Adjacent changed lines are shown as one block of removals followed by the additions
+            runEnd = run
+            while runEnd < last and changes[runEnd + 1][0] == changes[runEnd][0] + 1:
+                runEnd += 1
+            body.extend(formatLine(" ", k, lines[k]) for k in range(position, changes[run][0]))
+            body.extend(formatLine("-", index, lines[index]) for index, _ in changes[run:runEnd + 1])
+            for index, newText in changes[run:runEnd + 1]:
+                newLines = newText.split("\n")
+                body.extend(formatLine("+", index if k == len(newLines) - 1 else -1, line)
+                            for k, line in enumerate(newLines))
+                added += len(newLines) - 1
+            position = changes[runEnd][0] + 1
+            run = runEnd + 1
+        body.extend(formatLine(" ", k, lines[k]) for k in range(position, end))
+
+        hunks.append(f"@@ -{formatRange(start, end - start)} +{formatRange(start + offset, end - start + added)} @@\n")
+        hunks.extend(body)
+        offset += added
+        first = last + 1
+    return "".join(hunks)
+
+
+# Substitution, file function and dry-run flag of the current process, see initSubstitution
+substitution = None
+substituteFunction = None
+dryRun = False
+
+
+def initSubstitution(rules, useMmap=False, preview=False):
+    global substitution, substituteFunction, dryRun
+    substitution = compileSubstitution(rules, binary=useMmap)
+    substituteFunction = substituteMapped if useMmap else substituteFile
+    dryRun = preview
+
+
+def splitLines(text):
+    """Split text into lines like sed, a final newline terminates the last line instead of starting a new one."""
+    lines = text.split("\n")
+    endsWithNewline = lines[-1] == ""
+    if endsWithNewline:
+        lines.pop()
+    return lines, endsWithNewline
+
+
+def substituteFile(path):
+    """
+    Apply the rules to every line of a file, like `sed -E -i -e s,before,after,g ...` apart from
+    the leftmost-first alternation (see translatePattern).
+
+    Lines are split at \\n only and invalid UTF-8 is passed through unchanged.
+    In a dry run the file is left untouched and the changes are returned as diff hunks.
+
+    Returns:
+        tuple: (path, number of matches, bytes written, error message or None, diff hunks or None)
+    """
+    compiledRules, scanPattern = substitution
+    try:
+        if os.path.islink(path):
+            return path, 0, 0, None, None
+        with open(path, "rb") as f:
+            data = f.read()
+        text = data.decode("utf-8", "surrogateescape")
+        # A match in any line is a match of the whole text, so this skips most files at C speed
+        if scanPattern.search(text) is None:
+            return path, 0, 0, None, None
+
+        matches = 0
+        changes = []
+        lines, endsWithNewline = splitLines(text)
+        for i, line in enumerate(lines):
+            newLine, count = applyRules(line, compiledRules)
+            if count:
+                matches += count
+                if newLine != line:
+                    changes.append((i, newLine))
+        if not changes:
+            return path, matches, 0, None, None
+        if dryRun:
+            return path, matches, 0, None, formatHunks(lines, changes, not endsWithNewline)
+
+        for i, newLine in changes:
+            lines[i] = newLine
+        output = ("\n".join(lines) + ("\n" if endsWithNewline else "")).encode("utf-8", "surrogateescape")
+        return path, matches, writeAtomically(path, [output]), None, None
+    except (OSError, re.error) as err:
+        return path, 0, 0, str(err), None
+
+
+def iterChangedLines(data, compiledRules, scanPattern):
+    """
+    Find the lines of a bytes-like object changed by the substitution.
+
+    Only lines containing a scan match are passed through the rules. Scanning resumes at the line after
+    every substituted line, so the leftmost scan match never lies behind a line with a match.
+
+    Yields:
+        tuple: (line start, line end, number of matches, substituted line)
+    """
+    position = 0
+    while (match := scanPattern.search(data, position)) is not None:
+        lineStart = data.rfind(b"\n", 0, match.start()) + 1
+        if lineStart == len(data):
+            break  # sed sees no line after the final newline
+        lineEnd = data.find(b"\n", match.start())
+        if lineEnd < 0:
+            lineEnd = len(data)
+        line = data[lineStart:lineEnd]
+        newLine, count = applyRules(line, compiledRules)
+        if count:
+            yield lineStart, lineEnd, count, newLine
+        position = lineEnd + 1
+        if position > len(data):
+            break
+
+
+def iterPatchedChunks(view, changes):
+    """Unchanged regions of view as zero-copy slices, interleaved with the changed lines."""
+    position = 0
+    for lineStart, lineEnd, newLine in changes:
+        yield view[position:lineStart]
+        yield newLine
+        position = lineEnd
+    yield view[position:]
+
+
+def formatMappedHunks(data, changes):
+    """Diff hunks of byte range changes, only called for the files that actually change."""
+    content = data[:]
+    lines, endsWithNewline = splitLines(content.decode("utf-8", "surrogateescape"))
+    lineChanges = []
+    lineIndex = position = 0
+    for lineStart, _, newLine in changes:
+        lineIndex += content.count(b"\n", position, lineStart)
+        position = lineStart
+        lineChanges.append((lineIndex, newLine.decode("utf-8", "surrogateescape")))
+    return formatHunks(lines, lineChanges, not endsWithNewline)
+
+
+def substituteMapped(path):
+    """
+    Apply the substitution to a memory-mapped file with bytes patterns.
+
+    Unchanged regions are copied straight from the mapping into the temporary output file,
+    only changed lines are built in memory. Files without a change are not written at all,
+    so they keep their mtime.
+
+    Returns:
+        Same tuple as substituteFile
+    """
+    compiledRules, scanPattern = substitution
+    try:
+        if os.path.islink(path) or os.path.getsize(path) == 0:
+            return path, 0, 0, None, None
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            matches = 0
+            changes = []
+            for lineStart, lineEnd, count, newLine in iterChangedLines(data, compiledRules, scanPattern):
+                matches += count
+                if newLine != data[lineStart:lineEnd]:
+                    changes.append((lineStart, lineEnd, newLine))
+            if not changes:
+                return path, matches, 0, None, None
+            if dryRun:
+                return path, matches, 0, None, formatMappedHunks(data, changes)
+
+            with memoryview(data) as view:
+                written = writeAtomically(path, iterPatchedChunks(view, changes))
+        return path, matches, written, None, None
+    except (OSError, ValueError, re.error) as err:
+        return path, 0, 0, str(err), None
+
+
+def substituteBatch(paths):
+    return [substituteFunction(path) for path in paths]
+
+
+def iterBatches(paths, batchSize):
+    for start in range(0, len(paths), batchSize):
+        yield paths[start:start + batchSize]
+
+
+def iterSubstitutions(paths, rules, jobs, useMmap=False, preview=False):
+    """
+    Apply the rules to all files, yielding substituteFile results in path order.
+
+    With more than one job the files are processed in batches by a process pool,
+    at most 2 * jobs batches are in flight to keep memory bounded.
+    """
+    if jobs <= 1:
+        initSubstitution(rules, useMmap, preview)
+        yield from map(substituteFunction, paths)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=initSubstitution,
+                             initargs=(rules, useMmap, preview)) as executor:
+        pending = deque()
+        for batch in iterBatches(paths, BATCH_SIZE):
+            pending.append(executor.submit(substituteBatch, batch))
+            if len(pending) >= 2 * jobs:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def listCandidates(repo, rules, targetPath):
+    """Tracked files below targetPath matching any of the rules, as absolute paths."""
+    repoPath = repo.working_tree_dir
+    patterns = []
+    ignoreCase = []
+    for beforePattern, _ in rules:
+        # git grep knows no inline flags, a case insensitive rule makes all rules case insensitive candidates
+        flags, pattern = globalFlags.match(beforePattern).groups()
+        patterns += ["-e", pattern]
+        ignoreCase = ["-i"] if "i" in flags else ignoreCase
+    # git grep exits with 1 if nothing matches
+    files = repo.git.grep("-z", "--name-only", "-E", *ignoreCase, *patterns, "--", targetPath, with_exceptions=False)
+    return [os.path.join(repoPath, file) for file in files.split("\0") if file]
+
+
+def iterFileDiffs(results, repoPath):
+    """Unified diff of every changed file, in the order of the results."""
+    for path, _, _, _, hunks in results:
+        if hunks is not None:
+            relPath = os.path.relpath(path, repoPath)
+            yield f"--- a/{relPath}\n+++ b/{relPath}\n{hunks}"
+
+
+def literalQuery(items):
+    """
+    Literal strings every match of a parsed pattern contains, as a query for the trigram index.
+
+    Args:
+        items: Parsed pattern, see re._parser.parse
+
+    Returns:
+        None if any file may match, otherwise bytes (the literal must occur) or
+        ("and" | "or", [queries]) combining nested requirements
+    """
+    from re import _constants as constants
+
+    parts = []
+    run = []
+
+    def endRun():
+        if len(run) >= 3:
+            parts.append("".join(run).encode("utf-8", "surrogateescape"))
+        run.clear()
+
+    for op, value in items:
+        if op is constants.LITERAL:
+            run.append(chr(value))
+            continue
+        endRun()
+        query = None
+        if op is constants.SUBPATTERN and not value[1] & re.IGNORECASE:
+            query = literalQuery(value[-1])
+        elif op in (constants.MAX_REPEAT, constants.MIN_REPEAT) and value[0] >= 1:
+            query = literalQuery(value[2])
+        elif op is constants.BRANCH:
+            branches = [literalQuery(branch) for branch in value[1]]
+            if all(branch is not None for branch in branches):
+                query = ("or", branches)
+        if query is not None:
+            parts.append(query)
+    endRun()
+
+    if not parts:
+        return None
+    return parts[0] if len(parts) == 1 else ("and", parts)
+
+
+def rulesQuery(rules):
+    """
+    Trigram index query of the files any of the (before, after) rules can change, None for all files.
+
+    The literals come from the private parser of the re module (Python 3.11 and later). If it
+    is missing or its parse tree has an unexpected shape, all files are scanned instead.
+    """
+    queries = []
     try:
-        files = repo.git.grep("--name-only", "-E", beforePattern, "--", targetPath)
-        for file in files.split():
-            filePath = repoPath + "/" + file
-            sed(
-                ["-E", "s," + beforePattern + "," + afterPattern + ",g"], "-i", filePath
-            )
-    except Exception as err:
-        print("Cannot substitute pattern:", beforePattern, err)
+        from re import _parser as parser
+
+        for beforePattern, _ in rules:
+            parsed = parser.parse(translatePattern(beforePattern))
+            # Global inline flags like a leading (?i) apply to every literal, such a pattern needs all files
+            queries.append(None if parsed.state.flags & re.IGNORECASE else literalQuery(parsed))
+    except (ImportError, AttributeError, TypeError, ValueError, IndexError):
+        return None
+    if any(query is None for query in queries):
+        return None
+    return queries[0] if len(queries) == 1 else ("or", queries)
+
+
+def extractTrigrams(data):
+    """Sorted unique trigrams of bytes as 24 bit integers."""
+    import numpy
+
+    if len(data) < 3:
+        return numpy.zeros(0, dtype=numpy.uint32)
+    values = numpy.frombuffer(data, dtype=numpy.uint8).astype(numpy.uint32)
+    trigrams = (values[:-2] << 16) | (values[1:-1] << 8) | values[2:]
+    # Sorting beats the hash based numpy.unique for file sized arrays
+    trigrams.sort()
+    return trigrams[numpy.concatenate(([True], trigrams[1:] != trigrams[:-1]))]
 
 
-else:
+def isPrintableTrigram(trigrams):
+    """Mask of the trigrams (see extractTrigrams) of three printable ASCII characters."""
+    mask = None
+    for shift in (16, 8, 0):
+        byte = (trigrams >> shift) & 0xFF
+        printable = (byte >= 0x20) & (byte < 0x7F)
+        mask = printable if mask is None else mask & printable
+    return mask
+
+
+def iterBlobContents(repoPath, shas):
+    """Stream the contents of blobs through a single `git cat-file --batch` process."""
+    import threading
+
+    def writeRequests():
+        try:
+            process.stdin.write("".join(f"{sha}\n" for sha in shas).encode())
+            process.stdin.close()
+        except BrokenPipeError:
+            pass  # reader stopped early
+
+    with subprocess.Popen(["git", "cat-file", "--batch"], cwd=repoPath,
+                          stdin=subprocess.PIPE, stdout=subprocess.PIPE) as process:
+        # Requests are written by a thread, so git never waits for a round trip per blob
+        writer = threading.Thread(target=writeRequests, daemon=True)
+        writer.start()
+        for sha in shas:
+            header = process.stdout.readline().split()
+            if len(header) != 3:
+                continue  # missing object
+            data = process.stdout.read(int(header[2]))
+            process.stdout.read(1)
+            yield sha, data
+        writer.join()
+
+
+class TrigramIndex:
+    """
+    Persistent trigram index of the tracked file contents, keyed by blob SHA.
+
+    The SQLite database in the git directory maps every trigram to the sorted ids of the
+    blobs containing it, and every tracked path to its blob. It is synchronized with the git
+    index: while the index file is unchanged nothing is read, otherwise only the blobs of new
+    or changed paths are indexed and blobs no longer referenced by any path are pruned.
+
+    Every update appends a segment of posting lists, so existing lists are never rewritten.
+    Blob ids are never reused, so concatenating the segments of a trigram in order gives its
+    sorted posting list. A list is stored as the first id plus either the id deltas in the
+    narrowest unsigned integer type holding them or, for dense lists, a bitmap of the ids.
+    Of binary blobs (a NUL byte in the first 8000 bytes, like git decides) only the printable
+    ASCII trigrams are indexed, their other mostly unique trigrams would dominate the index.
+    They are candidates of every literal with other bytes.
+    Pruned ids stay in the lists until too many accumulate, then all segments are compacted
+    into one without them.
+    """
+
+    VERSION = 2
+    # Postings collected in memory before they are merged into the database
+    FLUSH_POSTINGS = 1 << 24
+    # Parameters per SQLite statement
+    QUERY_CHUNK = 500
+    # Compact when more segments exist or the lists hold more pruned ids than this share of the live blobs
+    MAX_SEGMENTS = 16
+    MAX_PRUNED_RATIO = 0.25
+
+    def __init__(self, repo, rebuild=False):
+        self.repo = repo
+        self.path = os.path.join(repo.git_dir, "git-replace-trigrams.sqlite")
+        if rebuild and os.path.exists(self.path):
+            os.remove(self.path)
+        self.db = self._connect()
+        version = self._meta("version")
+        if version is None:
+            with self.db:
+                self._setMeta("version", self.VERSION)
+        elif int(version) != self.VERSION:
+            self.db.close()
+            os.remove(self.path)
+            self.db = self._connect()
+            with self.db:
+                self._setMeta("version", self.VERSION)
+
+    def _connect(self):
+        import sqlite3
+
+        db = sqlite3.connect(self.path)
+        db.executescript("""
+            CREATE TABLE IF NOT EXISTS meta(key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS blobs(id INTEGER PRIMARY KEY AUTOINCREMENT, sha TEXT UNIQUE NOT NULL,
+                                             binary INTEGER NOT NULL DEFAULT 0);
+            CREATE TABLE IF NOT EXISTS files(path TEXT PRIMARY KEY, blob INTEGER) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS postings(trigram INTEGER NOT NULL, segment INTEGER NOT NULL, ids BLOB NOT NULL,
+                                                PRIMARY KEY (trigram, segment)) WITHOUT ROWID;
+        """)
+        return db
+
+    def _meta(self, key):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row is not None else None
+
+    def _setMeta(self, key, value):
+        self.db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, str(value)))
+
+    def close(self):
+        self.db.close()
+
+    def _gitIndexStamp(self):
+        """Identity of the current git index file, git replaces the file on every change."""
+        try:
+            info = os.stat(os.path.join(self.repo.git_dir, "index"))
+        except FileNotFoundError:
+            return None
+        return f"{info.st_ino}:{info.st_size}:{info.st_mtime_ns}:{info.st_ctime_ns}"
+
+    def synchronize(self):
+        """
+        Index the blobs of new and changed tracked paths and prune the blobs no path refers to.
+
+        Returns:
+            int: Number of newly indexed blobs
+        """
+        stamp = self._gitIndexStamp()
+        if stamp is not None and stamp == self._meta("stamp"):
+            return 0
+
+        blobs, unmerged = listTrackedBlobs(self.repo, self.repo.working_tree_dir)
+        blobIds = dict(self.db.execute("SELECT sha, id FROM blobs"))
+        newShas = sorted(set(blobs.values()) - blobIds.keys())
+        with self.db:
+            blobIds.update(self._index(newShas))
+
+            # Unmerged paths have no blob, they are always candidates
+            files = {path: blobIds[sha] for path, sha in blobs.items()}
+            files.update((path, None) for path in unmerged)
+            indexedFiles = dict(self.db.execute("SELECT path, blob FROM files"))
+            self.db.executemany("DELETE FROM files WHERE path = ?",
+                                ((path,) for path in indexedFiles.keys() - files.keys()))
+            self.db.executemany("INSERT OR REPLACE INTO files VALUES (?, ?)",
+                                ((path, blob) for path, blob in files.items()
+                                 if path not in indexedFiles or indexedFiles[path] != blob))
+
+            referenced = set(files.values())
+            pruned = [(blobId,) for blobId in blobIds.values() if blobId not in referenced]
+            self.db.executemany("DELETE FROM blobs WHERE id = ?", pruned)
+            self._setMeta("pruned", int(self._meta("pruned") or 0) + len(pruned))
+            self._setMeta("stamp", stamp)
+
+        segments, = self.db.execute("SELECT COALESCE(MAX(segment), 0) FROM postings").fetchone()
+        if segments > self.MAX_SEGMENTS or int(self._meta("pruned")) > self.MAX_PRUNED_RATIO * (len(blobIds) - len(pruned)):
+            self.compact()
+        return len(newShas)
+
+    def _index(self, shas):
+        """
+        Add the blobs to the index as one new segment.
+
+        Returns:
+            dict: sha -> id of the added blobs
+        """
+        import numpy
+
+        ids = {}
+        trigramChunks, idChunks = [], []
+        pending = 0
+        for sha, data in iterBlobContents(self.repo.working_tree_dir, shas):
+            binary = b"\0" in data[:8000]
+            blobId = self.db.execute("INSERT INTO blobs(sha, binary) VALUES (?, ?)", (sha, binary)).lastrowid
+            ids[sha] = blobId
+            trigrams = extractTrigrams(data)
+            if binary:
+                trigrams = trigrams[isPrintableTrigram(trigrams)]
+            trigramChunks.append(trigrams)
+            idChunks.append(numpy.full(len(trigrams), blobId, dtype=numpy.uint32))
+            pending += len(trigrams)
+            if pending >= self.FLUSH_POSTINGS:
+                self._flush(trigramChunks, idChunks)
+                trigramChunks, idChunks, pending = [], [], 0
+        self._flush(trigramChunks, idChunks)
+        return ids
+
+    def compact(self):
+        """Merge all segments into one and drop the ids of pruned blobs from the posting lists."""
+        live = self._idsToBits(blobId for blobId, in self.db.execute("SELECT id FROM blobs"))
+        with self.db:
+            self.db.execute("DROP TABLE IF EXISTS compacted")
+            self.db.execute("CREATE TABLE compacted(trigram INTEGER NOT NULL, segment INTEGER NOT NULL, ids BLOB NOT NULL, "
+                            "PRIMARY KEY (trigram, segment)) WITHOUT ROWID")
+            rows = self.db.execute("SELECT trigram, ids FROM postings ORDER BY trigram, segment")
+            trigram, bits = None, 0
+            batch = []
+            for nextTrigram, data in rows:
+                if nextTrigram != trigram:
+                    if bits & live:
+                        batch.append((trigram, 1, self._encodePosting(self._bitsToIds(bits & live))))
+                    trigram, bits = nextTrigram, 0
+                bits |= self._decodePosting(data)
+                if len(batch) >= self.QUERY_CHUNK:
+                    self.db.executemany("INSERT INTO compacted VALUES (?, ?, ?)", batch)
+                    batch.clear()
+            if bits & live:
+                batch.append((trigram, 1, self._encodePosting(self._bitsToIds(bits & live))))
+            self.db.executemany("INSERT INTO compacted VALUES (?, ?, ?)", batch)
+            self.db.execute("DROP TABLE postings")
+            self.db.execute("ALTER TABLE compacted RENAME TO postings")
+            self._setMeta("pruned", 0)
+        self.db.execute("VACUUM")
+
+    @staticmethod
+    def _idsToBits(ids):
+        """Integer with the bits of the ids set, built in a buffer instead of one big integer per id."""
+        bitmap = bytearray()
+        for blobId in ids:
+            if blobId >> 3 >= len(bitmap):
+                bitmap.extend(bytes((blobId >> 3) + 1 - len(bitmap)))
+            bitmap[blobId >> 3] |= 1 << (blobId & 7)
+        return int.from_bytes(bitmap, "little")
+
+    @staticmethod
+    def _bitsToIds(bits):
+        import numpy
+
+        data = numpy.frombuffer(bits.to_bytes((bits.bit_length() + 7) // 8, "little"), dtype=numpy.uint8)
+        return numpy.flatnonzero(numpy.unpackbits(data, bitorder="little")).astype(numpy.uint32)
+
+    @staticmethod
+    def _encodePosting(ids):
+        import numpy
+
+        if len(ids) == 1:
+            return bytes([1]) + int(ids[0]).to_bytes(4, "little")
+        deltas = numpy.diff(ids)
+        width = 1 if not len(deltas) or deltas.max() < 1 << 8 else 2 if deltas.max() < 1 << 16 else 4
+        first = ids[:1].astype("<u4").tobytes()
+        bitmapSize = (int(ids[-1] - ids[0]) >> 3) + 1
+        if bitmapSize < len(deltas) * width:
+            # Width 0: bit k of the bitmap is id first + k
+            bitmap = numpy.zeros(bitmapSize * 8, dtype=bool)
+            bitmap[ids - ids[0]] = True
+            return bytes([0]) + first + numpy.packbits(bitmap, bitorder="little").tobytes()
+        return bytes([width]) + first + deltas.astype(f"<u{width}").tobytes()
+
+    @staticmethod
+    def _decodePosting(data):
+        """Blob ids of a stored posting list as the bits of an integer."""
+        from array import array
+        from itertools import accumulate
+
+        first = int.from_bytes(data[1:5], "little")
+        if data[0] == 0:
+            return int.from_bytes(data[5:], "little") << first
+        deltas = array({1: "B", 2: "H", 4: "I"}[data[0]], data[5:])
+        if sys.byteorder != "little":
+            deltas.byteswap()
+        return TrigramIndex._idsToBits(accumulate(deltas, initial=first))
+
+    def _fetchPostings(self, trigrams):
+        """Blob ids of every trigram as the bits of an integer, trigrams without blobs are left out."""
+        postings = {}
+        for start in range(0, len(trigrams), self.QUERY_CHUNK):
+            chunk = trigrams[start:start + self.QUERY_CHUNK]
+            rows = self.db.execute(f"SELECT trigram, ids FROM postings WHERE trigram IN ({','.join('?' * len(chunk))})",
+                                   chunk)
+            for trigram, data in rows:
+                postings[trigram] = postings.get(trigram, 0) | self._decodePosting(data)
+        return postings
+
+    def _flush(self, trigramChunks, idChunks):
+        """Store the collected postings as a new segment."""
+        import numpy
+
+        if not trigramChunks:
+            return
+        trigrams = numpy.concatenate(trigramChunks)
+        ids = numpy.concatenate(idChunks)
+        if not len(trigrams):
+            return
+        # Sorting (trigram, id) keys keeps the ids of every trigram sorted
+        keys = (trigrams.astype(numpy.uint64) << 32) | ids
+        keys.sort()
+        trigrams, ids = (keys >> 32).astype(numpy.uint32), (keys & 0xFFFFFFFF).astype(numpy.uint32)
+        starts = numpy.concatenate(([0], numpy.flatnonzero(numpy.diff(trigrams)) + 1))
+        ends = numpy.append(starts[1:], len(trigrams))
+
+        segment, = self.db.execute("SELECT COALESCE(MAX(segment), 0) + 1 FROM postings").fetchone()
+        rows = ((trigram, segment, self._encodePosting(ids[start:end]))
+                for trigram, start, end in zip(trigrams[starts].tolist(), starts, ends))
+        self.db.executemany("INSERT INTO postings VALUES (?, ?, ?)", rows)
+
+    def _evaluate(self, query):
+        """Ids of the blobs satisfying a literalQuery as the bits of an integer."""
+        if isinstance(query, bytes):
+            # Trigrams of the literal, like extractTrigrams without numpy
+            trigrams = sorted({int.from_bytes(query[i:i + 3], "big") for i in range(len(query) - 2)})
+            postings = self._fetchPostings(trigrams)
+            bits = -1
+            for trigram in trigrams:
+                bits &= postings.get(trigram, 0)
+                if not bits:
+                    break
+            if not all(0x20 <= byte < 0x7f for byte in query):
+                # Binary blobs lack the trigrams with other bytes
+                bits |= self._idsToBits(blobId for blobId, in self.db.execute("SELECT id FROM blobs WHERE binary ORDER BY id"))
+            return bits
+        op, queries = query
+        bits = -1 if op == "and" else 0
+        for subquery in queries:
+            if op == "and":
+                bits &= self._evaluate(subquery)
+            else:
+                bits |= self._evaluate(subquery)
+        return bits
+
+    def query(self, query, prefix=""):
+        """
+        Tracked paths which may match the query.
+
+        Args:
+            query: literalQuery of the patterns, None for all paths
+            prefix: Repository relative directory or file to restrict the paths to, "" for all
+
+        Returns:
+            list: Repository relative paths, unmerged paths included
+        """
+        bits = self._evaluate(query) if query is not None else -1
+        if prefix:
+            rows = self.db.execute("SELECT path, blob FROM files WHERE path = ? OR (path >= ? AND path < ?)",
+                                   (prefix, prefix + "/", prefix + "0"))
+        else:
+            rows = self.db.execute("SELECT path, blob FROM files")
+        return [path for path, blob in rows if blob is None or bits >> blob & 1]
+
+    def stats(self):
+        """Index size and freshness relative to the git index."""
+        blobs, binary = self.db.execute("SELECT COUNT(*), COALESCE(SUM(binary), 0) FROM blobs").fetchone()
+        files, = self.db.execute("SELECT COUNT(*) FROM files").fetchone()
+        trigrams, segments = self.db.execute(
+            "SELECT COUNT(DISTINCT trigram), COALESCE(MAX(segment), 0) FROM postings").fetchone()
+        return {
+            "blobs": blobs,
+            "binary": binary,
+            "files": files,
+            "current": self._meta("stamp") == self._gitIndexStamp(),
+            "pruned": int(self._meta("pruned") or 0),
+            "trigrams": trigrams,
+            "segments": segments,
+            "size": os.path.getsize(self.path),
+        }
+
+
+def listTrackedBlobs(repo, targetPath):
+    """
+    Returns:
+        tuple: (
+            dict: repository relative path -> blob sha of the regular tracked files below targetPath,
+            list: unmerged paths, their content is in the working tree only
+        )
+    """
+    blobs = {}
+    unmerged = []
+    for record in repo.git.ls_files("-z", "--stage", "--", targetPath).split("\0"):
+        if not record:
+            continue
+        info, path = record.split("\t", 1)
+        mode, sha, stage = info.split()
+        if stage != "0":
+            unmerged.append(path)
+        elif mode.startswith("100"):
+            blobs[path] = sha
+    return blobs, sorted(set(unmerged))
+
+
+def listIndexedCandidates(repo, rules, targetPath, index):
+    """
+    Like listCandidates, but narrowed by the trigram index instead of a full `git grep`.
+
+    Files modified in the working tree and unmerged files are always candidates, the regex
+    verification of the substitution engine skips the files without a match.
+    """
+    repoPath = repo.working_tree_dir
+    started = time.perf_counter()
+    indexed = index.synchronize()
+    if indexed:
+        print(f"Indexed {indexed} blobs in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+
+    prefix = os.path.relpath(targetPath, repoPath)
+    candidates = set(index.query(rulesQuery(rules), "" if prefix == "." else prefix))
+    candidates.update(path for path in repo.git.ls_files("-z", "--modified", "--", targetPath).split("\0") if path)
+    return [os.path.join(repoPath, path) for path in sorted(candidates)
+            if os.path.isfile(os.path.join(repoPath, path))]
+
+
+def replaceContents(repo, rules, targetPath, jobs, useMmap=False, preview=False, index=None):
+    """
+    Apply the (before, after) rules to all tracked files below targetPath in a single pass.
+
+    A preview prints the unified diff of the changes to stdout instead, file by file as soon
+    as the workers finish them, and the summary to stderr. With a TrigramIndex the candidate
+    files come from the index instead of `git grep`.
+    """
+    started = time.perf_counter()
+    # Fail on invalid patterns and group references before any file is touched
+    compiledRules, _ = compileSubstitution(rules, binary=useMmap)
+    for linePattern, replacement in compiledRules:
+        linePattern.sub(replacement, replacement[:0])
+    if index is None:
+        paths = listCandidates(repo, rules, targetPath)
+    else:
+        paths = listIndexedCandidates(repo, rules, targetPath, index)
+
+    rewritten = touched = totalMatches = bytesWritten = 0
+
+    def countResults(results):
+        nonlocal rewritten, touched, totalMatches, bytesWritten
+        for result in results:
+            path, matches, written, err, hunks = result
+            if err is not None:
+                print("Cannot substitute pattern:", path, err, file=sys.stderr)
+            totalMatches += matches
+            bytesWritten += written
+            rewritten += 1 if written else 0
+            touched += 1 if hunks is not None else 0
+            yield result
+
+    results = countResults(iterSubstitutions(paths, rules, jobs, useMmap, preview))
+    if preview:
+        for diff in iterFileDiffs(results, repo.working_tree_dir):
+            sys.stdout.buffer.write(diff.encode("utf-8", "surrogateescape"))
+            sys.stdout.buffer.flush()
+    else:
+        for _ in results:
+            pass
+
+    elapsed = time.perf_counter() - started
+    rate = len(paths) / elapsed if elapsed else 0
+    if preview:
+        print(f"Would rewrite {touched} of {len(paths)} files, {totalMatches} matches "
+              f"in {elapsed:.2f}s ({rate:.0f} files/s)", file=sys.stderr)
+    else:
+        print(f"Rewrote {rewritten} of {len(paths)} files, {totalMatches} matches, {bytesWritten} bytes "
+              f"in {elapsed:.2f}s ({rate:.0f} files/s)")
+
+
+# Index entry of a removed path in `git update-index --index-info`
+REMOVED_ENTRY = "0 " + "0" * 40
+
+
+def listIndexEntries(repo, targetPath):
+    """
+    Returns:
+        dict: repository relative path -> (mode, blob sha) of every tracked file below targetPath
+    """
+    entries = {}
+    for record in repo.git.ls_files("-z", "--stage", "--", targetPath).split("\0"):
+        if not record:
+            continue
+        info, path = record.split("\t", 1)
+        mode, sha, stage = info.split()
+        if stage != "0":
+            raise ValueError(f"{path} is unmerged, resolve the conflict before renaming")
+        entries[path] = (mode, sha)
+    return entries
+
+
+def parentDirectories(paths):
+    """All directories containing the repository relative paths, each parent is expanded once."""
+    directories = set()
+    pending = {path.rpartition("/")[0] for path in paths}
+    while pending:
+        directory = pending.pop()
+        if directory and directory not in directories:
+            directories.add(directory)
+            pending.add(directory.rpartition("/")[0])
+    return directories
+
+
+def planRenames(entries, beforePattern, afterPattern, repoPath, trackedPaths):
+    """
+    Compute the complete rename plan and check it for collisions before anything is moved.
+
+    Args:
+        entries: Candidate paths with their (mode, sha), see listIndexEntries
+        trackedPaths: All tracked paths of the repository
+
+    Returns:
+        list: (old path, new path) pairs
+
+    Raises:
+        ValueError: Listing every collision of the plan
+    """
+    pattern = re.compile(beforePattern)
+    plan = []
+    for path in entries:
+        if pattern.search(path) is not None:
+            newPath = pattern.sub(afterPattern, path)
+            if newPath != path:
+                plan.append((path, newPath))
+
+    sources = {path for path, _ in plan}
+    remaining = set(trackedPaths) - sources
+    collisions = []
+    targets = {}
+    for path, newPath in plan:
+        if newPath in targets:
+            collisions.append(f"{path} and {targets[newPath]} both become {newPath}")
+        elif newPath in remaining:
+            collisions.append(f"{path} becomes the tracked file {newPath}")
+        elif newPath not in sources and os.path.lexists(os.path.join(repoPath, newPath)):
+            collisions.append(f"{path} becomes the existing file {newPath}")
+        targets.setdefault(newPath, path)
+
+    # A file cannot share its path with a directory of another file
+    finalPaths = remaining | set(targets)
+    directories = parentDirectories(finalPaths)
+    for newPath, path in targets.items():
+        if newPath in directories:
+            collisions.append(f"{path} becomes {newPath}, which is a directory of other files")
+        for parent in parentDirectories([newPath]):
+            if parent in finalPaths:
+                collisions.append(f"{path} becomes {newPath} below the file {parent}")
+    if collisions:
+        raise ValueError("rename collisions:\n  " + "\n  ".join(collisions))
+    return plan
+
+
+def moveFiles(plan, repoPath):
+    """
+    Rename the working tree files of the plan.
+
+    If one of the renames fails, all renames are undone and the directories created for the
+    targets are removed again.
+    """
+    # Sources which are targets of other renames are moved aside first, so chains and swaps work
+    targets = {newPath for _, newPath in plan}
+    current = {}
+    moved = []
+    createdDirectories = []
     try:
-        files = repo.git.ls_files(targetPath)
-        for file in files.split():
-            match = re.search(beforePattern, file, re.RegexFlag.DEBUG)
-            if not match is None:
-                newFile = re.sub(beforePattern, afterPattern, file)
-                repo.git.mv(file, newFile)
-    except Exception as err:
-        print("Cannot renamie files with pattern:", beforePattern, err)
+        for path, _ in plan:
+            current[path] = os.path.join(repoPath, path)
+            if path in targets:
+                temporary = f"{current[path]}.git-replace-{os.getpid()}"
+                os.rename(current[path], temporary)
+                moved.append((current[path], temporary))
+                current[path] = temporary
+        existing = set()
+        for path, newPath in plan:
+            target = os.path.join(repoPath, newPath)
+            directory = os.path.dirname(target)
+            if directory not in existing:
+                missing = []
+                parent = directory
+                while not os.path.isdir(parent):
+                    missing.append(parent)
+                    parent = os.path.dirname(parent)
+                for parent in reversed(missing):
+                    os.mkdir(parent)
+                    createdDirectories.append(parent)
+                existing.add(directory)
+            os.rename(current[path], target)
+            moved.append((current[path], target))
+    except BaseException:
+        for source, target in reversed(moved):
+            os.rename(target, source)
+        for directory in reversed(createdDirectories):
+            os.rmdir(directory)
+        raise
+
+    # Like git mv, directories left empty are removed
+    for directory in {os.path.dirname(os.path.join(repoPath, path)) for path, _ in plan}:
+        while directory != repoPath and os.path.isdir(directory) and not os.listdir(directory):
+            os.rmdir(directory)
+            directory = os.path.dirname(directory)
+
+
+def renameFiles(repo, beforePattern, afterPattern, targetPath, preview=False):
+    """
+    Rename every tracked file below targetPath whose repository relative path matches the pattern.
+
+    The plan is computed in memory and applied with filesystem renames plus one
+    `git update-index --index-info` call, which moves the index entries without hashing any file.
+    `git add --refresh` then records the stat data of the moved files in their new entries.
+    """
+    started = time.perf_counter()
+    repoPath = repo.working_tree_dir
+    entries = listIndexEntries(repo, targetPath)
+    trackedPaths = repo.git.ls_files("-z").split("\0")
+    plan = planRenames(entries, beforePattern, afterPattern, repoPath, trackedPaths)
+
+    if preview:
+        for path, newPath in plan:
+            print(f"{path} -> {newPath}")
+        print(f"Would rename {len(plan)} of {len(entries)} files", file=sys.stderr)
+        return
+
+    if plan:
+        moveFiles(plan, repoPath)
+        indexInfo = []
+        for path, newPath in plan:
+            mode, sha = entries[path]
+            indexInfo.append(f"{REMOVED_ENTRY}\t{path}\0")
+            indexInfo.append(f"{mode} {sha} 0\t{newPath}\0")
+        try:
+            subprocess.run(["git", "update-index", "-z", "--index-info"], cwd=repoPath, check=True,
+                           input="".join(indexInfo).encode("utf-8", "surrogateescape"))
+        except BaseException:
+            # Leave working tree and index consistent
+            moveFiles([(newPath, path) for path, newPath in plan], repoPath)
+            raise
+        # The new entries carry no stat data, refresh it so later commands do not rehash every moved file
+        subprocess.run(["git", "--literal-pathspecs", "add", "--refresh", "--pathspec-from-file=-", "--pathspec-file-nul"],
+                       cwd=repoPath, check=True,
+                       input="".join(f"{newPath}\0" for _, newPath in plan).encode("utf-8", "surrogateescape"))
+
+    elapsed = time.perf_counter() - started
+    print(f"Renamed {len(plan)} of {len(entries)} files in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="git-replace",
+        description="Used to replace string patterns within the files in the git repository with the replacement string",
+    )
+
+    parser.add_argument("-b", "--before-pattern",
+                        help="extended regular expression like sed -E, except that of several matching alternatives "
+                             "the first one is substituted instead of the longest (a|ab replaces the a of ab)")
+    parser.add_argument("-a", "--after-pattern",
+                        help="replacement like in sed: & is the match, \\1-\\9 are groups")
+    parser.add_argument("-p", "--repo-path", required=False, default=os.getcwd())
+    parser.add_argument("-f", "--files", action="store_true",
+                        help="rename the tracked files whose paths match (Python re syntax) instead of editing contents")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(),
+                        help="number of worker processes substituting file contents (default: number of CPUs)")
+    parser.add_argument("-m", "--mmap", action="store_true",
+                        help="scan and rewrite files through mmap with bytes patterns (C locale matching), "
+                             "for large files")
+    parser.add_argument("-r", "--rules",
+                        help='JSON file with an array of {"before": ..., "after": ...} content rules, '
+                             'applied in order in a single pass instead of -b/-a')
+    parser.add_argument("-i", "--index", action="store_true",
+                        help="find candidate files with the trigram index in the git directory instead of git grep, "
+                             "the index is updated with the changed paths first")
+    parser.add_argument("--reindex", action="store_true", help="rebuild the trigram index from scratch")
+    parser.add_argument("--index-stats", action="store_true", help="print trigram index statistics")
+    parser.add_argument("-n", "--dry-run", action="store_true",
+                        help="print the changes as unified diff (the rename plan with --files) without applying them")
+
+    args = parser.parse_args()
+    indexOnly = (args.reindex or args.index_stats) and args.rules is None and args.before_pattern is None
+    if not indexOnly and args.rules is None and (args.before_pattern is None or args.after_pattern is None):
+        parser.error("the following arguments are required: -b/--before-pattern, -a/--after-pattern (or -r/--rules)")
+    if args.rules is not None and args.files:
+        parser.error("-r/--rules cannot be used with -f/--files")
+    if args.files and (args.index or args.reindex or args.index_stats):
+        parser.error("the trigram index is used for contents, not with -f/--files")
+
+    beforePattern = args.before_pattern
+    afterPattern = args.after_pattern
+    targetPath = os.path.realpath(args.repo_path)
+
+    if not os.path.isdir(targetPath):
+        raise ValueError("path is not a directory", targetPath)
+
+    # GitPython is imported after argument parsing, so --help and usage errors return instantly
+    from git import Repo
+
+    repo = Repo(targetPath, search_parent_directories=True)
+
+    index = None
+    if args.index or args.reindex or args.index_stats:
+        index = TrigramIndex(repo, rebuild=args.reindex)
+        if args.reindex:
+            started = time.perf_counter()
+            indexed = index.synchronize()
+            print(f"Indexed {indexed} blobs in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+        if args.index_stats:
+            stats = index.stats()
+            print(f"Trigram index {index.path}: {stats['blobs']} blobs ({stats['binary']} binary) of {stats['files']} tracked files "
+                  f"({'current' if stats['current'] else 'outdated'}), {stats['pruned']} pruned blobs not compacted, "
+                  f"{stats['trigrams']} trigrams, {stats['segments']} segments, {stats['size'] / 2 ** 20:.1f} MiB")
+        if indexOnly:
+            index.close()
+            sys.exit(0)
+
+    if not args.files:
+        try:
+            rules = loadRules(args.rules) if args.rules else [(beforePattern, afterPattern)]
+            replaceContents(repo, rules, targetPath, args.jobs, args.mmap, args.dry_run, index if args.index else None)
+        except BrokenPipeError:
+            # The diff reader (e.g. head) went away, silence the flush at interpreter exit
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            sys.exit(1)
+        except Exception as err:
+            print("Cannot substitute pattern:", args.rules or beforePattern, err, file=sys.stderr)
+            sys.exit(1)
+    else:
+        try:
+            renameFiles(repo, beforePattern, afterPattern, targetPath, args.dry_run)
+        except Exception as err:
+            print("Cannot rename files with pattern:", beforePattern, err, file=sys.stderr)
+            sys.exit(1)
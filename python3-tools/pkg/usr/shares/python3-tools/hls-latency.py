@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Latency measurement of a low-latency HLS stream, e.g. `http-video-streamin-server --low-latency`.
+
+Run the server with its default videotestsrc source: a live source timestamps every frame at
+capture, so the EXT-X-PROGRAM-DATE-TIME of a segment is the capture time of its first frame and
+every part starts at that time plus the durations of the parts before it. The tool follows the
+stream like an LL-HLS player. It blocks on the playlist for the next part (_HLS_msn/_HLS_part),
+downloads every part as soon as it is announced and compares the wall clock with the capture time
+of the part's end. A player keeps PART-HOLD-BACK behind the live edge, so the glass-to-glass
+estimate adds it to the receive latency (decoding and display come on top). Server and tool must
+share a clock, i.e. run on one machine or be NTP synchronized.
+"""
+import argparse
+import re
+import sys
+import time
+from datetime import datetime
+from urllib.parse import urljoin, urlsplit
+
+attribute = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+
+def parseAttributes(value):
+    return {name: value.strip('"') for name, value in attribute.findall(value)}
+
+
+def parsePlaylist(text):
+    """
+    Parse a low-latency media playlist.
+
+    Returns:
+        tuple: (
+            dict: EXT-X-SERVER-CONTROL and EXT-X-PART-INF attributes,
+            list: (msn, part index, uri, duration in seconds, capture time of the part start or None) of every listed part
+        )
+    """
+    control, parts = {}, []
+    msn, index, captureTime = 0, 0, None
+    for line in text.splitlines():
+        line = line.strip()
+        tag, _, value = line.partition(":")
+        if tag == "#EXT-X-MEDIA-SEQUENCE":
+            msn = int(value)
+        elif tag in ("#EXT-X-SERVER-CONTROL", "#EXT-X-PART-INF"):
+            control.update(parseAttributes(value))
+        elif tag == "#EXT-X-PROGRAM-DATE-TIME":
+            captureTime = datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        elif tag == "#EXT-X-PART":
+            part = parseAttributes(value)
+            duration = float(part["DURATION"])
+            parts.append((msn, index, part["URI"], duration, captureTime))
+            captureTime = captureTime + duration if captureTime is not None else None
+            index += 1
+        elif line and not line.startswith("#"):
+            msn, index = msn + 1, 0
+    return control, parts
+
+
+class Follower:
+    """
+    Follows the live edge of a low-latency playlist over one keep-alive connection.
+
+    Attributes:
+        url (str): Playlist url
+        latencies (dict): "announced", "received", "glass-to-glass": list of latencies in seconds
+        errors (collections.Counter): Failed requests by status
+    """
+
+    def __init__(self, url, timeout):
+        from collections import Counter
+        from http.client import HTTPConnection
+        self.url = url
+        parts = urlsplit(url)
+        self.playlistPath = parts.path
+        self.connection = HTTPConnection(parts.hostname, parts.port or 80, timeout=timeout)
+        self.latencies = {"announced": [], "received": [], "glass-to-glass": []}
+        self.errors = Counter()
+        self.holdBack = None
+        self.partTarget = None
+
+    def get(self, path):
+        self.connection.request("GET", path)
+        response = self.connection.getresponse()
+        return response.status, response.read()
+
+    def reload(self, msn=None, part=None):
+        """
+        Load the playlist, blocking until it contains part of segment msn if given.
+
+        Returns:
+            list: Parts of the playlist, None on an error response
+        """
+        path = self.playlistPath if msn is None else f"{self.playlistPath}?_HLS_msn={msn}&_HLS_part={part}"
+        status, body = self.get(path)
+        if status != 200:
+            self.errors[f"playlist {status}"] += 1
+            return None
+        control, parts = parsePlaylist(body.decode())
+        if "PART-HOLD-BACK" not in control or not parts:
+            raise ValueError(f"{self.url} is no low-latency playlist with parts")
+        self.holdBack = float(control["PART-HOLD-BACK"])
+        self.partTarget = float(control.get("PART-TARGET", 0))
+        return parts
+
+    def follow(self, duration, verbose):
+        deadline = time.monotonic() + duration
+        parts = None
+        while parts is None and time.monotonic() < deadline:
+            parts = self.reload()
+        if parts is None:
+            return
+        msn, index = parts[-1][:2]
+        nextPart = (msn, index + 1)
+        while time.monotonic() < deadline:
+            parts = self.reload(*nextPart)
+            announced = time.time()
+            if parts is None:
+                continue
+            for msn, index, uri, partDuration, captureTime in parts:
+                if (msn, index) < nextPart:
+                    continue
+                status, _ = self.get(urlsplit(urljoin(self.url, uri)).path)
+                received = time.time()
+                nextPart = (msn, index + 1)
+                if status != 200:
+                    self.errors[f"part {status}"] += 1
+                    continue
+                if captureTime is None:
+                    continue
+                end = captureTime + partDuration
+                self.latencies["announced"].append(announced - end)
+                self.latencies["received"].append(received - end)
+                self.latencies["glass-to-glass"].append(received - end + self.holdBack)
+                if verbose:
+                    print(f"{uri:24} announced {(announced - end) * 1000:7.1f}ms  received {(received - end) * 1000:7.1f}ms",
+                          file=sys.stderr)
+
+
+def percentile(sortedValues, fraction):
+    return sortedValues[min(len(sortedValues) - 1, int(fraction * len(sortedValues)))]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog="hls-latency", description="Measure the latency of a low-latency HLS stream")
+    parser.add_argument("url", help="playlist url, e.g. http://localhost:8080/stream")
+    parser.add_argument("-d", "--duration", type=float, default=30.0, help="seconds to follow the stream (default: 30)")
+    parser.add_argument("--max-latency", type=float, default=2.0,
+                        help="fail if the median glass-to-glass estimate exceeds this many seconds (default: 2)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="seconds to wait for a response (default: 10)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print the latency of every part")
+    args = parser.parse_args()
+
+    follower = Follower(args.url, args.timeout)
+    try:
+        follower.follow(args.duration, args.verbose)
+    except KeyboardInterrupt:
+        pass
+
+    count = len(follower.latencies["received"])
+    if not count:
+        print("No parts with EXT-X-PROGRAM-DATE-TIME received", file=sys.stderr)
+        sys.exit(1)
+    print(f"parts {count}, PART-TARGET {follower.partTarget:.3f}s, PART-HOLD-BACK {follower.holdBack:.3f}s")
+    print(f"{'':16} {'p50':>9} {'p95':>9} {'max':>9}")
+    for name, values in follower.latencies.items():
+        values = sorted(values)
+        print(f"{name:16} " + " ".join(f"{percentile(values, fraction) * 1000:7.1f}ms" for fraction in (0.5, 0.95, 1.0)))
+    for error, errorCount in follower.errors.most_common():
+        print(f"error {error}: {errorCount}")
+    sys.exit(1 if percentile(sorted(follower.latencies["glass-to-glass"]), 0.5) > args.max_latency else 0)
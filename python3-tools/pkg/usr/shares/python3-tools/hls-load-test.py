@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Load test of an HLS server, e.g. http-video-streamin-server.
+
+Every simulated viewer holds one keep-alive connection, reloads the playlist like a player (once per
+target duration, half of it when the playlist did not change) and downloads every new segment. A
+segment stalls when its download takes longer than its playback duration, i.e. the viewer would
+rebuffer. The summary reports request latencies, throughput, errors and stalls.
+"""
+import argparse
+import sys
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urljoin, urlsplit
+
+
+class HttpConnection:
+    """
+    Minimal HTTP/1.1 client connection reused for all requests of one viewer.
+
+    Attributes:
+        host (str): Server host
+        port (int): Server port
+        timeout (float): Seconds to wait for a complete response
+    """
+
+    def __init__(self, host, port, timeout):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def _exchange(self, path, headers):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        request = [f"GET {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        request += [f"{name}: {value}" for name, value in headers.items()]
+        self.writer.write(("\r\n".join(request) + "\r\n\r\n").encode("latin-1"))
+        await self.writer.drain()
+
+        lines = (await self.reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ")[1])
+        responseHeaders = {}
+        for line in lines[1:]:
+            name, separator, value = line.partition(":")
+            if separator:
+                responseHeaders[name.strip().lower()] = value.strip()
+        body = await self.reader.readexactly(int(responseHeaders.get("content-length", 0)))
+        if responseHeaders.get("connection", "").lower() == "close":
+            self.close()
+        return status, responseHeaders, body
+
+    async def get(self, path, headers=None):
+        """
+        Send a GET request, reconnecting once if the server closed the idle connection.
+
+        Returns:
+            tuple: (status code, dict of lower case response headers, body bytes)
+        """
+        reused = self.writer is not None
+        try:
+            return await asyncio.wait_for(self._exchange(path, headers or {}), self.timeout)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            self.close()
+            if not reused:
+                raise
+        return await asyncio.wait_for(self._exchange(path, headers or {}), self.timeout)
+
+
+def parsePlaylist(text):
+    """
+    Parse a media playlist.
+
+    Returns:
+        tuple: (float: target duration in seconds, list: (segment uri, duration in seconds) in playlist order)
+    """
+    targetDuration, duration, segments = 5.0, None, []
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("#EXT-X-TARGETDURATION:"):
+            targetDuration = float(line.split(":", 1)[1])
+        elif line.startswith("#EXTINF:"):
+            duration = float(line.split(":", 1)[1].split(",", 1)[0])
+        elif line and not line.startswith("#"):
+            segments.append((line, duration if duration is not None else targetDuration))
+            duration = None
+    return targetDuration, segments
+
+
+class Statistics:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = Counter()
+        self.bytes = 0
+        self.stalls = 0
+
+    def record(self, kind, seconds, size):
+        self.latencies[kind].append(seconds)
+        self.bytes += size
+
+
+async def viewer(url, statistics, startDelay, deadline, liveEdge, reloadInterval, timeout):
+    """Simulate one player until the deadline."""
+    await asyncio.sleep(startDelay)
+    parts = urlsplit(url)
+    connection = HttpConnection(parts.hostname, parts.port or 80, timeout)
+    playlistPath = parts.path + (f"?{parts.query}" if parts.query else "")
+    downloaded = None
+    previous = None
+    try:
+        while time.monotonic() < deadline:
+            reloaded = time.monotonic()
+            try:
+                started = time.perf_counter()
+                status, _, playlist = await connection.get(playlistPath)
+                statistics.record("playlist", time.perf_counter() - started, len(playlist))
+                if status != 200:
+                    statistics.errors[f"playlist {status}"] += 1
+                    await asyncio.sleep(1)
+                    continue
+                targetDuration, segments = parsePlaylist(playlist.decode())
+
+                # Start at the live edge like a player, later download what is new
+                if downloaded is None:
+                    downloaded = {uri for uri, _ in segments[:max(0, len(segments) - liveEdge)]}
+                for uri, duration in segments:
+                    if uri in downloaded or time.monotonic() >= deadline:
+                        continue
+                    segmentUrl = urlsplit(urljoin(url, uri))
+                    started = time.perf_counter()
+                    status, _, body = await connection.get(segmentUrl.path)
+                    elapsed = time.perf_counter() - started
+                    statistics.record("segment", elapsed, len(body))
+                    if status != 200:
+                        statistics.errors[f"segment {status}"] += 1
+                    elif elapsed > duration:
+                        statistics.stalls += 1
+                    downloaded.add(uri)
+            except (OSError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+                statistics.errors[type(e).__name__] += 1
+                connection.close()
+                await asyncio.sleep(1)
+                continue
+
+            if reloadInterval is not None:
+                interval = reloadInterval
+            else:
+                interval = targetDuration if playlist != previous else targetDuration / 2
+            previous = playlist
+            await asyncio.sleep(max(0.0, min(reloaded + interval, deadline) - time.monotonic()))
+    finally:
+        connection.close()
+
+
+def percentile(sortedValues, fraction):
+    return sortedValues[min(len(sortedValues) - 1, int(fraction * len(sortedValues)))]
+
+
+async def run(args):
+    statistics = Statistics()
+    started = time.monotonic()
+    deadline = started + args.ramp_up + args.duration
+    await asyncio.gather(*(viewer(args.url, statistics, args.ramp_up * i / args.viewers, deadline,
+                                  args.live_edge, args.reload_interval, args.timeout)
+                           for i in range(args.viewers)))
+    return statistics, time.monotonic() - started
+
+
+def report(statistics, elapsed, viewers):
+    requests = sum(len(values) for values in statistics.latencies.values())
+    print(f"viewers {viewers}, {elapsed:.1f}s")
+    print(f"requests {requests} ({requests / elapsed:.1f}/s), errors {sum(statistics.errors.values())}, "
+          f"{statistics.bytes / 2**20:.1f} MiB ({statistics.bytes / 2**20 / elapsed:.1f} MiB/s)")
+    print(f"{'':10} {'count':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for kind in ("playlist", "segment"):
+        values = sorted(statistics.latencies[kind])
+        if values:
+            print(f"{kind:10} {len(values):8} " + " ".join(f"{percentile(values, fraction) * 1000:7.1f}ms"
+                                                           for fraction in (0.5, 0.95, 0.99, 1.0)))
+    print(f"stalled segments {statistics.stalls} of {len(statistics.latencies['segment'])}")
+    for error, count in statistics.errors.most_common():
+        print(f"error {error}: {count}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog="hls-load-test", description="Simulate many concurrent HLS viewers")
+    parser.add_argument("url", help="playlist url, e.g. http://localhost:8080/stream")
+    parser.add_argument("-c", "--viewers", type=int, default=200, help="concurrent viewers (default: 200)")
+    parser.add_argument("-d", "--duration", type=float, default=30.0,
+                        help="seconds every viewer watches after the ramp up (default: 30)")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="seconds over which viewers join (default: 5)")
+    parser.add_argument("--live-edge", type=int, default=3,
+                        help="segments behind the end of the playlist a viewer starts at (default: 3)")
+    parser.add_argument("--reload-interval", type=float, default=None,
+                        help="seconds between playlist reloads instead of the player behaviour, 0 reloads back to back")
+    parser.add_argument("--timeout", type=float, default=10.0, help="seconds to wait for a response (default: 10)")
+    args = parser.parse_args()
+
+    # asyncio is imported after argument parsing to keep --help fast
+    import asyncio
+    statistics, elapsed = asyncio.run(run(args))
+    report(statistics, elapsed, args.viewers)
+    sys.exit(1 if statistics.errors or statistics.stalls else 0)
@@ -2,7 +2,6 @@
 import argparse
 import os
 import subprocess
-from flask import Flask, Response
 
 parser = argparse.ArgumentParser(prog=__name__, description="HTTP MJPEG Streaming")
 parser.add_argument("-p", "--http-port", help="http port on which stream will served", required=False, default=8080)
@@ -20,7 +19,8 @@ device = args.device
 gstVideoSource = f"v4l2src device={device}" if captureFromDev else "videotestsrc is-live=true"
 pipeline = f"{gstVideoSource} ! videoconvert ! jpegenc ! appsink name=appsink emit-signals=true"
 
-# Start Flask server
+# Start Flask server, flask is imported after argument parsing to keep --help fast
+from flask import Flask, Response
 app = Flask(__name__)
 
 @app.route('/stream.mjpg')
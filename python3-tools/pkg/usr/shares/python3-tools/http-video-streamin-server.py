@@ -1,49 +1,945 @@
 #!/usr/bin/python3
 import argparse
+import math
 import os
+import re
+import struct
 import subprocess
-from flask import Flask, Response, send_from_directory
+import sys
+import threading
+import time
 
 
-parser = argparse.ArgumentParser(prog=__name__, description="HTTP Live Streaming")
-parser.add_argument("-p", "--http-port", help="http port on which stream will served", required=False, default=8080)
-parser.add_argument("--stream-location", help="stream metadata output location", required=False, default=os.path.realpath(os.path.curdir))
-parser.add_argument("--host", help="ip4 address on which the stream should be published", required=False, default="0.0.0.0")
-parser.add_argument("--playlist-file-name", help="the name of the playlist file", required=False, default="stream")
-parser.add_argument("--capture-stream-from-device", help="if true will capture stream from device provided in option --device", required=False, action="store_true")
-parser.add_argument("--device", help="device location, where the stream will be taken from", required=False, default="/dev/video0")
+# Settings of the command line, main() replaces these defaults
+# Directory where HLS segments and playlists are stored
+hlsDir = os.path.realpath(os.path.curdir)
+playlistFile = "stream"
+host = "0.0.0.0"
+httpPort = 8080
+captureFromDev = False
+device = "/dev/video0"
+maxConnections = 1024
+keepAliveTimeout = 15.0
+cacheSegments = 8
+lowLatency = False
+partTarget = 0.2
+segmentTarget = 2.0
+framerate = 30
+tsInput = None
+gstVideoSource = "videotestsrc is-live=true"
 
-args = parser.parse_args()
+# Only the playlist and the hlssink2 segment files (segment%05d.ts) are served, never other files of the stream location
+segmentName = re.compile(r"segment[0-9]{5,}\.ts")
+byteRange = re.compile(r"bytes=([0-9]*)-([0-9]*)")
+maxHeaderBytes = 16 * 1024
+reasons = {
+    200: "OK",
+    206: "Partial Content",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    416: "Range Not Satisfiable",
+    431: "Request Header Fields Too Large",
+    503: "Service Unavailable",
+}
+# The playlist changes with every segment and must always be revalidated. Segment names are reused
+# when the pipeline restarts, so segments are only cached for a while instead of forever.
+playlistCacheControl = "no-cache"
+segmentCacheControl = "public, max-age=60"
+activeConnections = 0
+segmentCache = None
+lowLatencyStream = None
+# Segment and partial segment names of --low-latency
+lowLatencyName = re.compile(r"segment([0-9]+)(?:\.([0-9]+))?\.ts")
+# Complete segments of the --low-latency playlist, older segments and their parts are dropped from memory
+lowLatencyWindow = 6
 
-# Directory where HLS segments and playlists are stored
-hlsDir = args.stream_location
-playlistFile = args.playlist_file_name
-host = args.host
-httpPort = args.http_port
-captureFromDev = args.capture_stream_from_device
-device = args.device
-
-#start gstreamer and capture video stream
-gstVideoSource = f"v4l2src device={device}" if captureFromDev else "videotestsrc is-live=true"
-subprocess.Popen(f'gst-launch-1.0 -v   {gstVideoSource} '
-               f' !   videoconvert '
-               f' !   x264enc '
-               f' !   hlssink2 location={hlsDir}/segment%05d.ts target-duration=5   playlist-location={hlsDir + "/" + playlistFile}',
-               shell=True)
-
-#define http responces and start flusk http server
-app = Flask(__name__)
-
-@app.route('/' + playlistFile)
-def playlist():
-    # Serve the playlist file
-    return send_from_directory(hlsDir, playlistFile)
-
-@app.route('/<segment_name>.ts')
-def segments(segment_name):
-    # Serve the segment files
-    return send_from_directory(hlsDir, f'{segment_name}.ts')
+# inotify(7) event masks and the fixed part of struct inotify_event
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+inotifyEvent = struct.Struct("iIII")
+
+# MPEG-TS packet size and the 33 bit wrap around of its 90 kHz timestamps
+tsPacketSize = 188
+tsClock = 90000
+tsTimestampWrap = 1 << 33
+
+
+def parseRange(value, size):
+    """
+    Parse the Range header of a request for a file of size bytes.
+
+    Only a single byte range is supported, anything else is ignored and the whole file is served.
+
+    Args:
+        value (str): Range header, e.g. "bytes=0-1023", "bytes=1024-" or "bytes=-512"
+        size (int): File size in bytes
+
+    Returns:
+        tuple: (first byte, byte count) or None to serve the whole file
+
+    Raises:
+        ValueError: If the range lies outside of the file
+    """
+    match = byteRange.fullmatch(value.strip())
+    if match is None or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last bytes of the file
+        if int(last) == 0:
+            raise ValueError(f"Empty suffix range {value!r}")
+        start = max(0, size - int(last))
+        return start, size - start
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        raise ValueError(f"Range {value!r} starts after the end of {size} bytes")
+    if end < start:
+        return None
+    return start, end - start + 1
+
+
+def responseHead(status, headers, keepAlive):
+    lines = [f"HTTP/1.1 {status} {reasons[status]}", time.strftime("Date: %a, %d %b %Y %H:%M:%S GMT", time.gmtime())]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    lines.append("Connection: keep-alive" if keepAlive else "Connection: close")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+def errorResponse(status, keepAlive, sendBody=True, headers=None):
+    body = f"{status} {reasons[status]}\n".encode()
+    head = responseHead(status, {"Content-Type": "text/plain", "Content-Length": len(body), **(headers or {})}, keepAlive)
+    return head + body if sendBody else head
+
+
+def entityTag(stat):
+    """ETag of a file version, a rewritten file gets a new inode or modification time."""
+    return f'"{stat.st_ino:x}-{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def respond(method, requestHeaders, size, etag, contentType, cacheControl, keepAlive):
+    """
+    Build the response to a GET or HEAD request of a file or cached buffer.
+
+    Args:
+        method (str): GET or HEAD
+        requestHeaders (dict): Request headers with lower case names
+        size (int): Size of the whole file
+        etag (str): Entity tag of the file version
+        contentType (str): Content-Type of the file
+        cacheControl (str): Cache-Control of the file
+        keepAlive (bool): True if the connection stays open
+
+    Returns:
+        tuple: (bytes: complete response head, int: first body byte, int: number of body bytes to send after the head)
+    """
+    headers = {"Content-Type": contentType, "Accept-Ranges": "bytes", "ETag": etag, "Cache-Control": cacheControl}
+    ifNoneMatch = requestHeaders.get("if-none-match")
+    if ifNoneMatch is not None and (ifNoneMatch.strip() == "*" or etag in (tag.strip() for tag in ifNoneMatch.split(","))):
+        return responseHead(304, {"ETag": etag, "Cache-Control": cacheControl}, keepAlive), 0, 0
+
+    start, count = 0, size
+    status = 200
+    if "range" in requestHeaders:
+        try:
+            requested = parseRange(requestHeaders["range"], size)
+        except ValueError:
+            return errorResponse(416, keepAlive, method == "GET", {"Content-Range": f"bytes */{size}"}), 0, 0
+        if requested is not None:
+            start, count = requested
+            status = 206
+            headers["Content-Range"] = f"bytes {start}-{start + count - 1}/{size}"
+    headers["Content-Length"] = count
+    return responseHead(status, headers, keepAlive), start, count if method == "GET" else 0
+
+
+async def sendFile(writer, name, contentType, cacheControl, method, requestHeaders, keepAlive):
+    """
+    Answer a GET or HEAD request with a file of the stream location.
+
+    The body is transmitted with sendfile() so segments never pass through user space.
+
+    Returns:
+        bool: True if the connection stays open for further requests
+    """
+    import asyncio
+    try:
+        file = open(os.path.join(hlsDir, name), "rb")
+    except (FileNotFoundError, IsADirectoryError):
+        writer.write(errorResponse(404, keepAlive, method == "GET"))
+        return keepAlive
+
+    with file:
+        stat = os.fstat(file.fileno())
+        head, start, count = respond(method, requestHeaders, stat.st_size, entityTag(stat), contentType,
+                                     cacheControl, keepAlive)
+        writer.write(head)
+        if count:
+            await asyncio.get_running_loop().sendfile(writer.transport, file, start, count)
+    return keepAlive
+
+
+def sendCached(writer, cached, contentType, cacheControl, method, requestHeaders, keepAlive):
+    """
+    Answer a GET or HEAD request from a buffer of the segment cache.
+
+    Returns:
+        bool: True if the connection stays open for further requests
+    """
+    data, etag = cached
+    head, start, count = respond(method, requestHeaders, len(data), etag, contentType, cacheControl, keepAlive)
+    writer.write(head)
+    if count:
+        writer.write(data[start:start + count])
+    return keepAlive
+
+
+class SegmentCache:
+    """
+    The playlist and the latest segments of the stream location in memory.
+
+    An inotify watch on the stream location loads every segment as soon as hlssink2 closes it and the
+    playlist whenever it is replaced. Segments that drop off the playlist or get deleted are evicted,
+    at most `capacity` segments are kept. Buffers are immutable memoryviews of bytes, so responses
+    slice them without copying and an eviction never changes a response in flight.
+
+    Events are queued and handled in order by one task, which reads the files in a worker thread so
+    the event loop never blocks on the disk. Until a file is cached, requests are served from disk.
+
+    Attributes:
+        directory (str): Stream location
+        playlistName (str): File name of the playlist in the stream location
+        capacity (int): Maximum number of cached segments
+        entries (dict): File name: (memoryview: contents, str: ETag), oldest first
+    """
+
+    def __init__(self, directory, playlistName, capacity):
+        self.directory = directory
+        self.playlistName = playlistName
+        self.capacity = capacity
+        self.entries = {}
+        self.fd = None
+        self.events = None
+        self.task = None
+
+    def get(self, name):
+        """
+        Returns:
+            tuple: (memoryview: contents, str: ETag) or None if the file is not cached
+        """
+        return self.entries.get(name)
+
+    @staticmethod
+    def read(path):
+        """
+        Returns:
+            tuple: (memoryview: contents, str: ETag) or None if the file cannot be read
+        """
+        try:
+            with open(path, "rb") as file:
+                stat = os.fstat(file.fileno())
+                return memoryview(file.read()), entityTag(stat)
+        except OSError:
+            return None
+
+    async def load(self, name):
+        """Read a file into the cache in a worker thread, return False if it cannot be read."""
+        import asyncio
+        entry = await asyncio.get_running_loop().run_in_executor(None, self.read, os.path.join(self.directory, name))
+        self.entries.pop(name, None)
+        if entry is None:
+            return False
+        self.entries[name] = entry
+        return True
+
+    def listedSegments(self):
+        """Segment names of the cached playlist in playlist order."""
+        playlist = self.entries.get(self.playlistName)
+        if playlist is None:
+            return []
+        lines = (line.strip() for line in bytes(playlist[0]).decode("utf-8", "replace").splitlines())
+        return [line for line in lines if line and not line.startswith("#") and segmentName.fullmatch(line)]
+
+    def evict(self):
+        """Drop segments that left the playlist and the oldest ones above the capacity."""
+        listed = set(self.listedSegments())
+        if self.playlistName in self.entries:
+            for name in [name for name in self.entries if name != self.playlistName and name not in listed]:
+                del self.entries[name]
+        segments = [name for name in self.entries if name != self.playlistName]
+        for name in segments[:max(0, len(segments) - self.capacity)]:
+            del self.entries[name]
+
+    async def synchronize(self):
+        """Reload the playlist and the latest listed segments, e.g. at startup or after lost events."""
+        self.entries.clear()
+        await self.load(self.playlistName)
+        for name in self.listedSegments()[-self.capacity:]:
+            await self.load(name)
+        self.evict()
+
+    async def handleEvent(self, mask, name):
+        if mask & IN_Q_OVERFLOW:
+            await self.synchronize()
+        elif mask & (IN_DELETE | IN_MOVED_FROM):
+            self.entries.pop(name, None)
+        elif name == self.playlistName:
+            await self.load(name)
+            # Segments listed before they were closed are picked up now
+            for segment in self.listedSegments()[-self.capacity:]:
+                if segment not in self.entries:
+                    await self.load(segment)
+            self.evict()
+        elif segmentName.fullmatch(name):
+            await self.load(name)
+            self.evict()
+
+    async def handleEvents(self):
+        await self.synchronize()
+        while True:
+            await self.handleEvent(*await self.events.get())
+
+    def readEvents(self):
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = inotifyEvent.unpack_from(data, offset)
+                offset += inotifyEvent.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+                self.events.put_nowait((mask, name))
+
+    def watch(self, loop):
+        """
+        Start watching the stream location with inotify on the event loop.
+
+        Raises:
+            OSError: If inotify is not available
+        """
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(self.directory),
+                                  IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"Cannot watch {self.directory}")
+        import asyncio
+        self.events = asyncio.Queue()
+        loop.add_reader(self.fd, self.readEvents)
+        self.task = loop.create_task(self.handleEvents())
+
+    def close(self, loop):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        if self.fd is not None:
+            loop.remove_reader(self.fd)
+            os.close(self.fd)
+            self.fd = None
+
+
+def programDateTime(seconds):
+    """EXT-X-PROGRAM-DATE-TIME of a wall clock time, in UTC with milliseconds."""
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds)) + f".{int(seconds * 1000) % 1000:03d}Z"
+
+
+def patProgramMapPid(packet, offset):
+    """PID of the first program map table listed by a PAT packet whose payload starts at offset, None if there is none."""
+    if offset >= len(packet):
+        return None
+    section = offset + 1 + packet[offset]
+    if section + 3 > len(packet):
+        return None
+    # The section length counts the bytes after it up to and including the CRC, entries end before the CRC
+    end = min(section + 3 + (((packet[section + 1] & 0x0f) << 8) | packet[section + 2]) - 4, len(packet))
+    for entry in range(section + 8, end - 3, 4):
+        if (packet[entry] << 8) | packet[entry + 1]:
+            return ((packet[entry + 2] & 0x1f) << 8) | packet[entry + 3]
+    return None
+
+
+def pesVideoTimestamp(packet, offset):
+    """
+    Decoding timestamp of a video PES header whose payload starts at offset.
+
+    Returns:
+        int: DTS, the PTS if the header has no DTS, None for other payloads and truncated headers
+    """
+    if offset + 9 > len(packet) or packet[offset:offset + 3] != b"\x00\x00\x01" or not 0xe0 <= packet[offset + 3] <= 0xef:
+        return None
+    flags = packet[offset + 7] >> 6
+    if not flags & 2:
+        return None
+    # The DTS follows the PTS if both are present, it must lie within the header and the packet
+    field = offset + 9 + (5 if flags == 3 else 0)
+    if field + 5 > min(offset + 9 + packet[offset + 8], len(packet)):
+        return None
+    b = packet[field:field + 5]
+    return ((b[0] >> 1) & 7) << 30 | b[1] << 22 | (b[2] >> 1) << 15 | b[3] << 7 | b[4] >> 1
+
+
+def h264Keyframe(packet, offset):
+    """True if the first packet of a H.264 PES carries a SPS or an IDR slice."""
+    if offset + 9 > len(packet):
+        return False
+    position = offset + 9 + packet[offset + 8]
+    # A start code is only searched where its NAL unit header is within the packet as well
+    while (position := packet.find(b"\x00\x00\x01", position, len(packet) - 1)) >= 0:
+        if packet[position + 3] & 0x1f in (5, 7):
+            return True
+        position += 3
+    return False
+
+
+class LowLatencySegment:
+    """
+    Segment of the --low-latency playlist.
+
+    Attributes:
+        msn (int): Media sequence number
+        captureTime (float): Wall clock time the first frame was captured at
+        startDts (int): Unwrapped decoding timestamp of the first frame
+        parts (list): (memoryview: contents, float: duration, bool: starts with a keyframe) of every closed part
+        data (memoryview): Contents of the complete segment, None while it grows
+    """
+
+    def __init__(self, msn, captureTime, startDts):
+        self.msn = msn
+        self.captureTime = captureTime
+        self.startDts = startDts
+        self.parts = []
+        self.data = None
+
+    @property
+    def duration(self):
+        return sum(duration for _, duration, _ in self.parts)
+
+
+class LowLatencyStream:
+    """
+    Low-latency HLS of a live MPEG-TS stream, cut into segments and partial segments in memory.
+
+    A part is closed before the first video frame that would make it longer than the part target,
+    a segment before the first keyframe after the segment target. Every segment starts with the
+    latest PAT and PMT, so segments and their first parts can be decoded on their own. Requests for
+    a playlist, segment or part that is not available yet wait for the `updated` future, which is
+    resolved and replaced whenever a part is closed.
+
+    Attributes:
+        partTarget (float): Maximum part duration in seconds
+        segmentTarget (float): Segment duration in seconds
+        targetDuration (int): EXT-X-TARGETDURATION of the playlist
+        window (int): Complete segments kept in memory and listed by the playlist
+        segments (list): LowLatencySegment of the window, the last one is still growing
+        updated (asyncio.Future): Resolved when the next part is closed
+    """
+
+    def __init__(self, partTarget, segmentTarget, window, loop):
+        self.partTarget = partTarget
+        self.segmentTarget = segmentTarget
+        self.targetDuration = math.ceil(segmentTarget)
+        self.window = window
+        self.segments = []
+        self.loop = loop
+        self.updated = loop.create_future()
+        # Distinguishes the entity tags of different server runs, which reuse sequence numbers
+        self.tag = f"{time.time_ns():x}"
+        self.pending = bytearray()
+        self.part = bytearray()
+        self.partStart = None
+        self.partIndependent = False
+        self.lastDts = None
+        self.frameInterval = 0.0
+        self.pat = self.pmt = self.pmtPid = None
+        self.playlist = None
+
+    @property
+    def current(self):
+        """The growing segment, None before the first keyframe."""
+        return self.segments[-1] if self.segments else None
+
+    def feed(self, data, captureTime=None):
+        """
+        Append MPEG-TS data of the live stream.
+
+        Args:
+            data (bytes): Transport stream packets, packets may be split across calls
+            captureTime (float): Wall clock capture time of the frames starting in data, default: now
+        """
+        captureTime = time.time() if captureTime is None else captureTime
+        self.pending += data
+        offset, changed = 0, False
+        while len(self.pending) - offset >= tsPacketSize:
+            if self.pending[offset] != 0x47:
+                # Lost synchronisation, continue at the next sync byte
+                offset = self.pending.find(b"\x47", offset + 1)
+                if offset < 0:
+                    offset = len(self.pending)
+                continue
+            try:
+                changed |= self.packet(bytes(self.pending[offset:offset + tsPacketSize]), captureTime)
+            except IndexError:
+                pass  # malformed packet, dropped like a lost one
+            offset += tsPacketSize
+        del self.pending[:offset]
+        if changed:
+            self.playlist = None
+            self.updated.set_result(None)
+            self.updated = self.loop.create_future()
+
+    def packet(self, packet, captureTime):
+        """Append a packet, cutting a part before it if it starts a frame, return True if a part was closed."""
+        pid = ((packet[1] & 0x1f) << 8) | packet[2]
+        adaptation = (packet[3] >> 4) & 3
+        offset, randomAccess = 4, False
+        if adaptation & 2:
+            randomAccess = packet[4] > 0 and bool(packet[5] & 0x40)
+            offset = 5 + packet[4]
+        changed = False
+        if offset >= tsPacketSize:
+            pass
+        elif pid == 0:
+            self.pat = packet
+            self.pmtPid = patProgramMapPid(packet, offset)
+        elif pid == self.pmtPid:
+            self.pmt = packet
+        elif packet[1] & 0x40 and adaptation & 1:
+            dts = pesVideoTimestamp(packet, offset)
+            if dts is not None:
+                changed = self.frame(dts, randomAccess or h264Keyframe(packet, offset), captureTime)
+        if self.segments:
+            self.part += packet
+        return changed
+
+    def frame(self, dts, keyframe, captureTime):
+        if self.lastDts is not None:
+            # Unwrap the 33 bit timestamp to the value closest to the previous frame
+            dts = self.lastDts + (dts - self.lastDts + tsTimestampWrap // 2) % tsTimestampWrap - tsTimestampWrap // 2
+            if dts > self.lastDts:
+                self.frameInterval = (dts - self.lastDts) / tsClock
+        changed = False
+        current = self.current
+        if current is None:
+            if keyframe:
+                self.startSegment(dts, captureTime)
+        elif keyframe and (dts - current.startDts) / tsClock >= self.segmentTarget - 0.001:
+            self.closePart(dts)
+            current.data = memoryview(b"".join(data for data, _, _ in current.parts))
+            self.startSegment(dts, captureTime)
+            changed = True
+        elif (dts - self.partStart) / tsClock + self.frameInterval > self.partTarget + 0.001:
+            self.closePart(dts)
+            self.partIndependent = keyframe
+            changed = True
+        self.lastDts = dts
+        return changed
+
+    def closePart(self, dts):
+        self.current.parts.append((memoryview(bytes(self.part)), (dts - self.partStart) / tsClock, self.partIndependent))
+        self.part = bytearray()
+        self.partStart = dts
+
+    def startSegment(self, dts, captureTime):
+        msn = self.current.msn + 1 if self.segments else 0
+        self.segments.append(LowLatencySegment(msn, captureTime, dts))
+        del self.segments[:-self.window - 1]
+        self.part = bytearray(self.pat + self.pmt if self.pat and self.pmt else b"")
+        self.partStart = dts
+        self.partIndependent = True
+
+    def contains(self, msn, part=None):
+        """True if the playlist lists the complete segment msn or, with part, that part or a later one."""
+        current = self.current
+        if current is None:
+            return False
+        if part is None or msn < current.msn:
+            return msn < current.msn
+        return msn == current.msn and part < len(current.parts)
+
+    def isUpcoming(self, msn):
+        """True if requests for segment msn or its parts should wait for them instead of failing."""
+        current = self.current
+        return current is not None and current.msn <= msn <= current.msn + 1
+
+    async def waitFor(self, msn, part, timeout):
+        """
+        Wait until the playlist contains segment msn or its part.
+
+        Returns:
+            bool: False if it did not appear within timeout seconds
+        """
+        import asyncio
+        deadline = self.loop.time() + timeout
+        while not self.contains(msn, part):
+            remaining = deadline - self.loop.time()
+            if remaining <= 0:
+                return False
+            try:
+                await asyncio.wait_for(asyncio.shield(self.updated), remaining)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    def lookup(self, msn, part=None):
+        """
+        Returns:
+            tuple: (memoryview: contents, str: ETag) of a segment or part, None if it is not in memory
+        """
+        for segment in reversed(self.segments):
+            if segment.msn != msn:
+                continue
+            if part is None:
+                return (segment.data, f'"{self.tag}-{msn:x}"') if segment.data is not None else None
+            if part < len(segment.parts):
+                return segment.parts[part][0], f'"{self.tag}-{msn:x}.{part:x}"'
+            return None
+        return None
+
+    def render(self):
+        """
+        Returns:
+            tuple: (memoryview: playlist, str: ETag) or None before the first part was closed
+        """
+        current = self.current
+        if current is None or (not current.parts and len(self.segments) == 1):
+            return None
+        if self.playlist is not None:
+            return self.playlist
+
+        lines = ["#EXTM3U", "#EXT-X-VERSION:6", f"#EXT-X-TARGETDURATION:{self.targetDuration}",
+                 f"#EXT-X-SERVER-CONTROL:CAN-BLOCK-RELOAD=YES,PART-HOLD-BACK={3 * self.partTarget:.3f}",
+                 f"#EXT-X-PART-INF:PART-TARGET={self.partTarget:.3f}",
+                 f"#EXT-X-MEDIA-SEQUENCE:{self.segments[0].msn}", "#EXT-X-INDEPENDENT-SEGMENTS"]
+        # Parts are listed for the last three target durations only
+        withParts, listed = set(), 0.0
+        for segment in reversed(self.segments):
+            if listed < 3 * self.targetDuration:
+                withParts.add(segment.msn)
+            listed += segment.duration
+        for segment in self.segments:
+            lines.append(f"#EXT-X-PROGRAM-DATE-TIME:{programDateTime(segment.captureTime)}")
+            if segment.msn in withParts:
+                for index, (_, duration, independent) in enumerate(segment.parts):
+                    lines.append(f'#EXT-X-PART:DURATION={duration:.5f},URI="segment{segment.msn:05d}.{index}.ts"'
+                                 + (",INDEPENDENT=YES" if independent else ""))
+            if segment.data is not None:
+                lines += [f"#EXTINF:{segment.duration:.5f},", f"segment{segment.msn:05d}.ts"]
+        lines.append(f'#EXT-X-PRELOAD-HINT:TYPE=PART,URI="segment{current.msn:05d}.{len(current.parts)}.ts"')
+        self.playlist = (memoryview(("\n".join(lines) + "\n").encode()),
+                         f'"{self.tag}-{current.msn:x}.{len(current.parts):x}"')
+        return self.playlist
+
+
+async def sendLowLatency(writer, name, query, method, requestHeaders, keepAlive):
+    """
+    Answer a request in --low-latency mode from the LowLatencyStream.
+
+    A playlist request with _HLS_msn (and _HLS_part) blocks until the playlist contains that segment
+    (or part), a request of the segment or part that is about to be written blocks until it is
+    complete. Both fail with 503 after three target durations.
+
+    Returns:
+        bool: True if the connection stays open for further requests
+    """
+    stream = lowLatencyStream
+    timeout = 3 * stream.targetDuration
+    if name == playlistFile:
+        try:
+            msn = int(query["_HLS_msn"][0]) if "_HLS_msn" in query else None
+            part = int(query["_HLS_part"][0]) if "_HLS_part" in query else None
+        except ValueError:
+            msn = part = -1
+        current = stream.current
+        if (msn is None and part is not None) or (msn is not None and min(msn, part or 0) < 0) \
+                or (msn is not None and current is not None and msn > current.msn + 2):
+            writer.write(errorResponse(400, keepAlive, method == "GET"))
+            return keepAlive
+        if msn is not None and not await stream.waitFor(msn, part, timeout):
+            writer.write(errorResponse(503, keepAlive, method == "GET"))
+            return keepAlive
+        playlist = stream.render()
+        if playlist is None:
+            writer.write(errorResponse(404, keepAlive, method == "GET"))
+            return keepAlive
+        # A blocking reload url names one playlist version, so caches may keep it
+        cacheControl = playlistCacheControl if msn is None else segmentCacheControl
+        return sendCached(writer, playlist, "application/vnd.apple.mpegurl", cacheControl, method, requestHeaders, keepAlive)
+
+    match = lowLatencyName.fullmatch(name)
+    if match is None:
+        writer.write(errorResponse(404, keepAlive, method == "GET"))
+        return keepAlive
+    msn, part = int(match[1]), None if match[2] is None else int(match[2])
+    cached = stream.lookup(msn, part)
+    if cached is None and stream.isUpcoming(msn) and await stream.waitFor(msn, part, timeout):
+        cached = stream.lookup(msn, part)
+    if cached is None:
+        writer.write(errorResponse(404, keepAlive, method == "GET"))
+        return keepAlive
+    return sendCached(writer, cached, "video/mp2t", segmentCacheControl, method, requestHeaders, keepAlive)
+
+
+def startLowLatencyPipeline(stream, loop):
+    """
+    Run the gstreamer pipeline in-process and feed its MPEG-TS output to the stream.
+
+    Buffers of a live source are timestamped at capture, so the running time of every muxed buffer
+    gives the wall clock capture time of its frame.
+
+    Returns:
+        Gst.Pipeline: The playing pipeline
+    """
+    import gi
+    gi.require_version('Gst', '1.0')
+    from gi.repository import Gst
+    Gst.init(None)
+
+    keyInterval = max(1, round(framerate * segmentTarget))
+    pipeline = Gst.parse_launch(f"{gstVideoSource} ! video/x-raw,framerate={framerate}/1 ! videoconvert"
+                                f" ! x264enc tune=zerolatency key-int-max={keyInterval} ! h264parse config-interval=-1"
+                                f" ! mpegtsmux ! appsink name=appsink sync=false")
+    appsink = pipeline.get_by_name('appsink')
+    pipeline.set_state(Gst.State.PLAYING)
+
+    def pull():
+        while (sample := appsink.emit('pull-sample')) is not None:
+            buffer = sample.get_buffer()
+            clock = pipeline.get_clock()
+            captureTime = None
+            if clock is not None and buffer.pts != Gst.CLOCK_TIME_NONE:
+                captureTime = time.time() - (clock.get_time() - pipeline.get_base_time() - buffer.pts) / Gst.SECOND
+            loop.call_soon_threadsafe(stream.feed, buffer.extract_dup(0, buffer.get_size()), captureTime)
+
+    threading.Thread(target=pull, daemon=True).start()
+    return pipeline
+
+
+def readTransportStream(path, stream, loop):
+    """Feed MPEG-TS from a file or pipe to the stream, the arrival time stands in for the capture time."""
+    def read():
+        with open(sys.stdin.fileno() if path == "-" else path, "rb", buffering=0, closefd=path != "-") as source:
+            while data := source.read(64 * 1024):
+                loop.call_soon_threadsafe(stream.feed, data, time.time())
+
+    threading.Thread(target=read, daemon=True).start()
+
+
+async def handleRequest(head, writer):
+    """
+    Answer one request of a connection.
+
+    Args:
+        head (bytes): Request line and headers including the terminating empty line
+        writer (asyncio.StreamWriter): Connection to answer on
+
+    Returns:
+        bool: True if the connection stays open for further requests
+    """
+    from urllib.parse import parse_qs, unquote
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ")
+    except ValueError:
+        writer.write(errorResponse(400, False))
+        return False
+    headers = {}
+    for line in lines[1:]:
+        name, separator, value = line.partition(":")
+        if separator:
+            headers[name.strip().lower()] = value.strip()
+
+    connection = headers.get("connection", "").lower()
+    keepAlive = "close" not in connection if version == "HTTP/1.1" else "keep-alive" in connection
+    # Request bodies are never expected, close instead of parsing them
+    if "content-length" in headers or "transfer-encoding" in headers:
+        keepAlive = False
+    if method not in ("GET", "HEAD"):
+        writer.write(errorResponse(405, keepAlive, headers={"Allow": "GET, HEAD"}))
+        return keepAlive
+
+    path, _, queryString = target.partition("?")
+    path = unquote(path)
+    name = path[1:] if path.startswith("/") else ""
+    if lowLatencyStream is not None:
+        return await sendLowLatency(writer, name, parse_qs(queryString), method, headers, keepAlive)
+    if name == playlistFile:
+        contentType, cacheControl = "application/vnd.apple.mpegurl", playlistCacheControl
+    elif segmentName.fullmatch(name):
+        contentType, cacheControl = "video/mp2t", segmentCacheControl
+    else:
+        writer.write(errorResponse(404, keepAlive, method == "GET"))
+        return keepAlive
+    cached = segmentCache.get(name) if segmentCache is not None else None
+    if cached is not None:
+        return sendCached(writer, cached, contentType, cacheControl, method, headers, keepAlive)
+    return await sendFile(writer, name, contentType, cacheControl, method, headers, keepAlive)
+
+
+async def serveConnection(reader, writer):
+    import asyncio
+    global activeConnections
+    if activeConnections >= maxConnections:
+        writer.write(errorResponse(503, False, headers={"Retry-After": 1}))
+        writer.close()
+        return
+
+    activeConnections += 1
+    try:
+        keepAlive = True
+        while keepAlive:
+            try:
+                head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), keepAliveTimeout)
+            except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+                break
+            except asyncio.LimitOverrunError:
+                writer.write(errorResponse(431, False))
+                break
+            keepAlive = await handleRequest(head, writer)
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        activeConnections -= 1
+        writer.close()
+
+
+def raiseFileLimit(needed):
+    """Raise the soft limit of open files, every connection holds a socket and possibly a segment file."""
+    import resource
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (needed if hard == resource.RLIM_INFINITY else min(needed, hard), hard))
+
+
+async def serveAsyncio():
+    import asyncio
+    global segmentCache, lowLatencyStream
+    raiseFileLimit(2 * maxConnections + 64)
+    pipeline = None
+    if lowLatency:
+        loop = asyncio.get_running_loop()
+        lowLatencyStream = LowLatencyStream(partTarget, segmentTarget, lowLatencyWindow, loop)
+        if tsInput is not None:
+            readTransportStream(tsInput, lowLatencyStream, loop)
+        else:
+            pipeline = startLowLatencyPipeline(lowLatencyStream, loop)
+    elif cacheSegments > 0:
+        segmentCache = SegmentCache(hlsDir, playlistFile, cacheSegments)
+        try:
+            segmentCache.watch(asyncio.get_running_loop())
+        except (OSError, AttributeError) as e:
+            print(f"Serving without segment cache: {e}", file=sys.stderr)
+            segmentCache = None
+    server = await asyncio.start_server(serveConnection, host, httpPort, limit=maxHeaderBytes,
+                                        backlog=min(maxConnections, 4096))
+    print(f"HLS stream available at: http://{host}:{httpPort}/{playlistFile}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if segmentCache is not None:
+            segmentCache.close(asyncio.get_running_loop())
+        if pipeline is not None:
+            from gi.repository import Gst
+            pipeline.set_state(Gst.State.NULL)
+
+
+def serveFlask():
+    # flask is imported only for this server to keep --help fast
+    from flask import Flask, send_from_directory
+    app = Flask(__name__)
+
+    @app.route('/' + playlistFile)
+    def playlist():
+        # Serve the playlist file
+        return send_from_directory(hlsDir, playlistFile)
+
+    @app.route('/<segment_name>.ts')
+    def segments(segment_name):
+        # Serve the segment files
+        return send_from_directory(hlsDir, f'{segment_name}.ts')
 
-if __name__ == '__main__':
     # Flask app runs on localhost:5000 by default
-    app.run(host=host, port=httpPort)
\ No newline at end of file
+    app.run(host=host, port=httpPort)
+
+
+def main():
+    global hlsDir, playlistFile, host, httpPort, captureFromDev, device, maxConnections, keepAliveTimeout, \
+        cacheSegments, lowLatency, partTarget, segmentTarget, framerate, tsInput, gstVideoSource
+    parser = argparse.ArgumentParser(prog=__name__, description="HTTP Live Streaming")
+    parser.add_argument("-p", "--http-port", help="http port on which stream will served", required=False, type=int, default=httpPort)
+    parser.add_argument("--stream-location", help="stream metadata output location", required=False, default=hlsDir)
+    parser.add_argument("--host", help="ip4 address on which the stream should be published", required=False, default=host)
+    parser.add_argument("--playlist-file-name", help="the name of the playlist file", required=False, default=playlistFile)
+    parser.add_argument("--capture-stream-from-device", help="if true will capture stream from device provided in option --device", required=False, action="store_true")
+    parser.add_argument("--device", help="device location, where the stream will be taken from", required=False, default=device)
+    parser.add_argument("--server", help="asyncio serves many clients concurrently with keep-alive and sendfile, flask is the single process development server", required=False, choices=["asyncio", "flask"], default="asyncio")
+    parser.add_argument("--max-connections", help="concurrent client connections of the asyncio server, further clients are answered with 503", required=False, type=int, default=maxConnections)
+    parser.add_argument("--keep-alive-timeout", help="seconds an idle keep-alive connection of the asyncio server stays open", required=False, type=float, default=keepAliveTimeout)
+    parser.add_argument("--cache-segments", help="number of the latest segments the asyncio server keeps in memory, updated by watching --stream-location with inotify, 0 disables the cache", required=False, type=int, default=cacheSegments)
+    parser.add_argument("--low-latency", help="if true will serve low-latency HLS with partial segments and blocking playlist reload, cut from the live stream in memory instead of hlssink2 files (asyncio server)", required=False, action="store_true")
+    parser.add_argument("--part-target", help="maximum partial segment duration in seconds of --low-latency", required=False, type=float, default=partTarget)
+    parser.add_argument("--segment-target", help="segment duration in seconds of --low-latency, segments end at the first keyframe after it", required=False, type=float, default=segmentTarget)
+    parser.add_argument("--framerate", help="captured frames per second of --low-latency, keyframes are placed every --segment-target", required=False, type=int, default=framerate)
+    parser.add_argument("--ts-input", help="read MPEG-TS from this file or pipe ('-' for stdin) instead of starting gstreamer in --low-latency mode", required=False, default=None)
+    parser.add_argument("--serve-only", help="if true will not start gstreamer and only serve the stream already written to --stream-location", required=False, action="store_true")
+
+    args = parser.parse_args()
+    if args.low_latency and args.server == "flask":
+        parser.error("--low-latency needs the asyncio server")
+    if not 0 < args.part_target < args.segment_target:
+        parser.error("--part-target must be positive and shorter than --segment-target")
+
+    hlsDir = args.stream_location
+    playlistFile = args.playlist_file_name
+    host = args.host
+    httpPort = args.http_port
+    captureFromDev = args.capture_stream_from_device
+    device = args.device
+    maxConnections = args.max_connections
+    keepAliveTimeout = args.keep_alive_timeout
+    cacheSegments = args.cache_segments
+    lowLatency = args.low_latency
+    partTarget = args.part_target
+    segmentTarget = args.segment_target
+    framerate = args.framerate
+    tsInput = args.ts_input
+    gstVideoSource = f"v4l2src device={device}" if captureFromDev else gstVideoSource
+
+    #start gstreamer and capture video stream
+    gstProcess = None
+    if not args.serve_only and not lowLatency:
+        gstProcess = subprocess.Popen(f'gst-launch-1.0 -v   {gstVideoSource} '
+                                      f' !   videoconvert '
+                                      f' !   x264enc '
+                                      f' !   hlssink2 location={hlsDir}/segment%05d.ts target-duration=5   playlist-location={hlsDir + "/" + playlistFile}',
+                                      shell=True)
+
+    try:
+        if args.server == "flask":
+            serveFlask()
+        else:
+            # asyncio is imported only for this server to keep --help fast
+            import asyncio
+            asyncio.run(serveAsyncio())
+    except KeyboardInterrupt:
+        print("\nServer stopped", file=sys.stderr)
+    finally:
+        if gstProcess is not None:
+            gstProcess.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,8 @@
 #!/usr/bin/env python3
 import argparse
-import gi
 import sys
 import os
 
-gi.require_version('Gst', '1.0')
-gi.require_version('GstRtspServer', '1.0')
-from gi.repository import Gst, GstRtspServer, GLib
-
 class VideoStreamServer:
     def __init__(self, args):
         self.args = args
@@ -106,6 +101,13 @@ def parse_args():
 
 if __name__ == '__main__':
     args = parse_args()
+
+    # Import GStreamer after argument parsing, loading the typelibs is slow
+    import gi
+    gi.require_version('Gst', '1.0')
+    gi.require_version('GstRtspServer', '1.0')
+    from gi.repository import Gst, GstRtspServer, GLib
+
     server = VideoStreamServer(args)
     try:
         server.run()
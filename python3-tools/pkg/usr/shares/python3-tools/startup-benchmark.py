@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Startup time benchmark of the python3-tools entry points.
+
+Every entry point is started with `python3 -X importtime ... --help` and the import time of
+its top-level imports is summed up. An entry point fails when it exceeds its budget or when
+one of its heavy modules is imported before the arguments are parsed.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+TOOLS_DIR = os.path.dirname(os.path.realpath(__file__))
+
+# name: (command line after the interpreter, import time budget in ms, modules that must not be imported)
+ENTRY_POINTS = {
+    'brightness': (['brightness.py'], 60, []),
+    'git-replace': (['git-replace.py'], 60, ['sh', 'git']),
+    'http-video-streamin-server': (['http-video-streamin-server.py'], 60, ['flask', 'gi', 'asyncio']),
+    'hls-load-test': (['hls-load-test.py', 'http://localhost:8080/stream'], 60, ['asyncio']),
+    'hls-latency': (['hls-latency.py', 'http://localhost:8080/stream'], 60, ['http.client']),
+    'http-mjpeg-video-streaming-server': (['http-mjpeg-video-streaming-server.py'], 60, ['flask', 'gi']),
+    'rtsp-video-streaming-server': (['rtsp-video-streaming-server.py'], 60, ['gi']),
+    'update-softfs': (['update-softfs.py'], 60, []),
+    'CreditCalculator': (['-m', 'Finances.CreditCalculator'], 80, ['numpy', 'multiprocessing']),
+    'InvestmentCalculator': (['-m', 'Finances.InvestmentCalculator'], 80, ['numpy']),
+    'FinanceClient': (['-m', 'Finances.FinanceClient'], 80, ['numpy', 'asyncio']),
+}
+
+
+def parse_importtime(stderr: str):
+    """
+    Parse the `-X importtime` report.
+
+    Returns:
+        tuple: (
+            float: Summed cumulative import time of the top-level imports in ms,
+            set: Names of all imported modules
+        )
+    """
+    total_us = 0
+    modules = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # column header
+        modules.add(name.strip())
+        # Nested imports are indented below their importer
+        if not name[1:].startswith(" "):
+            total_us += int(cumulative)
+    return total_us / 1000, modules
+
+
+def measure_entry_point(argv, repeat):
+    """
+    Start an entry point with --help repeat times.
+
+    Returns:
+        tuple: (minimal import time in ms, minimal wall time in ms, imported modules)
+    """
+    import_ms, wall_ms, modules = float('inf'), float('inf'), set()
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, "-X", "importtime", *argv, "--help"], cwd=TOOLS_DIR,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        wall_ms = min(wall_ms, (time.perf_counter() - started) * 1000)
+        run_import_ms, modules = parse_importtime(result.stderr)
+        import_ms = min(import_ms, run_import_ms)
+    return import_ms, wall_ms, modules
+
+
+def _main():
+    parser = argparse.ArgumentParser(prog="startup-benchmark",
+                                     description="Check the --help startup time of the python3-tools entry points")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per entry point, the fastest counts (default: 5)")
+    parser.add_argument("--budget-scale", type=float, default=1.0,
+                        help="Multiply every budget, e.g. for slow machines (default: 1.0)")
+    parser.add_argument("--select", nargs="+", choices=sorted(ENTRY_POINTS), default=sorted(ENTRY_POINTS),
+                        help="Entry points to measure (default: all)")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'entry point':36} {'imports':>10} {'wall':>10} {'budget':>10}")
+    for name in args.select:
+        argv, budget_ms, forbidden = ENTRY_POINTS[name]
+        budget_ms *= args.budget_scale
+        import_ms, wall_ms, modules = measure_entry_point(argv, args.repeat)
+        problems = [f"imports {module}" for module in forbidden if module in modules]
+        if import_ms > budget_ms:
+            problems.append("over budget")
+        failed = failed or bool(problems)
+        print(f"{name:36} {import_ms:8.1f}ms {wall_ms:8.1f}ms {budget_ms:8.1f}ms"
+              f"{'  FAIL: ' + ', '.join(problems) if problems else ''}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,288 @@
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+TOOLS_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+
+def loadScript(name):
+    """Import a dash-named script of the tools directory as a module."""
+    spec = importlib.util.spec_from_file_location(name.replace("-", "_"), os.path.join(TOOLS_DIR, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    # Registered so worker processes can unpickle its functions
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+gitReplace = loadScript("git-replace")
+
+
+def createRepository(testCase, files):
+    """Create a temporary repository with the files added to its index, removed after the test."""
+    from git import Repo
+
+    directory = tempfile.TemporaryDirectory()
+    testCase.addCleanup(directory.cleanup)
+    repoPath = os.path.realpath(directory.name)
+    for path, content in files.items():
+        os.makedirs(os.path.dirname(os.path.join(repoPath, path)), exist_ok=True)
+        with open(os.path.join(repoPath, path), "w") as f:
+            f.write(content)
+    subprocess.run(["git", "init", "-q"], cwd=repoPath, check=True)
+    subprocess.run(["git", "add", "."], cwd=repoPath, check=True)
+    return repoPath, Repo(repoPath)
+
+
+class TestTranslatePattern(unittest.TestCase):
+    def assertTranslates(self, pattern, line, expected):
+        self.assertEqual(re.sub(gitReplace.translatePattern(pattern), "<\\g<0>>", line), expected)
+
+    def test_translation(self):
+        self.assertTranslates("[[:digit:]]+", "a12b3", "a<12>b<3>")
+        self.assertTranslates("[^[:alpha:] ]", "ab 1c", "ab <1>c")
+        self.assertTranslates(r"\<is\>", "this is", "this <is>")
+        self.assertTranslates(r"(a)\1", "aab", "<aa>b")
+        # Backslashes are ordinary characters in bracket expressions
+        self.assertTranslates(r"[\.]", r"a.b\c", r"a<.>b<\>c")
+        self.assertTranslates(r"[\n]", "n\\\n", "<n><\\>\n")
+        self.assertTranslates("[]a]", "]ab", "<]><a>b")
+        self.assertTranslates("[a&|~[]", "&|~[b", "<&><|><~><[>b")
+
+    def test_group_offset(self):
+        self.assertEqual(gitReplace.translatePattern(r"(x)\1", groupOffset=2), r"(x)(?:\3)")
+
+    def test_invalid(self):
+        for pattern in ("[[:word:]]", "[abc", "[[.a.]]", "[[:alpha:"):
+            with self.assertRaises(ValueError):
+                gitReplace.translatePattern(pattern)
+
+    @unittest.skipUnless(shutil.which("sed"), "sed is not installed")
+    def test_same_as_sed(self):
+        """Test the substitution against sed, apart from the documented alternation order"""
+        line = r"ab abc a.b a\b x1 [y] is this"
+        for before, after in [("a|ab", "[&]"), ("ab|a", "[&]"), (r"[\.]", "_"), (r"\<is\>", "IS"),
+                              ("([[:alpha:]])([[:digit:]])", r"\2\1"), (r"\[[^]]*\]", "()"), ("b+", r"\&")]:
+            sed = subprocess.run(["sed", "-E", f"s,{before},{after},g"], input=line, capture_output=True,
+                                 text=True, check=True, env=dict(os.environ, LC_ALL="C")).stdout.rstrip("\n")
+            rules, _ = gitReplace.compileSubstitution([(before, after)])
+            substituted, _ = gitReplace.applyRules(line, rules)
+            if before == "a|ab":
+                # POSIX leftmost-longest against Python leftmost-first
+                self.assertNotEqual(substituted, sed)
+                self.assertEqual(substituted, line.replace("a", "[a]"))
+            else:
+                self.assertEqual(substituted, sed, before)
+
+
+class TestReplaceContents(unittest.TestCase):
+    def setUp(self):
+        self.files = {
+            "a.txt": "foo bar\nbar foo\n",
+            "sub/b.txt": "nothing here\nfoo",
+            "sub/c.txt": "unchanged\n",
+        }
+        self.repoPath, self.repo = createRepository(self, self.files)
+
+    def read(self, path):
+        with open(os.path.join(self.repoPath, path)) as f:
+            return f.read()
+
+    def replace(self, rules, useMmap=False, preview=False, jobs=1):
+        """Run replaceContents and return its (stdout, stderr)"""
+        stdout, stderr = io.TextIOWrapper(io.BytesIO(), encoding="utf-8"), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            gitReplace.replaceContents(self.repo, rules, self.repoPath, jobs, useMmap, preview)
+            stdout.flush()
+        return stdout.buffer.getvalue().decode(), stderr.getvalue()
+
+    def test_substitution(self):
+        for useMmap in (False, True):
+            with self.subTest(useMmap=useMmap):
+                with open(os.path.join(self.repoPath, "a.txt"), "w") as f:
+                    f.write(self.files["a.txt"])
+                output, _ = self.replace([("(foo) (bar)", r"\2 \1")], useMmap)
+                self.assertIn("Rewrote 1 of 1 files, 1 matches", output)
+                self.assertEqual(self.read("a.txt"), "bar foo\nbar foo\n")
+        self.replace([("foo$", "baz")], jobs=2)
+        self.assertEqual(self.read("sub/b.txt"), "nothing here\nbaz")
+        self.assertEqual(self.read("sub/c.txt"), self.files["sub/c.txt"])
+
+    def test_dry_run(self):
+        output, summary = self.replace([("foo", "qux")], preview=True)
+        self.assertIn("--- a/a.txt\n+++ b/a.txt\n", output)
+        self.assertIn("-foo bar\n-bar foo\n+qux bar\n+bar qux\n", output)
+        self.assertIn("+++ b/sub/b.txt", output)
+        self.assertIn("Would rewrite 2 of 2 files, 3 matches", summary)
+        for path, content in self.files.items():
+            self.assertEqual(self.read(path), content)
+
+    def test_rules(self):
+        rulesFile = os.path.join(self.repoPath, "rules.json")
+        with open(rulesFile, "w") as f:
+            json.dump([{"before": "foo", "after": "bar"}, {"before": "bar", "after": "baz"}], f)
+        rules = gitReplace.loadRules(rulesFile)
+        self.assertEqual(rules, [("foo", "bar"), ("bar", "baz")])
+        # Later rules see the output of earlier ones, like sed -e ... -e ...
+        self.replace(rules)
+        self.assertEqual(self.read("a.txt"), "baz baz\nbaz baz\n")
+
+        with open(rulesFile, "w") as f:
+            json.dump([{"before": "foo"}], f)
+        with self.assertRaises(ValueError):
+            gitReplace.loadRules(rulesFile)
+
+    def test_invalid_pattern(self):
+        with self.assertRaises(re.error):
+            self.replace([("(foo", "bar")])
+        with self.assertRaises(ValueError):
+            self.replace([("[[:word:]]", "bar")])
+        self.assertEqual(self.read("a.txt"), self.files["a.txt"])
+
+
+class TestTrigramIndex(unittest.TestCase):
+    def setUp(self):
+        self.repoPath, self.repo = createRepository(self, {
+            "a.txt": "import numpy\nfoo bar\n",
+            "sub/b.txt": "import os\n",
+            "sub/c.bin": "\0\1\2 binary foo\n",
+        })
+        self.index = gitReplace.TrigramIndex(self.repo)
+        self.addCleanup(self.index.close)
+
+    def write(self, path, content):
+        with open(os.path.join(self.repoPath, path), "w") as f:
+            f.write(content)
+        subprocess.run(["git", "add", "-A"], cwd=self.repoPath, check=True)
+
+    def query(self, pattern, prefix=""):
+        return self.index.query(gitReplace.rulesQuery([(pattern, "")]), prefix)
+
+    def test_rules_query(self):
+        self.assertEqual(gitReplace.rulesQuery([("foo (bar|qux)", "")]), ("and", [b"foo ", ("or", [b"bar", b"qux"])]))
+        self.assertEqual(gitReplace.rulesQuery([("foo", ""), ("bar", "")]), ("or", [b"foo", b"bar"]))
+        self.assertIsNone(gitReplace.rulesQuery([("fo+", "")]))
+        # Case insensitive literals cannot be looked up, scoped or global
+        self.assertEqual(gitReplace.rulesQuery([("foo (?i:bar)", "")]), b"foo ")
+        self.assertIsNone(gitReplace.rulesQuery([("(?i)foo bar", "")]))
+
+    def test_rules_query_parse_tree(self):
+        """Pin the shapes of the private re parse tree literalQuery relies on, and the fallback to all files"""
+        from re import _constants as constants, _parser as parser
+
+        parsed = parser.parse("abc(de|fg)+")
+        self.assertEqual(parsed[0], (constants.LITERAL, ord("a")))
+        op, (minimum, _, repeated) = parsed[3]
+        self.assertEqual((op, minimum), (constants.MAX_REPEAT, 1))
+        op, (_, addFlags, _, items) = repeated[0]
+        self.assertEqual((op, addFlags), (constants.SUBPATTERN, 0))
+        op, (_, branches) = items[0]
+        self.assertEqual((op, [list(branch) for branch in branches]), (constants.BRANCH, [
+            [(constants.LITERAL, ord("d")), (constants.LITERAL, ord("e"))],
+            [(constants.LITERAL, ord("f")), (constants.LITERAL, ord("g"))]]))
+        self.assertEqual(parser.parse("(?i)x").state.flags & re.IGNORECASE, re.IGNORECASE)
+        with mock.patch.object(parser, "parse", return_value=[("unexpected",)]):
+            self.assertIsNone(gitReplace.rulesQuery([("foo bar", "")]))
+
+    def test_global_flags(self):
+        rules, scanPattern = gitReplace.compileSubstitution([("(?i)FOO", "x"), ("bar", "y")])
+        self.assertEqual(gitReplace.applyRules("foo bar BAR", rules)[0], "x y BAR")
+        self.assertEqual(scanPattern.findall("Foo bar BAR"), ["Foo", "bar"])
+
+    def test_posting_encoding(self):
+        import numpy
+
+        for ids in ([5], [1, 2, 300], [7, 70000], list(range(1000, 2000, 2))):
+            ids = numpy.array(ids, dtype=numpy.uint32)
+            data = gitReplace.TrigramIndex._encodePosting(ids)
+            self.assertEqual(gitReplace.TrigramIndex._bitsToIds(gitReplace.TrigramIndex._decodePosting(data)).tolist(),
+                             ids.tolist())
+        # Dense lists are stored as bitmaps
+        self.assertEqual(data[0], 0)
+
+    def test_query(self):
+        self.assertEqual(self.index.synchronize(), 3)
+        self.assertEqual(self.query("import"), ["a.txt", "sub/b.txt"])
+        self.assertEqual(self.query("import numpy"), ["a.txt"])
+        self.assertEqual(self.query("import", "sub"), ["sub/b.txt"])
+        self.assertEqual(self.query("fo+"), ["a.txt", "sub/b.txt", "sub/c.bin"])
+        # Binary blobs are only indexed by their printable trigrams
+        self.assertEqual(self.query("binary foo"), ["sub/c.bin"])
+        self.assertEqual(self.query("\1\2 binary"), ["sub/c.bin"])
+        # Nothing is read while the git index is unchanged
+        self.assertEqual(self.index.synchronize(), 0)
+        self.assertTrue(self.index.stats()["current"])
+
+    def test_update(self):
+        self.index.synchronize()
+        self.write("sub/b.txt", "import numpy as np\n")
+        os.remove(os.path.join(self.repoPath, "a.txt"))
+        self.write("d.txt", "import numpy\nfoo bar\n")
+        # Only the changed blob is new, d.txt has the blob a.txt had
+        self.assertEqual(self.index.synchronize(), 1)
+        self.assertEqual(self.query("import numpy"), ["d.txt", "sub/b.txt"])
+        # The pruned blob of sub/b.txt exceeds a quarter of the live blobs, so the segments were compacted
+        stats = self.index.stats()
+        self.assertEqual((stats["blobs"], stats["files"], stats["pruned"], stats["segments"]), (3, 3, 0, 1))
+        self.assertEqual(self.query("import os"), [])
+
+    def test_candidates(self):
+        """Test the indexed candidates contain every file git grep finds"""
+        index = gitReplace.TrigramIndex(self.repo, rebuild=True)
+        self.addCleanup(index.close)
+        with open(os.path.join(self.repoPath, "sub/b.txt"), "a") as f:
+            f.write("foo\n")
+        for pattern in ("foo", "import (numpy|os)", "(?i)IMPORT", "[[:digit:]]"):
+            with contextlib.redirect_stderr(io.StringIO()):
+                candidates = gitReplace.listIndexedCandidates(self.repo, [(pattern, "")], self.repoPath, index)
+            self.assertLessEqual(set(gitReplace.listCandidates(self.repo, [(pattern, "")], self.repoPath)),
+                                 set(candidates), pattern)
+
+
+class TestRenameFiles(unittest.TestCase):
+    def setUp(self):
+        self.repoPath, self.repo = createRepository(self, {"src/a.py": "a\n", "src/b.py": "b\n", "doc/c.txt": "c\n"})
+
+    def git(self, *args):
+        return subprocess.run(["git", *args], cwd=self.repoPath, check=True, capture_output=True, text=True).stdout
+
+    def test_rename(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            gitReplace.renameFiles(self.repo, r"^src/(\w+)\.py$", r"lib/\1/main.py", self.repoPath)
+        self.assertEqual(self.git("ls-files").split(), ["doc/c.txt", "lib/a/main.py", "lib/b/main.py"])
+        self.assertFalse(os.path.exists(os.path.join(self.repoPath, "src")))
+        # The moved entries have stat data, so git sees clean files without hashing them again
+        self.assertNotIn("mtime: 0:0", self.git("ls-files", "--debug", "lib"))
+        self.assertEqual(self.git("diff", "--name-only"), "")
+
+    def test_dry_run(self):
+        with contextlib.redirect_stdout(io.StringIO()) as stdout, contextlib.redirect_stderr(io.StringIO()):
+            gitReplace.renameFiles(self.repo, r"\.py$", ".txt", self.repoPath, preview=True)
+        self.assertEqual(stdout.getvalue(), "src/a.py -> src/a.txt\nsrc/b.py -> src/b.txt\n")
+        self.assertEqual(self.git("ls-files").split(), ["doc/c.txt", "src/a.py", "src/b.py"])
+
+    def test_collision(self):
+        with self.assertRaises(ValueError):
+            gitReplace.renameFiles(self.repo, r"src/\w+\.py", "src/a.py", self.repoPath)
+        self.assertEqual(self.git("ls-files").split(), ["doc/c.txt", "src/a.py", "src/b.py"])
+
+    def test_move_rollback(self):
+        """Test a failing rename restores the files and removes the directories created for them"""
+        plan = [("src/a.py", "new/deep/a.py"), ("src/missing.py", "other/missing.py")]
+        with self.assertRaises(FileNotFoundError):
+            gitReplace.moveFiles(plan, self.repoPath)
+        self.assertTrue(os.path.isfile(os.path.join(self.repoPath, "src/a.py")))
+        self.assertEqual(sorted(os.listdir(self.repoPath)), [".git", "doc", "src"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,322 @@
+import asyncio
+import importlib.util
+import os
+import sys
+import tempfile
+import unittest
+
+TOOLS_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+
+def loadScript(name):
+    """Import a dash-named script of the tools directory as a module."""
+    spec = importlib.util.spec_from_file_location(name.replace("-", "_"), os.path.join(TOOLS_DIR, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+server = loadScript("http-video-streamin-server")
+
+
+def parseResponse(response):
+    """Split a response into (status, dict of lower case headers, body)."""
+    head, _, body = response.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return int(lines[0].split(" ")[1]), headers, body
+
+
+class TestParseRange(unittest.TestCase):
+    def test_ranges(self):
+        self.assertEqual(server.parseRange("bytes=0-9", 100), (0, 10))
+        self.assertEqual(server.parseRange("bytes=90-", 100), (90, 10))
+        self.assertEqual(server.parseRange("bytes=-5", 100), (95, 5))
+        self.assertEqual(server.parseRange("bytes=-500", 100), (0, 100))
+        # The end is clamped to the file
+        self.assertEqual(server.parseRange("bytes=50-999", 100), (50, 50))
+
+    def test_ignored(self):
+        for value in ("bytes=0-1,5-6", "items=0-9", "bytes=-", "bytes=9-5"):
+            self.assertIsNone(server.parseRange(value, 100), value)
+
+    def test_unsatisfiable(self):
+        for value in ("bytes=100-", "bytes=200-300", "bytes=-0"):
+            with self.assertRaises(ValueError):
+                server.parseRange(value, 100)
+
+
+class TestRespond(unittest.TestCase):
+    etag = '"1-64-2"'
+
+    def respond(self, requestHeaders, method="GET", keepAlive=True):
+        head, start, count = server.respond(method, requestHeaders, 100, self.etag, "video/mp2t",
+                                            server.segmentCacheControl, keepAlive)
+        status, headers, body = parseResponse(head)
+        self.assertEqual(body, b"")
+        return status, headers, start, count
+
+    def test_whole_file(self):
+        status, headers, start, count = self.respond({})
+        self.assertEqual((status, start, count), (200, 0, 100))
+        self.assertEqual(headers["content-length"], "100")
+        self.assertEqual(headers["etag"], self.etag)
+        self.assertEqual(headers["connection"], "keep-alive")
+        # HEAD announces the length without a body
+        status, headers, _, count = self.respond({}, "HEAD", keepAlive=False)
+        self.assertEqual((status, headers["content-length"], count), (200, "100", 0))
+        self.assertEqual(headers["connection"], "close")
+
+    def test_range(self):
+        status, headers, start, count = self.respond({"range": "bytes=10-19"})
+        self.assertEqual((status, start, count), (206, 10, 10))
+        self.assertEqual(headers["content-range"], "bytes 10-19/100")
+        self.assertEqual(headers["content-length"], "10")
+
+    def test_unsatisfiable_range(self):
+        head, _, count = server.respond("GET", {"range": "bytes=100-"}, 100, self.etag, "video/mp2t", "no-cache", True)
+        status, headers, body = parseResponse(head)
+        self.assertEqual((status, count), (416, 0))
+        self.assertEqual(headers["content-range"], "bytes */100")
+        self.assertEqual(int(headers["content-length"]), len(body))
+
+    def test_not_modified(self):
+        for ifNoneMatch in (self.etag, f'"other", {self.etag}', "*"):
+            status, headers, _, count = self.respond({"if-none-match": ifNoneMatch, "range": "bytes=0-9"})
+            self.assertEqual((status, count), (304, 0), ifNoneMatch)
+            self.assertNotIn("content-length", headers)
+        self.assertEqual(self.respond({"if-none-match": '"other"'})[0], 200)
+
+
+class TestSegmentCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.cache = server.SegmentCache(self.directory, "stream", 2)
+
+    def write(self, name, data):
+        with open(os.path.join(self.directory, name), "wb") as f:
+            f.write(data)
+
+    def writePlaylist(self, *segments):
+        self.write("stream", "".join(f"#EXTINF:5.0,\n{segment}\n" for segment in ("#EXTM3U",) + segments).encode())
+
+    async def test_synchronize(self):
+        for index in range(4):
+            self.write(f"segment{index:05d}.ts", bytes([index]) * 10)
+        self.writePlaylist("segment00000.ts", "segment00001.ts", "segment00002.ts", "secret.ts")
+        await self.cache.synchronize()
+        # Only the latest listed segments of the capacity, never other files
+        self.assertEqual(list(self.cache.entries), ["stream", "segment00001.ts", "segment00002.ts"])
+        data, _ = self.cache.get("segment00002.ts")
+        self.assertEqual(bytes(data), bytes([2]) * 10)
+
+        self.writePlaylist("segment00002.ts", "segment00003.ts")
+        await self.cache.handleEvent(server.IN_CLOSE_WRITE, "stream")
+        self.assertEqual(list(self.cache.entries), ["segment00002.ts", "stream", "segment00003.ts"])
+        await self.cache.handleEvent(server.IN_DELETE, "segment00002.ts")
+        self.assertIsNone(self.cache.get("segment00002.ts"))
+        # Files that vanished before they were read are not cached
+        await self.cache.handleEvent(server.IN_CLOSE_WRITE, "segment00009.ts")
+        self.assertIsNone(self.cache.get("segment00009.ts"))
+
+    def test_segment_name(self):
+        for name in ("segment00001.ts", "segment123456.ts"):
+            self.assertTrue(server.segmentName.fullmatch(name), name)
+        for name in ("segment1.ts", "secret.ts", "segment00001.1.ts", ".segment00001.ts"):
+            self.assertFalse(server.segmentName.fullmatch(name), name)
+
+    @unittest.skipUnless(sys.platform == "linux", "inotify is Linux only")
+    async def test_watch(self):
+        loop = asyncio.get_running_loop()
+        self.cache.watch(loop)
+        self.addCleanup(self.cache.close, loop)
+        self.write("segment00000.ts", b"data")
+        for _ in range(100):
+            if self.cache.get("segment00000.ts") is not None:
+                break
+            await asyncio.sleep(0.05)
+        self.assertEqual(bytes(self.cache.get("segment00000.ts")[0]), b"data")
+
+
+VIDEO_PID = 0x101
+PMT_PID = 0x100
+
+
+def tsPacket(pid, payload, start=True):
+    """Transport stream packet with payload only, padded to the packet size."""
+    header = bytes([0x47, (0x40 if start else 0) | pid >> 8, pid & 0xff, 0x10])
+    return (header + payload + b"\xff" * server.tsPacketSize)[:server.tsPacketSize]
+
+
+def encodeTimestamp(prefix, timestamp):
+    return bytes([prefix << 4 | (timestamp >> 29) & 0x0e | 1, (timestamp >> 22) & 0xff, (timestamp >> 14) & 0xfe | 1,
+                  (timestamp >> 7) & 0xff, (timestamp << 1) & 0xfe | 1])
+
+
+def patPacket():
+    # Pointer field, table id, section length 13, stream id, version, section numbers, program 1 on PMT_PID, CRC
+    return tsPacket(0, bytes([0, 0, 0xb0, 13, 0, 1, 0xc1, 0, 0, 0, 1, 0xe0 | PMT_PID >> 8, PMT_PID & 0xff]) + b"\0" * 4)
+
+
+def videoPacket(dts, keyframe):
+    """First packet of a video PES with PTS and DTS and a single H.264 IDR or non-IDR slice."""
+    header = b"\0\0\1\xe0\0\0\x80\xc0\x0a" + encodeTimestamp(3, dts + 3000) + encodeTimestamp(1, dts)
+    return tsPacket(VIDEO_PID, header + (b"\0\0\0\1\x65" if keyframe else b"\0\0\0\1\x41"))
+
+
+class TestTransportStream(unittest.TestCase):
+    def test_timestamp(self):
+        packet = videoPacket(123456789, True)
+        self.assertEqual(server.pesVideoTimestamp(packet, 4), 123456789)
+        self.assertTrue(server.h264Keyframe(packet, 4))
+        self.assertFalse(server.h264Keyframe(videoPacket(0, False), 4))
+        self.assertEqual(server.patProgramMapPid(patPacket(), 4), PMT_PID)
+
+    def test_truncated(self):
+        packet = videoPacket(123456789, True)
+        for length in (4, 10, 13, 22):
+            self.assertIsNone(server.pesVideoTimestamp(packet[:length], 4), length)
+            self.assertFalse(server.h264Keyframe(packet[:length], 4), length)
+        # A header length too short for the DTS
+        self.assertIsNone(server.pesVideoTimestamp(packet[:12] + b"\x05" + packet[13:], 4))
+        self.assertIsNone(server.patProgramMapPid(patPacket()[:6], 4))
+        # A pointer field beyond the packet
+        self.assertIsNone(server.patProgramMapPid(tsPacket(0, b"\xb7"), 4))
+
+
+class TestLowLatencyStream(unittest.IsolatedAsyncioTestCase):
+    # 10 frames per second with a keyframe every second
+    frameTicks = server.tsClock // 10
+
+    async def asyncSetUp(self):
+        self.stream = server.LowLatencyStream(0.2, 1.0, 1, asyncio.get_running_loop())
+        self.frames = 0
+
+    def feedFrames(self, count, chunkSize=None):
+        data = bytearray()
+        for _ in range(count):
+            if self.frames % 10 == 0:
+                data += patPacket() + tsPacket(PMT_PID, b"\0\2")
+            data += videoPacket(self.frames * self.frameTicks, self.frames % 10 == 0)
+            data += tsPacket(VIDEO_PID, b"\0" * 184, start=False)
+            self.frames += 1
+        chunkSize = chunkSize or len(data)
+        for start in range(0, len(data), chunkSize):
+            self.stream.feed(bytes(data[start:start + chunkSize]), 1000.0 + start)
+
+    async def test_cutting(self):
+        self.assertIsNone(self.stream.render())
+        # Packets are split across feed calls
+        self.feedFrames(25, chunkSize=100)
+        self.assertEqual(len(self.stream.pending), 0)
+        # The window keeps one complete segment besides the growing one
+        self.assertEqual([segment.msn for segment in self.stream.segments], [1, 2])
+        complete, current = self.stream.segments
+        self.assertEqual([duration for _, duration, _ in complete.parts], [0.2] * 5)
+        self.assertEqual([independent for _, _, independent in complete.parts], [True, False, False, False, False])
+        self.assertEqual(len(current.parts), 2)
+        # Every segment starts with the PAT and PMT
+        self.assertEqual(bytes(complete.data[:server.tsPacketSize]), patPacket())
+        self.assertEqual(bytes(complete.data), b"".join(bytes(data) for data, _, _ in complete.parts))
+
+        self.assertTrue(self.stream.contains(1))
+        self.assertFalse(self.stream.contains(2))
+        self.assertTrue(self.stream.contains(2, 1))
+        self.assertFalse(self.stream.contains(2, 2))
+        self.assertIsNone(self.stream.lookup(0))
+        self.assertIsNone(self.stream.lookup(2))
+        self.assertEqual(self.stream.lookup(2, 1)[0], current.parts[1][0])
+
+        playlist = bytes(self.stream.render()[0]).decode()
+        self.assertIn("#EXT-X-MEDIA-SEQUENCE:1\n", playlist)
+        self.assertIn('#EXT-X-PART:DURATION=0.20000,URI="segment00001.0.ts",INDEPENDENT=YES\n', playlist)
+        self.assertIn("#EXTINF:1.00000,\nsegment00001.ts\n", playlist)
+        self.assertNotIn("segment00002.ts\n", playlist)
+        self.assertTrue(playlist.endswith('#EXT-X-PRELOAD-HINT:TYPE=PART,URI="segment00002.2.ts"\n'))
+
+    async def test_wait_for(self):
+        self.feedFrames(11)
+        waiting = asyncio.ensure_future(self.stream.waitFor(1, 1, 5))
+        await asyncio.sleep(0)
+        self.assertFalse(waiting.done())
+        self.feedFrames(4)
+        self.assertTrue(await waiting)
+        self.assertFalse(await self.stream.waitFor(5, None, 0.05))
+
+    async def test_malformed_packets(self):
+        self.feedFrames(3)
+        parts = len(self.stream.current.parts)
+        # Garbage before a sync byte, a PAT pointing beyond the packet and a truncated PES header
+        self.stream.feed(b"\1\2\3" + tsPacket(0, b"\xb7") + tsPacket(VIDEO_PID, b"\0\0\1\xe0\0\0\x80\xc0\x0a"))
+        self.assertEqual(len(self.stream.pending), 0)
+        self.assertEqual(len(self.stream.current.parts), parts)
+        self.feedFrames(2)
+        self.assertEqual(len(self.stream.current.parts), parts + 1)
+
+
+class TestServeConnection(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.segment = bytes(range(256)) * 4
+        with open(os.path.join(directory.name, server.playlistFile), "w") as f:
+            f.write("#EXTM3U\n#EXTINF:5.0,\nsegment00000.ts\n")
+        with open(os.path.join(directory.name, "segment00000.ts"), "wb") as f:
+            f.write(self.segment)
+        with open(os.path.join(directory.name, "secret.txt"), "w") as f:
+            f.write("not served\n")
+        self.previousDir, server.hlsDir = server.hlsDir, directory.name
+        self.server = await asyncio.start_server(server.serveConnection, "127.0.0.1", 0, limit=server.maxHeaderBytes)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+        server.hlsDir = self.previousDir
+
+    async def request(self, reader, writer, path, headers=(), version="HTTP/1.1"):
+        writer.write("\r\n".join([f"GET {path} {version}", "Host: localhost", *headers, "", ""]).encode("latin-1"))
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 5)
+        status, responseHeaders, _ = parseResponse(head)
+        body = await reader.readexactly(int(responseHeaders.get("content-length", 0))) if status != 304 else b""
+        return status, responseHeaders, body
+
+    async def test_keep_alive(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        try:
+            status, _, body = await self.request(reader, writer, "/segment00000.ts")
+            self.assertEqual((status, body), (200, self.segment))
+            # Further requests reuse the connection
+            status, headers, body = await self.request(reader, writer, "/segment00000.ts", ["Range: bytes=-16"])
+            self.assertEqual((status, body), (206, self.segment[-16:]))
+            status, _, _ = await self.request(reader, writer, "/segment00000.ts", [f"If-None-Match: {headers['etag']}"])
+            self.assertEqual(status, 304)
+            status, _, _ = await self.request(reader, writer, "/segment00000.ts", ["Range: bytes=5000-"])
+            self.assertEqual(status, 416)
+            status, _, _ = await self.request(reader, writer, "/secret.txt")
+            self.assertEqual(status, 404)
+            status, headers, body = await self.request(reader, writer, f"/{server.playlistFile}", ["Connection: close"])
+            self.assertEqual((status, headers["connection"]), (200, "close"))
+            self.assertIn(b"segment00000.ts", body)
+            self.assertEqual(await asyncio.wait_for(reader.read(), 5), b"")
+        finally:
+            writer.close()
+
+    async def test_http10_closes(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        try:
+            status, headers, _ = await self.request(reader, writer, "/segment00000.ts", version="HTTP/1.0")
+            self.assertEqual((status, headers["connection"]), (200, "close"))
+            self.assertEqual(await asyncio.wait_for(reader.read(), 5), b"")
+        finally:
+            writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()